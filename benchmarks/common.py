@@ -0,0 +1,83 @@
+"""
+Helpers shared by the benchmark scripts.
+
+Benchmarks run against a throwaway test database, like the test suite,
+so they never touch `db.sqlite3`.
+
+"""
+import os
+import statistics
+import time
+from contextlib import contextmanager
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "django_learning.settings")
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.test.utils import (  # noqa: E402
+    setup_test_environment,
+    teardown_test_environment,
+)
+
+
+@contextmanager
+def test_database(path: str = None):
+    """Creates the test database, in memory or in the `path` file."""
+    if path is not None:
+        connection.settings_dict["TEST"]["NAME"] = path
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        yield
+    finally:
+        from boards.viewcounts import view_counts
+
+        # Views still pending belong to the test database.
+        view_counts.clear()
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def create_reply_database(path: str):
+    """Migrates a database file with one topic to reply to, into `path`."""
+    connection.settings_dict["TEST"]["NAME"] = path
+    connection.creation.create_test_db(verbosity=0)
+
+    from django.contrib.auth.models import User
+
+    from boards.models import Board, Post, Topic
+
+    user = User.objects.create_user(username="writer_0", password="bench_password")
+    board = Board.objects.create(name="Board", description="Benchmark.")
+    topic = Topic.objects.create(subject="Topic", board=board, starting_user=user)
+    Post.objects.create(message="First post", topic=topic, created_by=user)
+    connection.close()
+    return board.pk, topic.pk
+
+
+def timed(function, repeat: int) -> list:
+    """Calls the function `repeat` times and returns the timings in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def percentile(timings: list, percent: float) -> float:
+    if len(timings) == 1:
+        return timings[0]
+    return statistics.quantiles(timings, n=100, method="inclusive")[percent - 1]
+
+
+def summarize(timings: list) -> dict:
+    """Percentiles of the timings in milliseconds, as stored in JSON results."""
+    return {
+        "p50": percentile(timings, 50),
+        "p95": percentile(timings, 95),
+        "p99": percentile(timings, 99),
+        "mean": statistics.fmean(timings),
+    }
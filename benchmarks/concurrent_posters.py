@@ -0,0 +1,103 @@
+"""
+Compares reply throughput of concurrent poster threads of one process
+writing directly and through the write coordinator.
+
+All the posters reply to one topic of a throwaway database file.
+
+    python -m benchmarks.concurrent_posters --posters 50 --replies 10
+
+"""
+import argparse
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from benchmarks.common import create_reply_database, percentile
+
+
+def post_replies(url, writer, replies, barrier, outcomes):
+    from django.contrib.auth.models import User
+    from django.db import connection
+    from django.test import Client
+
+    user, _ = User.objects.get_or_create(username=f"writer_{writer}")
+    client = Client()
+    client.force_login(user)
+    barrier.wait()
+
+    timings, errors = [], 0
+    for i in range(replies):
+        started = time.perf_counter()
+        try:
+            client.post(url, {"message": f"Reply {i} of writer {writer}"})
+        except Exception:
+            errors += 1
+        else:
+            timings.append((time.perf_counter() - started) * 1000)
+    outcomes.append((timings, errors))
+    connection.close()
+
+
+def run(url, posters, replies):
+    barrier = threading.Barrier(posters + 1)
+    outcomes = []
+    threads = [
+        threading.Thread(
+            target=post_replies, args=(url, writer, replies, barrier, outcomes)
+        )
+        for writer in range(posters)
+    ]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    timings = [timing for writer_timings, _ in outcomes for timing in writer_timings]
+    errors = sum(writer_errors for _, writer_errors in outcomes)
+    return len(timings) / elapsed, timings, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--posters", type=int, default=50)
+    parser.add_argument("--replies", type=int, default=10)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    try:
+        from django.test.utils import setup_test_environment
+        from django.urls import reverse
+
+        from boards.writequeue import write_coordinator
+
+        board_pk, topic_pk = create_reply_database(str(Path(directory) / "db.sqlite3"))
+        setup_test_environment()
+        url = reverse(
+            "reply_topic", kwargs={"board_pk": board_pk, "topic_pk": topic_pk}
+        )
+
+        print(f"{'writes':<14}{'replies/s':>10}{'p50':>10}{'p95':>10}{'errors':>8}")
+        for name, enabled in (("direct", False), ("coordinated", True)):
+            write_coordinator.enabled = enabled
+            throughput, timings, errors = run(url, args.posters, args.replies)
+            p50 = percentile(timings, 50) if timings else 0
+            p95 = percentile(timings, 95) if timings else 0
+            print(
+                f"{name:<14}{throughput:>10.1f}{p50:>8.1f}ms{p95:>8.1f}ms"
+                f"{errors:>8}"
+            )
+        print(
+            f"coordinator: {write_coordinator.writes} writes "
+            f"in {write_coordinator.batches} batches"
+        )
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
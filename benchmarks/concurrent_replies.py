@@ -0,0 +1,114 @@
+"""
+Compares reply throughput of concurrent writer processes with the default
+database settings and with the production SQLite profile
+(`DJANGO_DB_PROFILE=production`).
+
+Every writer is a separate process posting replies through the reply view
+into one shared, throwaway database file.
+
+    python -m benchmarks.concurrent_replies --writers 8 --replies 50
+
+"""
+import argparse
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.common import create_reply_database, percentile
+
+PROFILES = ("default", "production")
+
+
+def write_replies(path, board_pk, topic_pk, writer, replies, results):
+    from django.contrib.auth.models import User
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import setup_test_environment
+    from django.urls import reverse
+
+    setup_test_environment()
+    connection.settings_dict["NAME"] = path
+    user, _ = User.objects.get_or_create(username=f"writer_{writer}")
+    client = Client()
+    client.force_login(user)
+    url = reverse("reply_topic", kwargs={"board_pk": board_pk, "topic_pk": topic_pk})
+
+    timings, errors = [], 0
+    started = time.perf_counter()
+    for i in range(replies):
+        request_started = time.perf_counter()
+        try:
+            client.post(url, {"message": f"Reply {i} of writer {writer}"})
+        except Exception:
+            errors += 1
+        else:
+            timings.append((time.perf_counter() - request_started) * 1000)
+    results.put((started, time.perf_counter(), timings, errors))
+
+
+def run(profile, template, board_pk, topic_pk, writers, replies):
+    directory = tempfile.mkdtemp()
+    try:
+        path = str(Path(directory) / "db.sqlite3")
+        shutil.copy(template, path)
+        # Spawned writers read the profile from the environment.
+        os.environ["DJANGO_DB_PROFILE"] = profile
+        context = multiprocessing.get_context("spawn")
+        results = context.Queue()
+        processes = [
+            context.Process(
+                target=write_replies,
+                args=(path, board_pk, topic_pk, writer, replies, results),
+            )
+            for writer in range(writers)
+        ]
+        for process in processes:
+            process.start()
+        outcomes = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+    finally:
+        os.environ.pop("DJANGO_DB_PROFILE", None)
+        shutil.rmtree(directory)
+
+    elapsed = max(end for _, end, _, _ in outcomes) - min(
+        start for start, _, _, _ in outcomes
+    )
+    timings = [
+        timing for _, _, writer_timings, _ in outcomes for timing in writer_timings
+    ]
+    errors = sum(writer_errors for _, _, _, writer_errors in outcomes)
+    return len(timings) / elapsed, timings, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--replies", type=int, default=50)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    try:
+        template = str(Path(directory) / "template.sqlite3")
+        board_pk, topic_pk = create_reply_database(template)
+
+        print(f"{'profile':<12}{'replies/s':>10}{'p50':>10}{'p95':>10}{'errors':>8}")
+        for profile in PROFILES:
+            throughput, timings, errors = run(
+                profile, template, board_pk, topic_pk, args.writers, args.replies
+            )
+            p50 = percentile(timings, 50) if timings else 0
+            p95 = percentile(timings, 95) if timings else 0
+            print(
+                f"{profile:<12}{throughput:>10.1f}{p50:>8.1f}ms{p95:>8.1f}ms"
+                f"{errors:>8}"
+            )
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Compares logged-in renders of the home, board and topic pages with the
+shared template fragments cold (dropped before every request) and warm.
+
+    python -m benchmarks.render_logged_in --boards 20 --topics 30 --posts 10
+
+"""
+import argparse
+
+from benchmarks.common import percentile, test_database, timed
+
+
+def seed(boards: int, topics: int, posts: int):
+    from django.contrib.auth.models import User
+
+    from boards.counters import record_new_post
+    from boards.models import Board, Post, Topic
+
+    users = [
+        User.objects.create_user(username=f"user_{i}", password="bench_password")
+        for i in range(5)
+    ]
+    for b in range(boards):
+        board = Board.objects.create(name=f"Board {b}", description="Benchmark.")
+        for t in range(topics):
+            topic = Topic.objects.create(
+                subject=f"Topic {t}", board=board, starting_user=users[t % 5]
+            )
+            for p in range(posts):
+                post = Post(
+                    message=f"**Post** {p} of _topic_ {t}\n\n* one\n* two",
+                    topic=topic,
+                    created_by=users[p % 5],
+                )
+                post.render_message()
+                post.save()
+                record_new_post(post, new_topic=p == 0)
+    return board, topic
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--boards", type=int, default=20)
+    parser.add_argument("--topics", type=int, default=30)
+    parser.add_argument("--posts", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    with test_database():
+        from django.core.cache import cache
+        from django.core.cache.utils import make_template_fragment_key
+        from django.test import Client
+        from django.urls import reverse
+
+        from boards import views
+        from boards.fragments import BOARD_ROW, POST_BODY, TOPIC_ROW
+        from boards.models import Board
+
+        board, topic = seed(args.boards, args.topics, args.posts)
+        views.TopicListView.paginate_by = args.topics
+        views.PostListView.paginate_by = args.posts
+        urls = {
+            "home": reverse("home"),
+            "board_topics": reverse("board_topics", kwargs={"board_pk": board.pk}),
+            "topic_posts": reverse(
+                "topic_posts", kwargs={"board_pk": board.pk, "topic_pk": topic.pk}
+            ),
+        }
+
+        fragment_keys = [
+            make_template_fragment_key(BOARD_ROW, [pk])
+            for pk in Board.objects.values_list("pk", flat=True)
+        ]
+        fragment_keys += [
+            make_template_fragment_key(TOPIC_ROW, [pk])
+            for pk in board.topics.values_list("pk", flat=True)
+        ]
+        fragment_keys += [
+            make_template_fragment_key(POST_BODY, [pk])
+            for pk in topic.posts.values_list("pk", flat=True)
+        ]
+
+        client = Client()
+        client.login(username="user_0", password="bench_password")
+
+        print(f"{'page':<14}{'cold p50':>10}{'warm p50':>10}{'gain':>8}")
+        for name, url in urls.items():
+
+            def cold():
+                cache.delete_many(fragment_keys)
+                client.get(url)
+
+            cold_timings = timed(cold, args.repeat)
+            client.get(url)
+            warm_timings = timed(lambda: client.get(url), args.repeat)
+
+            cold_p50 = percentile(cold_timings, 50)
+            warm_p50 = percentile(warm_timings, 50)
+            print(
+                f"{name:<14}{cold_p50:>8.2f}ms{warm_p50:>8.2f}ms"
+                f"{(1 - warm_p50 / cold_p50) * 100:>7.0f}%"
+            )
+
+
+if __name__ == "__main__":
+    main()
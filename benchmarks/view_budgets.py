@@ -0,0 +1,213 @@
+"""
+Per-view benchmark with query-count and latency budgets.
+
+Drives the home, topic list and topic pages and the reply and edit posts
+through the test client, logged in, against forums of several sizes
+generated by `seed_forum`. Pages and edits use the largest board and
+topic. Each view gets wall time percentiles, the SQL queries of one
+request and the rendered bytes.
+
+The run fails when a view makes more queries on a larger dataset than on
+the smallest one, or more than its baseline. Latencies depend on the
+machine, so only with `--check-latency` does it also fail when a p50 is
+more than `--tolerance` slower than the baseline, which should then be
+recorded on the same machine. Results are written as JSON, and
+`--update-baseline` stores them as the new baseline.
+
+    python -m benchmarks.view_budgets --datasets small,medium --repeat 30
+    python -m benchmarks.view_budgets --baseline view_budgets.local.json --update-baseline
+    python -m benchmarks.view_budgets --baseline view_budgets.local.json --check-latency
+
+"""
+import argparse
+import json
+import platform
+import sqlite3
+import sys
+import tempfile
+from datetime import datetime, timezone
+from io import StringIO
+from pathlib import Path
+
+from benchmarks.common import summarize, test_database, timed
+
+BASELINE_PATH = Path(__file__).parent / "baselines" / "view_budgets.json"
+
+DATASETS = {
+    "small": {"boards": 5, "users": 100, "topics": 200, "posts": 2000},
+    "medium": {"boards": 10, "users": 1000, "topics": 2000, "posts": 20000},
+    "large": {"boards": 20, "users": 5000, "topics": 20000, "posts": 200000},
+}
+
+
+def seed(sizes: dict):
+    from django.core.management import call_command
+
+    options = [f"--{name}={value}" for name, value in sizes.items()]
+    call_command("seed_forum", *options, stdout=StringIO())
+
+
+def view_requests() -> tuple:
+    """Returns the author of the edited post and the requests of each view."""
+    from django.urls import reverse
+
+    from boards.models import Board
+
+    board = Board.objects.order_by("-posts_count").first()
+    topic = board.topics.order_by("-replies_count").first()
+    post = topic.last_post
+    topic_kwargs = {"board_pk": board.pk, "topic_pk": topic.pk}
+    return post.created_by, {
+        "home": ("get", reverse("home"), None),
+        "board_topics": (
+            "get",
+            reverse("board_topics", kwargs={"board_pk": board.pk}),
+            None,
+        ),
+        "topic_posts": ("get", reverse("topic_posts", kwargs=topic_kwargs), None),
+        "reply_topic": (
+            "post",
+            reverse("reply_topic", kwargs=topic_kwargs),
+            {"message": "Benchmark reply."},
+        ),
+        "edit_post": (
+            "post",
+            reverse("edit_post", kwargs={**topic_kwargs, "post_pk": post.pk}),
+            {"message": "Benchmark edit."},
+        ),
+    }
+
+
+def measure(client, method: str, url: str, data, repeat: int) -> dict:
+    from django.db import connection, reset_queries
+    from django.test.utils import CaptureQueriesContext
+
+    def request():
+        response = getattr(client, method)(url, data)
+        assert response.status_code in (200, 302), (url, response.status_code)
+        return response
+
+    request()
+    reset_queries()
+    with CaptureQueriesContext(connection) as queries:
+        response = request()
+    return {
+        **summarize(timed(request, repeat)),
+        "queries": len(queries),
+        "bytes": len(response.content),
+    }
+
+
+def run_dataset(sizes: dict, repeat: int) -> dict:
+    from django.test import Client
+
+    # A file per dataset, the in-memory test database outlives its teardown.
+    with tempfile.TemporaryDirectory() as directory, test_database(
+        str(Path(directory) / "db.sqlite3")
+    ):
+        seed(sizes)
+        user, requests = view_requests()
+        client = Client()
+        client.force_login(user)
+        return {
+            name: measure(client, *request, repeat)
+            for name, request in requests.items()
+        }
+
+
+def check(results: dict, baseline: dict, tolerance: float = None) -> list:
+    """Budget failures, latencies compared only with a `tolerance`."""
+    failures = []
+    smallest = next(iter(results))
+    for dataset, views in results.items():
+        for view, result in views.items():
+            reference = results[smallest][view]["queries"]
+            if result["queries"] > reference:
+                failures.append(
+                    f"{dataset}/{view}: {result['queries']} queries, "
+                    f"{reference} on {smallest}"
+                )
+            expected = baseline.get(dataset, {}).get(view)
+            if expected is None:
+                continue
+            if result["queries"] > expected["queries"]:
+                failures.append(
+                    f"{dataset}/{view}: {result['queries']} queries, "
+                    f"baseline {expected['queries']}"
+                )
+            if tolerance is None:
+                continue
+            if result["p50"] > expected["p50"] * (1 + tolerance):
+                failures.append(
+                    f"{dataset}/{view}: p50 {result['p50']:.2f}ms, "
+                    f"baseline {expected['p50']:.2f}ms"
+                )
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--datasets",
+        default=",".join(DATASETS),
+        help="Comma-separated datasets, smallest first.",
+    )
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument(
+        "--check-latency",
+        action="store_true",
+        help="Also fail on p50 latencies slower than a baseline from this machine.",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.5,
+        help="Allowed p50 slowdown over the baseline, as a fraction.",
+    )
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--output", type=Path, help="Writes the results as JSON.")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'view':<24}{'p50':>10}{'p95':>10}{'queries':>9}{'bytes':>9}")
+    for dataset in args.datasets.split(","):
+        results[dataset] = run_dataset(DATASETS[dataset], args.repeat)
+        for view, result in results[dataset].items():
+            print(
+                f"{dataset + '/' + view:<24}{result['p50']:>8.2f}ms"
+                f"{result['p95']:>8.2f}ms{result['queries']:>9}{result['bytes']:>9}"
+            )
+
+    baseline = {}
+    if args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())["results"]
+    failures = check(
+        results, baseline, args.tolerance if args.check_latency else None
+    )
+
+    import django
+
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "repeat": args.repeat,
+        "datasets": {dataset: DATASETS[dataset] for dataset in results},
+        "results": results,
+        "failures": failures,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+    if args.update_baseline:
+        args.baseline.parent.mkdir(exist_ok=True)
+        args.baseline.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"Baseline written to {args.baseline}.")
+    elif failures:
+        print("Budgets exceeded:", *failures, sep="\n  ")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
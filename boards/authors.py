@@ -0,0 +1,42 @@
+"""
+Cached numbers of posts written by each user, shown next to the posts.
+
+Counts are read for all the authors of a page at once, missing ones are
+computed with a single grouped query. The cached count of a user is
+dropped whenever one of their posts is created or deleted.
+
+"""
+
+from django.core.cache import cache
+from django.db.models import Count
+
+from boards.models import Post
+from django_learning.settings import AUTHOR_POSTS_COUNT_TIMEOUT
+
+CACHE_KEY = "author-posts-count:{}"
+
+
+def get_posts_counts(user_pks) -> dict:
+    keys = {CACHE_KEY.format(user_pk): user_pk for user_pk in set(user_pks)}
+    cached = cache.get_many(keys)
+    counts = {keys[key]: count for key, count in cached.items()}
+
+    missing = [user_pk for key, user_pk in keys.items() if key not in cached]
+    if missing:
+        computed = dict.fromkeys(missing, 0)
+        computed.update(
+            Post.objects.filter(created_by__in=missing)
+            .order_by()
+            .values_list("created_by")
+            .annotate(Count("pk"))
+        )
+        cache.set_many(
+            {CACHE_KEY.format(user_pk): count for user_pk, count in computed.items()},
+            timeout=AUTHOR_POSTS_COUNT_TIMEOUT,
+        )
+        counts.update(computed)
+    return counts
+
+
+def invalidate_posts_count(user_pk):
+    cache.delete(CACHE_KEY.format(user_pk))
@@ -0,0 +1,129 @@
+"""
+In-process prefix index of topic subjects for type-ahead suggestions.
+
+Each board (and the whole forum, under the `None` key) gets a sorted list
+of `(casefolded subject, subject, topic pk)` tuples, loaded lazily on the
+first lookup and searched with `bisect`, so a keystroke never hits the
+database once the index is warm. New topics are inserted into the loaded
+indexes as they are created.
+
+Memory is bounded by `SUBJECT_INDEX_MAX_ENTRIES` subjects and
+`SUBJECT_INDEX_MAX_INDEXES` indexes kept in all: the least recently used
+indexes are evicted first. Empty indexes are not kept, and looking up a
+board which does not exist raises `Board.DoesNotExist`. Indexes
+older than `SUBJECT_INDEX_TTL` seconds are reloaded, which picks up topics
+created by other processes.
+
+"""
+
+import bisect
+import itertools
+import threading
+import time
+from collections import OrderedDict
+
+from django.apps import apps
+
+from django_learning.settings import (
+    SUBJECT_INDEX_MAX_ENTRIES,
+    SUBJECT_INDEX_MAX_INDEXES,
+    SUBJECT_INDEX_TTL,
+)
+
+ALL_BOARDS = None
+
+
+class SubjectIndex:
+    def __init__(self, entries):
+        self.entries = sorted(entries)
+        self.loaded_at = time.monotonic()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, subject: str, topic_pk: int):
+        bisect.insort(self.entries, (subject.casefold(), subject, topic_pk))
+
+    def suggest(self, prefix: str, limit: int) -> list:
+        prefix = prefix.casefold()
+        start = bisect.bisect_left(self.entries, (prefix,))
+        suggestions = []
+        for key, subject, topic_pk in itertools.islice(self.entries, start, None):
+            if not key.startswith(prefix) or len(suggestions) == limit:
+                break
+            suggestions.append((subject, topic_pk))
+        return suggestions
+
+
+class SubjectIndexes:
+    def __init__(self, max_entries: int, max_indexes: int, ttl: float):
+        self.max_entries = max_entries
+        self.max_indexes = max_indexes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._indexes = OrderedDict()
+
+    @property
+    def size(self) -> int:
+        return sum(len(index) for index in self._indexes.values())
+
+    def _load(self, board_pk) -> SubjectIndex:
+        topics = apps.get_model("boards", "Topic").objects.all()
+        if board_pk is not ALL_BOARDS:
+            topics = topics.filter(board=board_pk)
+        rows = topics.order_by().values_list("subject", "pk")
+        # Subjects past the limit could never stay in memory anyway.
+        rows = rows[: self.max_entries]
+        return SubjectIndex(
+            (subject.casefold(), subject, topic_pk) for subject, topic_pk in rows
+        )
+
+    def _get(self, board_pk) -> SubjectIndex:
+        with self._lock:
+            index = self._indexes.get(board_pk)
+            if index is not None and time.monotonic() - index.loaded_at < self.ttl:
+                self._indexes.move_to_end(board_pk)
+                return index
+
+        index = self._load(board_pk)
+        if not index:
+            if board_pk is not ALL_BOARDS:
+                Board = apps.get_model("boards", "Board")
+                if not Board.objects.filter(pk=board_pk).exists():
+                    raise Board.DoesNotExist
+            return index
+        with self._lock:
+            self._indexes[board_pk] = index
+            self._indexes.move_to_end(board_pk)
+            self._evict()
+        return index
+
+    def _evict(self):
+        size = self.size
+        while len(self._indexes) > 1 and (
+            size > self.max_entries or len(self._indexes) > self.max_indexes
+        ):
+            _, evicted = self._indexes.popitem(last=False)
+            size -= len(evicted)
+
+    def suggest(self, prefix: str, board_pk=ALL_BOARDS, limit: int = 10) -> list:
+        if not prefix:
+            return []
+        return self._get(board_pk).suggest(prefix, limit)
+
+    def add_topic(self, topic):
+        """Inserts a new topic into the board and forum indexes, if loaded."""
+        with self._lock:
+            for board_pk in (topic.board_id, ALL_BOARDS):
+                if index := self._indexes.get(board_pk):
+                    index.add(topic.subject, topic.pk)
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._indexes.clear()
+
+
+subject_indexes = SubjectIndexes(
+    SUBJECT_INDEX_MAX_ENTRIES, SUBJECT_INDEX_MAX_INDEXES, SUBJECT_INDEX_TTL
+)
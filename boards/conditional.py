@@ -0,0 +1,99 @@
+"""
+Conditional GET (`ETag` / `Last-Modified`) for the board and topic pages.
+
+Validators are computed before the view does any work, from one indexed
+lookup of the stored timestamps and counters of the board or topic, and
+from the page cache generations, which writers bump on every change the
+stored columns do not show (edits, deletions). The `ETag` also covers the
+full path, so every page and cursor has its own validator, and the user,
+so a page rendered for somebody else never validates.
+
+View and reader counts and the authors' post counts are left out, like in
+the page cache: they are approximate and may be a little behind on a
+`304 Not Modified`.
+
+"""
+import hashlib
+from datetime import datetime
+
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.http import http_date, quote_etag
+
+from boards.pagecache import get_generations
+
+
+def _timestamp(value) -> float:
+    """Seconds since the epoch of a datetime or of a `time_ns()` generation."""
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return value / 1e9
+
+
+class ConditionalGetMixin:
+    """
+    Class-based view mixin answering `If-None-Match` and `If-Modified-Since`
+    before dispatching. Views return the stored state of what they show from
+    `get_validators()`, as `(last modified datetime, *other values)`, or
+    `None` when there is nothing to compare (e.g. unknown pk), and list the
+    page cache scopes they depend on in `get_page_cache_scopes()`. Views may
+    react to served `304` responses in `not_modified()`. It goes after
+    `AnonymousPageCacheMixin`, which keeps the validators of cached pages.
+
+    """
+
+    def get_validators(self):
+        raise NotImplementedError
+
+    def get_page_cache_scopes(self):
+        raise NotImplementedError
+
+    def not_modified(self, request):
+        pass
+
+    def get_conditional_headers(self, request):
+        validators = self.get_validators()
+        if validators is None:
+            return None, None
+        last_modified, *values = validators
+
+        generations = get_generations(self.get_page_cache_scopes())
+        parts = [request.get_full_path(), request.user.pk, last_modified, *values]
+        parts += [f"{scope}={generations[scope]}" for scope in sorted(generations)]
+        etag = hashlib.sha1("|".join(map(str, parts)).encode()).hexdigest()
+
+        timestamps = [_timestamp(value) for value in generations.values()]
+        if last_modified is not None:
+            timestamps.append(_timestamp(last_modified))
+        return quote_etag(etag), int(max(timestamps))
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return super().dispatch(request, *args, **kwargs)
+
+        self.request, self.args, self.kwargs = request, args, kwargs
+        etag, last_modified = self.get_conditional_headers(request)
+        if etag is None:
+            return super().dispatch(request, *args, **kwargs)
+
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is not None:
+            self.not_modified(request)
+        else:
+            response = super().dispatch(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+        # Browsers revalidate every time and only with the same session.
+        patch_cache_control(response, no_cache=True)
+        if request.user.is_authenticated:
+            patch_cache_control(response, private=True)
+        patch_vary_headers(response, ("Cookie",))
+        return response
@@ -0,0 +1,53 @@
+"""
+Maintenance of the denormalized counters and last post pointers
+stored on `Board` and `Topic`.
+
+All the updates use `F()` expressions, so concurrent writers never
+overwrite each other's increments. Callers are expected to run them in
+the same transaction as the post insert or delete they describe.
+
+"""
+from django.db.models import F, OuterRef, Subquery
+from django.db.models.functions import Greatest
+
+from boards.models import Board, Post, Topic
+
+
+def _latest_post(**filters):
+    posts = Post.objects.filter(**filters).order_by("-created_at", "-pk")
+    return Subquery(posts.values("pk")[:1])
+
+
+def record_new_post(post: Post, new_topic: bool = False):
+    """Counts in a freshly saved post and makes it the last one of its topic and board."""
+    topic_changes = {"last_post": post, "last_updated": post.created_at}
+    if not new_topic:
+        topic_changes["replies_count"] = F("replies_count") + 1
+    Topic.objects.filter(pk=post.topic_id).update(**topic_changes)
+
+    board_changes = {
+        "posts_count": F("posts_count") + 1,
+        "last_post": post,
+        "last_updated": post.created_at,
+    }
+    if new_topic:
+        board_changes["topics_count"] = F("topics_count") + 1
+    Board.objects.filter(topics__pk=post.topic_id).update(**board_changes)
+
+
+def record_deleted_post(post: Post):
+    """Counts out a deleted post and recomputes the last post pointers."""
+    Topic.objects.filter(pk=post.topic_id).update(
+        replies_count=Greatest(F("replies_count") - 1, 0),
+        last_post=_latest_post(topic=OuterRef("pk")),
+    )
+    Board.objects.filter(topics__pk=post.topic_id).update(
+        posts_count=Greatest(F("posts_count") - 1, 0),
+        last_post=_latest_post(topic__board=OuterRef("pk")),
+    )
+
+
+def record_deleted_topic(topic: Topic):
+    Board.objects.filter(pk=topic.board_id).update(
+        topics_count=Greatest(F("topics_count") - 1, 0)
+    )
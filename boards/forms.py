@@ -1,5 +1,5 @@
 from django import forms
-from boards.models import Topic, Post
+from boards.models import Board, Topic, Post
 
 
 class NewTopicForm(forms.ModelForm):
@@ -14,9 +14,21 @@ class NewTopicForm(forms.ModelForm):
     class Meta:
         model = Topic
         fields = ["subject", "message"]
+        widgets = {
+            "subject": forms.TextInput(
+                attrs={"list": "subject-suggestions", "autocomplete": "off"}
+            )
+        }
 
 
 class PostForm(forms.ModelForm):
     class Meta:
         model = Post
         fields = ["message", ]
+
+
+class SearchForm(forms.Form):
+    q = forms.CharField(max_length=200, required=False, label="Search")
+    board = forms.ModelChoiceField(
+        queryset=Board.objects.all(), required=False, empty_label="All boards"
+    )
@@ -0,0 +1,22 @@
+"""
+Invalidation of the cached template fragments shared by all users.
+
+`home.html` caches a `board_row` per board, `topics.html` a `topic_row` per
+topic and `topic_posts.html` a `post_body` per post. The fragments are
+dropped from model signals, once the transaction commits. Relative times
+are rendered outside of them, so that they do not go stale.
+
+"""
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.db import transaction
+
+BOARD_ROW = "board_row"
+TOPIC_ROW = "topic_row"
+POST_BODY = "post_body"
+
+
+def invalidate_fragments(*fragments):
+    """Drops `(fragment name, vary_on)` fragments after the current transaction."""
+    keys = [make_template_fragment_key(name, vary_on) for name, vary_on in fragments]
+    transaction.on_commit(lambda: cache.delete_many(keys))
@@ -0,0 +1,20 @@
+import json
+
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Prints the hit ratios, evictions and memory use of the cache tiers, "
+        "with the figures published by every worker process."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--alias", default="default", help="Cache alias.")
+
+    def handle(self, *args, **options):
+        cache = caches[options["alias"]]
+        if not hasattr(cache, "get_stats"):
+            raise CommandError(f"{type(cache).__name__} does not report statistics.")
+        self.stdout.write(json.dumps(cache.get_stats(), indent=2))
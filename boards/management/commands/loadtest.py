@@ -0,0 +1,379 @@
+"""
+Closed-loop load test of the forum over HTTP.
+
+Every virtual user sends its next request as soon as the previous one
+answered, picking each time between an anonymous read, a logged-in read,
+a reply and a signup according to `--mix`. Reads go to the home page,
+board pages and topic pages of the most recently updated topics. Logged-in
+users are the ones generated by `seed_forum`. Form posts fetch the form
+first, so they carry the CSRF token and cookie like a browser.
+
+Unless `--url` points at a running server, the command starts `runserver`
+on a free local port for the duration of the test. Replies and signups
+are written to the database of that server.
+
+"""
+import asyncio
+import bisect
+import random
+import re
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+
+import aiohttp
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from boards.models import Topic
+
+SCENARIOS = ("anonymous", "reader", "reply", "signup")
+HISTOGRAM_BOUNDS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+HISTOGRAM_WIDTH = 40
+SIGNUP_PASSWORD = "Load-test-passw0rd!"
+
+CSRF_RE = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+
+
+def parse_mix(value: str) -> dict:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name not in SCENARIOS or not weight.isdigit():
+            raise CommandError(
+                f"--mix expects scenario=weight pairs of {', '.join(SCENARIOS)}, "
+                f"got {part!r}."
+            )
+        mix[name] = int(weight)
+    if not sum(mix.values()):
+        raise CommandError("--mix needs a positive weight.")
+    return mix
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(timings: list, percent: float) -> float:
+    return timings[min(int(len(timings) * percent / 100), len(timings) - 1)]
+
+
+class Stats:
+    """Latencies in milliseconds and failures of each kind of request."""
+
+    def __init__(self):
+        self.timings = defaultdict(list)
+        self.errors = defaultdict(Counter)
+
+    def record(self, name: str, elapsed: float, error: str = None):
+        self.timings[name].append(elapsed * 1000)
+        if error is not None:
+            self.errors[name][error] += 1
+
+    def histogram(self) -> list:
+        timings = sorted(t for timings in self.timings.values() for t in timings)
+        counts, start = [], 0
+        for bound in HISTOGRAM_BOUNDS + (float("inf"),):
+            end = bisect.bisect_right(timings, bound)
+            counts.append((bound, end - start))
+            start = end
+        return counts
+
+
+class LoadTest:
+    def __init__(self, base_url: str, mix: dict, users: list, topics: list, seed):
+        self.base_url = base_url.rstrip("/")
+        self.scenarios = list(mix)
+        self.weights = list(mix.values())
+        self.users = users
+        self.topics = topics
+        self.rng = random.Random(seed)
+        self.stats = Stats()
+        self.signups = 0
+
+    def url(self, path: str) -> str:
+        return self.base_url + path
+
+    def read_path(self) -> str:
+        board_pk, topic_pk = self.rng.choice(self.topics)
+        return self.rng.choice(
+            (
+                reverse("home"),
+                reverse("board_topics", kwargs={"board_pk": board_pk}),
+                reverse(
+                    "topic_posts", kwargs={"board_pk": board_pk, "topic_pk": topic_pk}
+                ),
+            )
+        )
+
+    async def request(self, session, name, method, path, expect=None, **kwargs):
+        """Sends a request, records it and returns the body, None on failure."""
+        started = time.perf_counter()
+        try:
+            async with session.request(
+                method, self.url(path), allow_redirects=False, **kwargs
+            ) as response:
+                body = await response.text()
+                ok = (
+                    response.status == expect
+                    if expect is not None
+                    else response.status < 400
+                )
+                error = None if ok else f"HTTP {response.status}"
+        except (aiohttp.ClientError, asyncio.TimeoutError) as exception:
+            body, error = None, type(exception).__name__
+        self.stats.record(name, time.perf_counter() - started, error)
+        return body if error is None else None
+
+    async def submit(self, session, name, path, data, expect=302) -> bool:
+        """Posts the form of the page like a browser, with its CSRF token."""
+        page = await self.request(session, f"{name} form", "GET", path)
+        token = CSRF_RE.search(page or "")
+        if token is None:
+            return False
+        data = {"csrfmiddlewaretoken": token.group(1), **data}
+        response = await self.request(
+            session, name, "POST", path, expect=expect, data=data
+        )
+        return response is not None
+
+    async def log_in(self, session, username: str, password: str) -> bool:
+        return await self.submit(
+            session,
+            "login",
+            reverse("login"),
+            {"username": username, "password": password},
+        )
+
+    async def reply(self, session):
+        board_pk, topic_pk = self.rng.choice(self.topics)
+        path = reverse(
+            "reply_topic", kwargs={"board_pk": board_pk, "topic_pk": topic_pk}
+        )
+        await self.submit(session, "reply", path, {"message": "Load test reply."})
+
+    async def signup(self, prefix: str):
+        self.signups += 1
+        username = f"{prefix}{self.signups}"
+        async with aiohttp.ClientSession(
+            cookie_jar=aiohttp.CookieJar(unsafe=True)
+        ) as session:
+            await self.submit(
+                session,
+                "signup",
+                reverse("signup"),
+                {
+                    "username": username,
+                    "email": f"{username}@example.com",
+                    "password1": SIGNUP_PASSWORD,
+                    "password2": SIGNUP_PASSWORD,
+                },
+            )
+
+    async def virtual_user(self, number, password, deadline, signup_prefix):
+        # Cookie jars of IP address hosts need `unsafe`.
+        jar, anonymous_jar = (aiohttp.CookieJar(unsafe=True) for _ in range(2))
+        async with aiohttp.ClientSession(
+            cookie_jar=jar
+        ) as session, aiohttp.ClientSession(cookie_jar=anonymous_jar) as anonymous:
+            username = self.users[number % len(self.users)] if self.users else None
+            logged_in = username is not None and await self.log_in(
+                session, username, password
+            )
+            while time.monotonic() < deadline:
+                scenario = self.rng.choices(self.scenarios, self.weights)[0]
+                if scenario == "anonymous":
+                    await self.request(anonymous, "read", "GET", self.read_path())
+                elif scenario == "signup":
+                    await self.signup(signup_prefix)
+                elif not logged_in:
+                    logged_in = await self.log_in(session, username, password)
+                elif scenario == "reader":
+                    await self.request(
+                        session, "read (logged in)", "GET", self.read_path()
+                    )
+                else:
+                    await self.reply(session)
+
+    async def run(self, concurrency, duration, password, signup_prefix) -> float:
+        deadline = time.monotonic() + duration
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(
+                self.virtual_user(number, password, deadline, signup_prefix)
+                for number in range(concurrency)
+            )
+        )
+        return time.perf_counter() - started
+
+
+class Command(BaseCommand):
+    help = (
+        "Fires a closed-loop mix of anonymous reads, logged-in reads, replies "
+        "and signups at the forum and reports throughput, errors and latencies."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--url",
+            help="Base URL of a running server, instead of starting runserver.",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=20,
+            help="Number of virtual users sending requests at once.",
+        )
+        parser.add_argument(
+            "--duration",
+            type=float,
+            default=30,
+            help="Seconds during which the virtual users start new requests.",
+        )
+        parser.add_argument(
+            "--mix",
+            type=parse_mix,
+            default="anonymous=60,reader=25,reply=10,signup=5",
+            help="Relative weights of the scenarios.",
+        )
+        parser.add_argument(
+            "--user-prefix",
+            default="seed0_",
+            help="Username prefix of the logged-in users, as made by seed_forum.",
+        )
+        parser.add_argument(
+            "--password",
+            default="password",
+            help="Password of the logged-in users.",
+        )
+        parser.add_argument(
+            "--topics",
+            type=int,
+            default=1000,
+            help="Number of recently updated topics the reads and replies go to.",
+        )
+        parser.add_argument("--seed", type=int, help="Seed of the scenario picks.")
+
+    def handle(self, *args, **options):
+        mix = options["mix"]
+        users = list(
+            User.objects.filter(username__startswith=options["user_prefix"])
+            .order_by("pk")
+            .values_list("username", flat=True)[: options["concurrency"]]
+        )
+        if not users and (mix.get("reader") or mix.get("reply")):
+            raise CommandError(
+                f"No user named {options['user_prefix']}*, run seed_forum first."
+            )
+        topics = list(
+            Topic.objects.order_by("-last_updated").values_list("board", "pk")[
+                : options["topics"]
+            ]
+        )
+        if not topics:
+            raise CommandError("No topic to read, run seed_forum first.")
+
+        server = None
+        base_url = options["url"]
+        if base_url is None:
+            base_url, server = self.start_server()
+        try:
+            if server is not None:
+                asyncio.run(self.wait_until_up(base_url))
+            load_test = LoadTest(base_url, mix, users, topics, options["seed"])
+            signup_prefix = f"loadtest_{int(time.time())}_"
+            elapsed = asyncio.run(
+                load_test.run(
+                    options["concurrency"],
+                    options["duration"],
+                    options["password"],
+                    signup_prefix,
+                )
+            )
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+        self.report(load_test.stats, elapsed)
+
+    def start_server(self):
+        port = free_port()
+        manage = Path(settings.BASE_DIR) / "manage.py"
+        server = subprocess.Popen(
+            [
+                sys.executable,
+                str(manage),
+                "runserver",
+                "--noreload",
+                f"127.0.0.1:{port}",
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        self.stdout.write(f"Started runserver on port {port}.")
+        return f"http://127.0.0.1:{port}", server
+
+    async def wait_until_up(self, base_url: str, timeout: float = 30):
+        deadline = time.monotonic() + timeout
+        async with aiohttp.ClientSession() as session:
+            while True:
+                try:
+                    async with session.get(base_url + reverse("home")):
+                        return
+                except aiohttp.ClientError:
+                    if time.monotonic() > deadline:
+                        raise CommandError(f"{base_url} did not answer.")
+                    await asyncio.sleep(0.2)
+
+    def report(self, stats: Stats, elapsed: float):
+        total = sum(len(timings) for timings in stats.timings.values())
+        errors = sum(sum(counts.values()) for counts in stats.errors.values())
+        self.stdout.write(
+            f"{'request':<20}{'count':>8}{'errors':>8}{'req/s':>9}"
+            f"{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}"
+        )
+        for name, timings in sorted(stats.timings.items()):
+            timings.sort()
+            self.stdout.write(
+                f"{name:<20}{len(timings):>8}{stats.errors[name].total():>8}"
+                f"{len(timings) / elapsed:>9.1f}"
+                + "".join(
+                    f"{value:>8.1f}ms"
+                    for value in (
+                        percentile(timings, 50),
+                        percentile(timings, 95),
+                        percentile(timings, 99),
+                        timings[-1],
+                    )
+                )
+            )
+
+        for name, counts in sorted(stats.errors.items()):
+            for error, count in counts.most_common():
+                self.stdout.write(self.style.ERROR(f"{name}: {count} x {error}"))
+
+        self.stdout.write("\nlatency histogram")
+        histogram = stats.histogram()
+        largest = max(count for _, count in histogram) or 1
+        lower = 0
+        for bound, count in histogram:
+            label = f"{lower}-{bound}ms" if bound != float("inf") else f">{lower}ms"
+            bar = "#" * round(count / largest * HISTOGRAM_WIDTH)
+            self.stdout.write(f"{label:>14} {count:>8} {bar}")
+            lower = bound
+
+        style = self.style.SUCCESS if not errors else self.style.ERROR
+        self.stdout.write(
+            style(
+                f"\n{total} requests in {elapsed:.1f}s, {total / elapsed:.1f} req/s, "
+                f"{errors} errors ({errors / max(total, 1):.1%})."
+            )
+        )
@@ -0,0 +1,87 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Min
+
+from boards.models import Post, Topic
+from boards.search import INDEX_TABLE, clean_text
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the full-text search index from the posts, batch by batch."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Number of posts inserted into the index per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        started = time.monotonic()
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {INDEX_TABLE}")
+
+        posts = Post.objects.order_by("pk").values_list(
+            "pk", "message", "topic__board", "topic"
+        )
+        indexed = self.insert_batches(
+            f"INSERT INTO {INDEX_TABLE} (rowid, subject, message, board_id, topic_id) "
+            f"VALUES (%s, '', %s, %s, %s)",
+            (
+                (pk, clean_text(message), board_pk, topic_pk)
+                for pk, message, board_pk, topic_pk in posts.iterator(batch_size)
+            ),
+            batch_size,
+            "posts",
+        )
+
+        first_posts = (
+            Topic.objects.order_by("pk")
+            .annotate(first_post=Min("posts"))
+            .filter(first_post__isnull=False)
+            .values_list("subject", "first_post")
+        )
+        self.insert_batches(
+            f"UPDATE {INDEX_TABLE} SET subject = %s WHERE rowid = %s",
+            (
+                (clean_text(subject), post_pk)
+                for subject, post_pk in first_posts.iterator(batch_size)
+            ),
+            batch_size,
+            "subjects",
+        )
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {INDEX_TABLE} ({INDEX_TABLE}) VALUES ('optimize')"
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Indexed {indexed} posts in {time.monotonic() - started:.1f}s."
+            )
+        )
+
+    def insert_batches(self, sql, rows, batch_size, name):
+        done = 0
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == batch_size:
+                done += self.write(sql, batch)
+                self.stdout.write(f"{name}: {done} indexed")
+                batch = []
+        if batch:
+            done += self.write(sql, batch)
+            self.stdout.write(f"{name}: {done} indexed")
+        return done
+
+    def write(self, sql, batch):
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.executemany(sql, batch)
+        return len(batch)
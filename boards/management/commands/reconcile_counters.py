@@ -0,0 +1,156 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery
+
+from boards.models import Board, Post, Topic
+
+PHASES = ("topics", "boards")
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes the denormalized counters and last post pointers of topics "
+        "and boards, chunk by chunk, and fixes the rows which drifted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Number of topics or boards recounted per query.",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            type=Path,
+            help="File storing the progress, so an interrupted run can be resumed.",
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Continue from the position saved in the checkpoint file.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report the drifted rows without writing them.",
+        )
+
+    def handle(self, *args, **options):
+        self.chunk_size = options["chunk_size"]
+        self.checkpoint = options["checkpoint"]
+        self.dry_run = options["dry_run"]
+
+        phase, last_pk = PHASES[0], 0
+        if options["resume"] and self.checkpoint and self.checkpoint.exists():
+            state = json.loads(self.checkpoint.read_text())
+            phase, last_pk = state["phase"], state["last_pk"]
+            self.stdout.write(f"Resuming {phase} after pk {last_pk}.")
+
+        for name in PHASES[PHASES.index(phase) :]:
+            reconcile = getattr(self, f"reconcile_{name}")
+            self.run_phase(name, reconcile, last_pk)
+            last_pk = 0
+
+        if self.checkpoint and not self.dry_run:
+            self.checkpoint.unlink(missing_ok=True)
+
+    def run_phase(self, name, reconcile, last_pk):
+        model = Topic if name == "topics" else Board
+        checked = fixed = 0
+        while True:
+            pks = list(
+                model.objects.filter(pk__gt=last_pk)
+                .order_by("pk")
+                .values_list("pk", flat=True)[: self.chunk_size]
+            )
+            if not pks:
+                break
+
+            with transaction.atomic():
+                fixed += reconcile(pks)
+            checked += len(pks)
+            last_pk = pks[-1]
+            self.save_checkpoint(name, last_pk)
+            self.stdout.write(
+                f"{name}: {checked} checked, {fixed} fixed (up to pk {last_pk})"
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(f"{name}: done, {checked} checked, {fixed} fixed.")
+        )
+
+    def save_checkpoint(self, phase, last_pk):
+        if self.checkpoint and not self.dry_run:
+            self.checkpoint.write_text(json.dumps({"phase": phase, "last_pk": last_pk}))
+
+    def reconcile_topics(self, pks):
+        posts_counts = dict(
+            Post.objects.filter(topic__in=pks)
+            .order_by()
+            .values_list("topic")
+            .annotate(Count("pk"))
+        )
+        latest_post = Post.objects.filter(topic=OuterRef("pk")).order_by(
+            "-created_at", "-pk"
+        )
+        topics = Topic.objects.filter(pk__in=pks).annotate(
+            actual_last_post=Subquery(latest_post.values("pk")[:1])
+        )
+
+        changed = []
+        for topic in topics.only("pk", "replies_count", "last_post"):
+            replies_count = max(posts_counts.get(topic.pk, 0) - 1, 0)
+            if (topic.replies_count, topic.last_post_id) != (
+                replies_count,
+                topic.actual_last_post,
+            ):
+                topic.replies_count = replies_count
+                topic.last_post_id = topic.actual_last_post
+                changed.append(topic)
+
+        if changed and not self.dry_run:
+            Topic.objects.bulk_update(changed, ["replies_count", "last_post"])
+        return len(changed)
+
+    def reconcile_boards(self, pks):
+        posts_counts = dict(
+            Post.objects.filter(topic__board__in=pks)
+            .order_by()
+            .values_list("topic__board")
+            .annotate(Count("pk"))
+        )
+        topics_counts = dict(
+            Topic.objects.filter(board__in=pks)
+            .order_by()
+            .values_list("board")
+            .annotate(Count("pk"))
+        )
+        latest_post = Topic.objects.filter(
+            board=OuterRef("pk"), last_post__isnull=False
+        ).order_by("-last_post__created_at", "-last_post")
+        boards = Board.objects.filter(pk__in=pks).annotate(
+            actual_last_post=Subquery(latest_post.values("last_post")[:1])
+        )
+
+        changed = []
+        fields = ("posts_count", "topics_count", "last_post_id")
+        for board in boards.only("pk", "posts_count", "topics_count", "last_post"):
+            actual = (
+                posts_counts.get(board.pk, 0),
+                topics_counts.get(board.pk, 0),
+                board.actual_last_post,
+            )
+            if tuple(getattr(board, field) for field in fields) != actual:
+                for field, value in zip(fields, actual):
+                    setattr(board, field, value)
+                changed.append(board)
+
+        if changed and not self.dry_run:
+            Board.objects.bulk_update(
+                changed, ["posts_count", "topics_count", "last_post"]
+            )
+        return len(changed)
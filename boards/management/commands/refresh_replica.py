@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from boards import replicas
+from django_learning.settings import REPLICA_PATH, REPLICA_REFRESH_INTERVAL
+
+
+class Command(BaseCommand):
+    help = (
+        "Copies the primary database into the read replica with the SQLite "
+        "online backup API, once or every --interval seconds."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=REPLICA_REFRESH_INTERVAL,
+            help="Seconds between the starts of two refreshes.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Refresh the replica once and exit.",
+        )
+        parser.add_argument(
+            "--pages",
+            type=int,
+            default=-1,
+            help="Pages copied per backup step, all of them by default.",
+        )
+
+    def handle(self, *args, **options):
+        if not replicas.is_configured():
+            raise CommandError("DJANGO_REPLICA_PATH is not set.")
+        primary_path = connections["default"].settings_dict["NAME"]
+
+        while True:
+            started = time.monotonic()
+            replicas.refresh(primary_path, REPLICA_PATH, pages=options["pages"])
+            elapsed = time.monotonic() - started
+            self.stdout.write(f"Replica refreshed in {elapsed:.2f}s.")
+            if options["once"]:
+                break
+            time.sleep(max(options["interval"] - elapsed, 0))
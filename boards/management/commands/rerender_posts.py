@@ -0,0 +1,156 @@
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, time as dt_time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from boards.markup import RENDERER_VERSION, render_messages
+from boards.models import Post
+
+# Rows per UPDATE, each one takes two parameters per field and row.
+BULK_UPDATE_BATCH_SIZE = 200
+
+
+def parse_since(value: str) -> datetime:
+    since = parse_datetime(value)
+    if since is None and (day := parse_date(value)):
+        since = datetime.combine(day, dt_time.min)
+    if since is None:
+        raise CommandError(f"--since expects a date or a datetime, got {value!r}.")
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-renders the stored markdown HTML of posts in parallel, e.g. after "
+        "upgrading markdown or changing the renderer settings."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Number of posts sent to a worker and written back at once.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count(),
+            help=(
+                "Number of rendering processes, defaults to the number of cores, "
+                "1 renders in this process."
+            ),
+        )
+        parser.add_argument(
+            "--board",
+            type=int,
+            action="append",
+            dest="boards",
+            help="Only re-render posts of the board with given pk, can be repeated.",
+        )
+        parser.add_argument(
+            "--since",
+            type=parse_since,
+            help="Only re-render posts created or edited since given date or datetime.",
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Re-render posts already rendered with the current renderer too.",
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.all()
+        if not options["all"]:
+            posts = posts.exclude(message_html_version=RENDERER_VERSION)
+        if options["boards"]:
+            posts = posts.filter(topic__board__in=options["boards"])
+        if since := options["since"]:
+            posts = posts.filter(Q(created_at__gte=since) | Q(updated_at__gte=since))
+
+        chunk_size = options["chunk_size"]
+        workers = max(options["workers"], 1)
+        self.rendered = 0
+        self.skipped = 0
+        self.started = time.monotonic()
+
+        chunks = self.iter_chunks(posts, chunk_size)
+        if workers == 1:
+            # No pool, e.g. inside the daemonic test runner processes that
+            # cannot have children.
+            for pks, messages in chunks:
+                self.write_back(pks, messages, render_messages(messages))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                in_flight = deque()
+                for pks, messages in chunks:
+                    future = executor.submit(render_messages, messages)
+                    in_flight.append((pks, messages, future))
+                    if len(in_flight) >= workers * 2:
+                        self.write_back_future(*in_flight.popleft())
+                while in_flight:
+                    self.write_back_future(*in_flight.popleft())
+
+        elapsed = time.monotonic() - self.started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Re-rendered {self.rendered} posts in {elapsed:.1f}s "
+                f"({self.rendered / max(elapsed, 1e-9):.0f} posts/sec), "
+                f"{self.skipped} edited meanwhile and skipped."
+            )
+        )
+
+    def iter_chunks(self, posts, chunk_size):
+        rows = posts.order_by("pk").values_list("pk", "message")
+        pks, messages = [], []
+        for pk, message in rows.iterator(chunk_size=chunk_size):
+            pks.append(pk)
+            messages.append(message)
+            if len(pks) == chunk_size:
+                yield pks, messages
+                pks, messages = [], []
+        if pks:
+            yield pks, messages
+
+    def write_back_future(self, pks, messages, future):
+        self.write_back(pks, messages, future.result())
+
+    def write_back(self, pks, messages, htmls):
+        rendered = {
+            pk: (message, html) for pk, message, html in zip(pks, messages, htmls)
+        }
+        with transaction.atomic():
+            # Posts edited since they were read already have a fresh
+            # rendering, only the unchanged ones are written.
+            current = Post.objects.filter(pk__in=pks).values_list("pk", "message")
+            posts = [
+                Post(
+                    pk=pk,
+                    message_html=rendered[pk][1],
+                    message_html_version=RENDERER_VERSION,
+                )
+                for pk, message in current
+                if rendered[pk][0] == message
+            ]
+            Post.objects.bulk_update(
+                posts,
+                ["message_html", "message_html_version"],
+                batch_size=BULK_UPDATE_BATCH_SIZE,
+            )
+
+        self.rendered += len(posts)
+        self.skipped += len(pks) - len(posts)
+        elapsed = time.monotonic() - self.started
+        self.stdout.write(
+            f"{self.rendered} posts re-rendered "
+            f"({self.rendered / max(elapsed, 1e-9):.0f} posts/sec)"
+        )
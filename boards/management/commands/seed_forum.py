@@ -0,0 +1,335 @@
+"""
+Generates a synthetic forum for benchmarks and load tests.
+
+Posts are spread over the topics with a Pareto distribution, so a few
+topics get huge and most stay short, and authors are picked with a Zipf
+distribution, so a few users write most of the posts. The same `--seed`
+and options generate the same forum, timestamps ending at the start of
+the current day.
+
+Rows get their primary keys up front, so the counters and last post
+pointers are written along with the rows and topics can be inserted
+before the posts they point to. Topics and posts are inserted with raw
+SQL, which also keeps their generated times from being replaced by the
+`auto_now_add` ones, and boards get theirs once all their posts are
+generated. Posts reuse a pool of messages rendered
+once and go into the search index along with the table. Rows are
+inserted in batches, one transaction per batch, with the foreign key
+checks off as `loaddata` does and without syncing to disk.
+
+"""
+import itertools
+import random
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from boards import pagecache
+from boards.fragments import BOARD_ROW, invalidate_fragments
+from boards.markup import RENDERER_VERSION, render_markdown
+from boards.models import Board, Post, Topic
+from boards.search import INDEX_TABLE
+
+TOPIC_SKEW = 1.1
+BOARD_SKEW = 1.5
+AUTHOR_SKEW = 1.1
+MESSAGE_POOL_SIZE = 500
+
+# Topics and posts skip the per-value preparation of `bulk_create`, which
+# takes most of the time at a million rows, and are inserted as already
+# adapted values.
+TOPIC_FIELDS = (
+    "id",
+    "subject",
+    "board_id",
+    "starting_user_id",
+    "views",
+    "replies_count",
+    "last_post_id",
+    "last_updated",
+)
+POST_FIELDS = (
+    "id",
+    "topic_id",
+    "message",
+    "message_html",
+    "message_html_version",
+    "created_at",
+    "created_by_id",
+)
+
+WORDS = (
+    "django sqlite query index cache page topic board post reply thread user "
+    "python template view model migration request response server client "
+    "database transaction lock write read replica benchmark latency profile "
+    "memory worker queue batch session cookie header render markdown search "
+    "count update delete insert select join order limit offset cursor"
+).split()
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    text = " ".join(rng.choice(WORDS) for _ in range(words))
+    return text[0].upper() + text[1:]
+
+
+def message(rng: random.Random) -> str:
+    paragraphs = []
+    for _ in range(rng.randint(1, 3)):
+        paragraphs.append(
+            " ".join(f"{sentence(rng, rng.randint(4, 14))}." for _ in range(3))
+        )
+    if rng.random() < 0.3:
+        paragraphs.append("\n".join(f"- **{rng.choice(WORDS)}**" for _ in range(3)))
+    if rng.random() < 0.2:
+        paragraphs.append(f"    {rng.choice(WORDS)}({rng.choice(WORDS)})")
+    return "\n\n".join(paragraphs)
+
+
+def spread(rng: random.Random, total: int, count: int, skew: float) -> list:
+    """Splits `total` into `count` parts of at least one, with Pareto weights."""
+    weights = [rng.paretovariate(skew) for _ in range(count)]
+    scale = (total - count) / sum(weights)
+    parts = [1 + int(weight * scale) for weight in weights]
+    for i in rng.choices(range(count), weights, k=total - sum(parts)):
+        parts[i] += 1
+    return parts
+
+
+def next_pk(model) -> int:
+    return (model.objects.aggregate(pk=Max("pk"))["pk"] or 0) + 1
+
+
+def insert_sql(model, fields) -> str:
+    quote = connection.ops.quote_name
+    return (
+        f"INSERT INTO {quote(model._meta.db_table)} "
+        f"({', '.join(quote(column) for column in fields)}) "
+        f"VALUES ({', '.join(['%s'] * len(fields))})"
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates boards, users, topics and posts with a realistic skew, "
+        "e.g. to benchmark against a production-sized database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--boards", type=int, default=10)
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--topics", type=int, default=10000)
+        parser.add_argument("--posts", type=int, default=100000)
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Seed of the generator, also part of the user and board names.",
+        )
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=365,
+            help="Number of days the generated posts are spread over.",
+        )
+        parser.add_argument(
+            "--password",
+            default="password",
+            help="Password of all the generated users.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=10000,
+            help="Number of posts inserted per transaction.",
+        )
+        parser.add_argument(
+            "--skip-search-index",
+            action="store_true",
+            help="Leave the posts out of the search index, to be added later "
+            "with rebuild_search_index.",
+        )
+
+    def handle(self, *args, **options):
+        if not 1 <= options["boards"] <= options["topics"] <= options["posts"]:
+            raise CommandError("Expected 1 <= --boards <= --topics <= --posts.")
+        if options["users"] < 1:
+            raise CommandError("Expected at least one user.")
+        self.seed = options["seed"]
+        self.prefix = f"seed{self.seed}_"
+        if User.objects.filter(username__startswith=self.prefix).exists():
+            raise CommandError(
+                f"Seed {self.seed} was already generated, pick another --seed."
+            )
+
+        self.rng = random.Random(self.seed)
+        self.end = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        self.start = self.end - timedelta(days=options["days"])
+        self.batch_size = options["batch_size"]
+        self.index = not options["skip_search_index"]
+        started = time.monotonic()
+
+        messages = [message(self.rng) for _ in range(MESSAGE_POOL_SIZE)]
+        self.messages = [(text, render_markdown(text)) for text in messages]
+
+        with connection.constraint_checks_disabled(), self.fast_writes():
+            with transaction.atomic():
+                user_pks = self.create_users(options["users"], options["password"])
+                boards = self.create_boards(options["boards"])
+            self.create_topics(boards, user_pks, options["topics"], options["posts"])
+            with transaction.atomic():
+                Board.objects.bulk_update(
+                    boards, ["posts_count", "topics_count", "last_post", "last_updated"]
+                )
+
+        pagecache.bump_generations("boards")
+        invalidate_fragments(*((BOARD_ROW, [board.pk]) for board in boards))
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Generated {options['boards']} boards, {options['users']} users, "
+                f"{options['topics']} topics and {options['posts']} posts "
+                f"in {time.monotonic() - started:.1f}s."
+            )
+        )
+        if not self.index:
+            self.stdout.write("Run rebuild_search_index to make the posts searchable.")
+
+    @contextmanager
+    def fast_writes(self):
+        """Skips the fsyncs of the seed transactions, a crash only loses the seed."""
+        if connection.vendor != "sqlite" or connection.in_atomic_block:
+            yield
+            return
+        with connection.cursor() as cursor:
+            synchronous = cursor.execute("PRAGMA synchronous").fetchone()[0]
+            cursor.execute("PRAGMA synchronous = OFF")
+        try:
+            yield
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute(f"PRAGMA synchronous = {int(synchronous)}")
+
+    def create_users(self, count: int, password: str) -> list:
+        first_pk = next_pk(User)
+        password = make_password(password)
+        User.objects.bulk_create(
+            (
+                User(
+                    pk=first_pk + i,
+                    username=f"{self.prefix}user{i}",
+                    email=f"{self.prefix}user{i}@example.com",
+                    password=password,
+                    date_joined=self.start,
+                )
+                for i in range(count)
+            ),
+            batch_size=self.batch_size,
+        )
+        self.stdout.write(f"users: {count} created")
+        return list(range(first_pk, first_pk + count))
+
+    def create_boards(self, count: int) -> list:
+        first_pk = next_pk(Board)
+        boards = [
+            Board(
+                pk=first_pk + i,
+                name=f"Seed {self.seed} board {i}"[:30],
+                description=sentence(self.rng, 6)[:100],
+            )
+            for i in range(count)
+        ]
+        Board.objects.bulk_create(boards)
+        # Stored with the final bulk_update, once their last post is known.
+        for board in boards:
+            board.last_updated = self.start
+        self.stdout.write(f"boards: {count} created")
+        return boards
+
+    def create_topics(self, boards: list, user_pks: list, count: int, posts: int):
+        rng = self.rng
+        adapt_datetime = connection.ops.adapt_datetimefield_value
+        topic_boards = rng.choices(
+            boards, spread(rng, count, len(boards), BOARD_SKEW), k=count
+        )
+        sizes = spread(rng, posts, count, TOPIC_SKEW)
+        author_weights = list(
+            itertools.accumulate(
+                1 / rank**AUTHOR_SKEW for rank in range(1, len(user_pks) + 1)
+            )
+        )
+        span = (self.end - self.start).total_seconds()
+        starts = sorted(rng.random() * span for _ in range(count))
+
+        topic_pk, post_pk = next_pk(Topic), next_pk(Post)
+        self.topics, self.posts, self.index_rows = [], [], []
+        self.done = 0
+        for board, size, offset in zip(topic_boards, sizes, starts):
+            authors = rng.choices(user_pks, cum_weights=author_weights, k=size)
+            offsets = sorted(
+                offset + rng.random() * (span - offset) for _ in range(size)
+            )
+            offsets[0] = offset
+            subject = sentence(rng, rng.randint(3, 9))
+            for i, (author, post_offset) in enumerate(zip(authors, offsets)):
+                text, html = rng.choice(self.messages)
+                created_at = self.start + timedelta(seconds=post_offset)
+                self.posts.append(
+                    (
+                        post_pk,
+                        topic_pk,
+                        text,
+                        html,
+                        RENDERER_VERSION,
+                        adapt_datetime(created_at),
+                        author,
+                    )
+                )
+                if self.index:
+                    self.index_rows.append(
+                        (post_pk, "" if i else subject, text, board.pk, topic_pk)
+                    )
+                post_pk += 1
+                if len(self.posts) == self.batch_size:
+                    self.write()
+
+            self.topics.append(
+                (
+                    topic_pk,
+                    subject,
+                    board.pk,
+                    authors[0],
+                    size * rng.randint(2, 20),
+                    size - 1,
+                    post_pk - 1,
+                    adapt_datetime(created_at),
+                )
+            )
+            board.topics_count += 1
+            board.posts_count += size
+            if board.last_updated < created_at:
+                board.last_updated = created_at
+                board.last_post_id = post_pk - 1
+            topic_pk += 1
+        self.write()
+
+    def write(self):
+        """Inserts the pending rows, topics possibly before or after their posts."""
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.executemany(insert_sql(Topic, TOPIC_FIELDS), self.topics)
+            cursor.executemany(insert_sql(Post, POST_FIELDS), self.posts)
+            if self.index_rows:
+                cursor.executemany(
+                    f"INSERT OR REPLACE INTO {INDEX_TABLE} "
+                    f"(rowid, subject, message, board_id, topic_id) "
+                    f"VALUES (%s, %s, %s, %s, %s)",
+                    self.index_rows,
+                )
+        self.done += len(self.posts)
+        self.stdout.write(f"posts: {self.done} created")
+        self.topics, self.posts, self.index_rows = [], [], []
@@ -0,0 +1,29 @@
+"""
+Markdown rendering of the post messages.
+
+`RENDERER_VERSION` identifies the markdown release and the settings the
+stored HTML of a post was produced with. Bump `MARKDOWN_RENDERER_REVISION`
+in the settings to invalidate every stored render, e.g. after changing the
+sanitizing rules.
+
+"""
+import hashlib
+
+import markdown
+
+from django_learning.settings import MARKDOWN_EXTENSIONS, MARKDOWN_RENDERER_REVISION
+
+RENDERER_VERSION = hashlib.sha1(
+    repr(
+        (markdown.__version__, MARKDOWN_EXTENSIONS, MARKDOWN_RENDERER_REVISION)
+    ).encode()
+).hexdigest()[:16]
+
+
+def render_markdown(text: str) -> str:
+    return markdown.markdown(text, extensions=MARKDOWN_EXTENSIONS)
+
+
+def render_messages(messages: list) -> list:
+    """Renders a batch of messages, used by the `rerender_posts` worker processes."""
+    return [render_markdown(message) for message in messages]
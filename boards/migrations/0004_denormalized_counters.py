@@ -0,0 +1,84 @@
+# Generated by Django 4.1.13 on 2026-10-18 17:50
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+import django.db.models.deletion
+
+
+def fill_counters(apps, schema_editor):
+    Board = apps.get_model("boards", "Board")
+    Topic = apps.get_model("boards", "Topic")
+    Post = apps.get_model("boards", "Post")
+
+    def count_of(queryset, field):
+        counts = queryset.order_by().values(field).annotate(count=Count("pk"))
+        return Coalesce(
+            Subquery(counts.values("count")[:1], output_field=IntegerField()),
+            Value(0),
+        )
+
+    def latest_of(queryset):
+        return Subquery(queryset.order_by("-created_at", "-pk").values("pk")[:1])
+
+    topic_posts = Post.objects.filter(topic=OuterRef("pk"))
+    Topic.objects.update(
+        # Topics without posts would get -1, out of the column CHECK.
+        replies_count=Greatest(count_of(topic_posts, "topic") - 1, 0),
+        last_post=latest_of(topic_posts),
+    )
+
+    board_posts = Post.objects.filter(topic__board=OuterRef("pk"))
+    Board.objects.update(
+        posts_count=count_of(board_posts, "topic__board"),
+        topics_count=count_of(Topic.objects.filter(board=OuterRef("pk")), "board"),
+        last_post=latest_of(board_posts),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("boards", "0003_topic_views"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="board",
+            name="last_post",
+            field=models.ForeignKey(
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="boards.post",
+            ),
+        ),
+        migrations.AddField(
+            model_name="board",
+            name="posts_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="board",
+            name="topics_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="topic",
+            name="last_post",
+            field=models.ForeignKey(
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="boards.post",
+            ),
+        ),
+        migrations.AddField(
+            model_name="topic",
+            name="replies_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
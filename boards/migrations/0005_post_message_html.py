@@ -0,0 +1,23 @@
+# Generated by Django 4.1.13 on 2026-10-18 17:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("boards", "0004_denormalized_counters"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="message_html",
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="message_html_version",
+            field=models.CharField(blank=True, editable=False, max_length=16),
+        ),
+    ]
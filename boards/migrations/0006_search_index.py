@@ -0,0 +1,30 @@
+from django.db import migrations
+
+INDEX_TABLE = "boards_search_index"
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE {INDEX_TABLE} USING fts5("
+        f"subject, message, board_id UNINDEXED, topic_id UNINDEXED, "
+        f"tokenize = 'unicode61 remove_diacritics 2')"
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(f"DROP TABLE {INDEX_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("boards", "0005_post_message_html"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.1.13 on 2026-10-18 18:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("boards", "0006_search_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                fields=["topic", "created_at"], name="boards_post_topic_created"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="topic",
+            index=models.Index(
+                fields=["board", "last_updated"], name="boards_topic_board_updated"
+            ),
+        ),
+    ]
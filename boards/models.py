@@ -3,17 +3,54 @@ from django.db import models
 from django.contrib.auth.models import User
 from django.utils.text import Truncator
 from django.utils.html import mark_safe
-from markdown import markdown
 
+from boards.markup import RENDERER_VERSION, render_markdown
+from boards.viewcounts import view_counts
 from django_learning.settings import POSTS_PAGINATE_BY, LAST_POSTS_NUM_IN_REPLY
 
 DELETED_USER = "non_existing_user"
 
 
+class BoardQuerySet(models.QuerySet):
+    def with_summary(self):
+        """
+        Joins the stored last post with its author and topic, so the home
+        page does not query per board.
+
+        """
+        return self.select_related("last_post__created_by", "last_post__topic")
+
+
+class TopicQuerySet(models.QuerySet):
+    def with_pages(self):
+        """
+        Joins the starting user and annotates `page_count`, the number of
+        posts pages, so the topic page helpers do not query per topic.
+
+        """
+        page_count = (models.F("replies_count") + POSTS_PAGINATE_BY) / POSTS_PAGINATE_BY
+        return self.select_related("starting_user").annotate(
+            page_count=models.ExpressionWrapper(
+                page_count, output_field=models.IntegerField()
+            )
+        )
+
+
 class Board(models.Model):
     name = models.CharField(max_length=30, unique=True)
     description = models.CharField(max_length=100)
     last_updated = models.DateTimeField(auto_now_add=True)
+    posts_count = models.PositiveIntegerField(default=0, editable=False)
+    topics_count = models.PositiveIntegerField(default=0, editable=False)
+    last_post = models.ForeignKey(
+        "Post",
+        null=True,
+        editable=False,
+        related_name="+",
+        on_delete=models.SET_NULL,
+    )
+
+    objects = BoardQuerySet.as_manager()
 
     def __str__(self):
         return self.name
@@ -23,10 +60,10 @@ class Board(models.Model):
         return Post.objects.filter(topic__board=self)
 
     def get_posts_count(self):
-        return self.board_posts.count()
+        return self.posts_count
 
     def get_latest_post(self):
-        return self.board_posts.order_by("-created_at").first()
+        return self.board_posts.order_by("-created_at", "-pk").first()
 
 
 class Topic(models.Model):
@@ -37,12 +74,36 @@ class Topic(models.Model):
         User, related_name="topics", on_delete=models.SET(value=DELETED_USER)
     )
     views = models.PositiveIntegerField(default=0)
+    replies_count = models.PositiveIntegerField(default=0, editable=False)
+    last_post = models.ForeignKey(
+        "Post",
+        null=True,
+        editable=False,
+        related_name="+",
+        on_delete=models.SET_NULL,
+    )
+
+    objects = TopicQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Topic lists, newest first, also by keyset (last_updated, id).
+            models.Index(
+                fields=["board", "last_updated"], name="boards_topic_board_updated"
+            ),
+        ]
 
     def __str__(self):
         return self.subject
 
+    def get_views_count(self):
+        """Stored views plus the ones still waiting in the write-behind buffer."""
+        return self.views + view_counts.pending(self.pk)
+
     def get_page_count(self):
-        count = self.posts.count()
+        if hasattr(self, "page_count"):
+            return self.page_count
+        count = self.replies_count + 1
         pages = count / POSTS_PAGINATE_BY
         return math.ceil(pages)
 
@@ -51,14 +112,17 @@ class Topic(models.Model):
             count = self.get_page_count()
         return count > 6
 
-    def get_page_range(self):
-        count = self.get_page_count()
+    def get_page_range(self, count=None):
+        if count is None:
+            count = self.get_page_count()
         if self.has_many_pages(count):
             return range(1, 5)
         return range(1, count + 1)
 
     def get_last_ten_posts(self):
-        return self.posts.order_by("-created_at")[:LAST_POSTS_NUM_IN_REPLY]
+        return self.posts.select_related("created_by").order_by("-created_at")[
+            :LAST_POSTS_NUM_IN_REPLY
+        ]
 
 
 class Post(models.Model):
@@ -72,10 +136,31 @@ class Post(models.Model):
     updated_by = models.ForeignKey(
         User, null=True, related_name="+", on_delete=models.SET(value=DELETED_USER)
     )
+    message_html = models.TextField(blank=True, editable=False)
+    message_html_version = models.CharField(max_length=16, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # Posts of a topic, newest first, also by keyset (created_at, id).
+            models.Index(
+                fields=["topic", "created_at"], name="boards_post_topic_created"
+            ),
+        ]
 
     def __str__(self):
         truncated_message = Truncator(self.message)
         return truncated_message.chars(30)
 
+    def render_message(self):
+        """Renders the message into `message_html`, to be stored with the next save."""
+        self.message_html = render_markdown(self.message)
+        self.message_html_version = RENDERER_VERSION
+
     def get_message_as_markdown(self):
-        return mark_safe(markdown(self.message))
+        if self.message_html_version != RENDERER_VERSION:
+            self.render_message()
+            Post.objects.filter(pk=self.pk, message=self.message).update(
+                message_html=self.message_html,
+                message_html_version=self.message_html_version,
+            )
+        return mark_safe(self.message_html)
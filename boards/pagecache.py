@@ -0,0 +1,139 @@
+"""
+Full-page cache of the board and topic pages for anonymous readers.
+
+Cache keys combine the URL with generation counters of the content a page
+shows: `boards` for the home page, `board:<pk>` for a topic list and
+`topic:<pk>` for a topic. Writers bump the counters of what they changed,
+so stale pages are never looked up again and invalidation costs one cache
+write per counter, without scanning keys. Pages of logged-in users and
+pages using a CSRF token are never stored. Cached pages keep their
+validators, so conditional requests hitting the cache are answered
+without a query.
+
+"""
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+
+from django_learning.settings import PAGE_CACHE_TIMEOUT
+
+GENERATION_KEY = "page-generation:{}"
+PAGE_KEY = "page:{}"
+HITS_KEY = "page-cache:hits"
+STORED_HEADERS = ("ETag", "Last-Modified", "Cache-Control", "Vary")
+MISSES_KEY = "page-cache:misses"
+
+
+def get_generations(scopes) -> dict:
+    keys = {GENERATION_KEY.format(scope): scope for scope in scopes}
+    generations = cache.get_many(keys)
+    for key in keys.keys() - generations.keys():
+        # A lost counter must not fall back to a value used before.
+        cache.add(key, time.time_ns(), timeout=None)
+        generations[key] = cache.get(key)
+    return {keys[key]: generation for key, generation in generations.items()}
+
+
+def bump_generations(*scopes):
+    """Invalidates the pages of given scopes, once the current transaction commits."""
+
+    def bump():
+        now = time.time_ns()
+        cache.set_many(
+            {GENERATION_KEY.format(scope): now for scope in scopes}, timeout=None
+        )
+
+    transaction.on_commit(bump)
+
+
+def _count(key):
+    if not cache.add(key, 1, timeout=None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, 1, timeout=None)
+
+
+def get_stats() -> dict:
+    stats = cache.get_many([HITS_KEY, MISSES_KEY])
+    return {"hits": stats.get(HITS_KEY, 0), "misses": stats.get(MISSES_KEY, 0)}
+
+
+def page_key(request, scopes) -> str:
+    generations = get_generations(scopes)
+    parts = [request.get_full_path()]
+    parts += [f"{scope}={generations[scope]}" for scope in sorted(scopes)]
+    digest = hashlib.sha1("|".join(parts).encode()).hexdigest()
+    return PAGE_KEY.format(digest)
+
+
+class AnonymousPageCacheMixin:
+    """
+    Class-based view mixin serving anonymous GET requests from the page
+    cache. Views tell which content they show with `get_page_cache_scopes()`
+    and may react to served cached pages in `page_cache_hit()`.
+
+    """
+
+    page_cache_timeout = PAGE_CACHE_TIMEOUT
+
+    def get_page_cache_scopes(self):
+        raise NotImplementedError
+
+    def page_cache_hit(self, request):
+        pass
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD") or request.user.is_authenticated:
+            return super().dispatch(request, *args, **kwargs)
+
+        self.request, self.args, self.kwargs = request, args, kwargs
+        key = page_key(request, self.get_page_cache_scopes())
+        if (cached := cache.get(key)) is not None:
+            _count(HITS_KEY)
+            self.page_cache_hit(request)
+            return self._cached_response(request, *cached)
+
+        _count(MISSES_KEY)
+        response = super().dispatch(request, *args, **kwargs)
+        if hasattr(response, "add_post_render_callback"):
+            response.add_post_render_callback(
+                lambda rendered: self._store(key, request, rendered)
+            )
+        return response
+
+    def _cached_response(self, request, status, content_type, content, headers):
+        response = None
+        if etag := headers.get("ETag"):
+            last_modified = parse_http_date_safe(headers.get("Last-Modified"))
+            response = get_conditional_response(
+                request, etag=etag, last_modified=last_modified
+            )
+        if response is None:
+            response = HttpResponse(content, content_type=content_type, status=status)
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
+    def _store(self, key, request, response):
+        if (
+            response.status_code != 200
+            or response.cookies
+            or request.META.get("CSRF_COOKIE_NEEDS_UPDATE")
+        ):
+            return
+        headers = {
+            header: response[header] for header in STORED_HEADERS if header in response
+        }
+        cached = (
+            response.status_code,
+            response["Content-Type"],
+            response.content,
+            headers,
+        )
+        cache.set(key, cached, timeout=self.page_cache_timeout)
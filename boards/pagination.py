@@ -0,0 +1,136 @@
+"""
+Keyset (cursor) pagination for the topic and post lists.
+
+Instead of `LIMIT/OFFSET` and a `COUNT(*)` per page, every page is read
+with a `WHERE (ordering key) < (last seen key)` filter, so deep pages cost
+the same as the first one. Positions travel in opaque, signed `cursor`
+tokens. Requests with `?page=N` still go through Django's `Paginator`.
+
+"""
+from collections.abc import Sequence
+from datetime import datetime
+
+from django.core import signing
+from django.db.models import Q
+from django.http import Http404
+from django.utils.dateparse import parse_datetime
+
+CURSOR_SALT = "boards.pagination.cursor"
+
+NEXT = "n"
+PREVIOUS = "p"
+LAST = "l"
+
+
+def encode_cursor(direction: str, position=None) -> str:
+    if position is not None:
+        position = [
+            value.isoformat() if isinstance(value, datetime) else value
+            for value in position
+        ]
+    return signing.dumps([direction, position], salt=CURSOR_SALT)
+
+
+def decode_cursor(cursor: str):
+    try:
+        direction, position = signing.loads(cursor, salt=CURSOR_SALT)
+    except (signing.BadSignature, TypeError, ValueError):
+        raise Http404("Invalid cursor.")
+    if position is not None:
+        position = [
+            parse_datetime(value) or value if isinstance(value, str) else value
+            for value in position
+        ]
+    return direction, position
+
+
+class KeysetPage(Sequence):
+    is_keyset = True
+
+    def __init__(self, object_list, keyset_fields, has_next, has_previous):
+        self.object_list = object_list
+        self.keyset_fields = keyset_fields
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    def _position(self, obj):
+        return [getattr(obj, field) for field in self.keyset_fields]
+
+    @property
+    def next_cursor(self):
+        if self.has_next():
+            return encode_cursor(NEXT, self._position(self.object_list[-1]))
+
+    @property
+    def previous_cursor(self):
+        if self.has_previous():
+            return encode_cursor(PREVIOUS, self._position(self.object_list[0]))
+
+    @property
+    def last_cursor(self):
+        return encode_cursor(LAST)
+
+
+class KeysetPaginationMixin:
+    """
+    `ListView` mixin paginating newest first on `keyset_fields`, which must
+    end with a unique field, e.g. `("created_at", "pk")`.
+
+    """
+
+    keyset_fields = ("pk",)
+    cursor_kwarg = "cursor"
+
+    def paginate_queryset(self, queryset, page_size):
+        if self.page_kwarg in self.request.GET:
+            return super().paginate_queryset(queryset, page_size)
+
+        direction, position = NEXT, None
+        if cursor := self.request.GET.get(self.cursor_kwarg):
+            direction, position = decode_cursor(cursor)
+
+        descending = [f"-{field}" for field in self.keyset_fields]
+        if direction == NEXT:
+            queryset = queryset.order_by(*descending)
+            if position is not None:
+                queryset = queryset.filter(self._keyset_filter(position, "lt"))
+        else:
+            queryset = queryset.order_by(*self.keyset_fields)
+            if position is not None:
+                queryset = queryset.filter(self._keyset_filter(position, "gt"))
+
+        object_list = list(queryset[: page_size + 1])
+        has_more = len(object_list) > page_size
+        object_list = object_list[:page_size]
+
+        if direction == NEXT:
+            has_next, has_previous = has_more, position is not None
+        else:
+            object_list.reverse()
+            has_next, has_previous = direction == PREVIOUS, has_more
+
+        page = KeysetPage(object_list, self.keyset_fields, has_next, has_previous)
+        return None, page, object_list, page.has_other_pages()
+
+    def _keyset_filter(self, position, lookup):
+        """Builds `(a, b) < (x, y)` as `a < x OR (a = x AND b < y)`."""
+        condition = Q()
+        for i, field in enumerate(self.keyset_fields):
+            equal = dict(zip(self.keyset_fields, position[:i]))
+            condition |= Q(**equal, **{f"{field}__{lookup}": position[i]})
+        return condition
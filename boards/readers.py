@@ -0,0 +1,155 @@
+"""
+Approximate unique readers of topics.
+
+Every topic gets a HyperLogLog sketch stored in the cache, keyed by
+visitor: the user pk for logged-in users, the session key or the address
+and user agent for the anonymous ones. A sketch takes
+`2 ** TOPIC_READERS_PRECISION` bytes whatever the number of readers and
+nothing is written to the visitor's session.
+
+The sketch only estimates how many readers there are, it cannot tell
+whether a visitor already read the topic. Views are deduplicated by
+`recent_readers` instead: two Bloom filters per topic, holding up to
+`TOPIC_VIEWS_CAPACITY` readers each. Once the current one is full it
+replaces the previous one and a new one starts, which bounds the false
+positives at `TOPIC_VIEWS_ERROR_RATE` on busy topics. A reader counts as
+a new view again after that many other readers.
+
+"""
+
+import hashlib
+import math
+
+from django.core.cache import cache
+
+from django_learning.settings import (
+    TOPIC_READERS_PRECISION,
+    TOPIC_VIEWS_CAPACITY,
+    TOPIC_VIEWS_ERROR_RATE,
+)
+
+CACHE_KEY = "topic-readers:{}"
+RECENT_CACHE_KEY = "topic-recent-readers:{}"
+
+
+class HyperLogLog:
+    def __init__(self, precision: int, registers: bytes = None):
+        self.precision = precision
+        self.size = 1 << precision
+        self.registers = bytearray(registers or self.size)
+
+    def add(self, value: str) -> bool:
+        """Adds the value, returns True if it has certainly not been seen yet."""
+        digest = hashlib.sha1(value.encode()).digest()
+        hashed = int.from_bytes(digest[:8], "big")
+        index = hashed >> (64 - self.precision)
+        rest_bits = 64 - self.precision
+        rest = hashed & ((1 << rest_bits) - 1)
+        rank = rest_bits - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+            return True
+        return False
+
+    def estimate(self) -> int:
+        alpha = 0.7213 / (1 + 1.079 / self.size)
+        raw = alpha * self.size**2 / sum(2.0**-rank for rank in self.registers)
+        zeros = self.registers.count(0)
+        if raw <= 2.5 * self.size and zeros:
+            return round(self.size * math.log(self.size / zeros))
+        return round(raw)
+
+
+class BloomFilter:
+    def __init__(self, size: int, hashes: int, bits: bytes = None):
+        self.size = size
+        self.hashes = hashes
+        self.bits = bytearray(bits or (size + 7) // 8)
+
+    @classmethod
+    def for_capacity(cls, capacity: int, error_rate: float) -> "BloomFilter":
+        size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        return cls(size, max(round(size / capacity * math.log(2)), 1))
+
+    def _positions(self, value: str):
+        digest = hashlib.sha1(value.encode()).digest()
+        first = int.from_bytes(digest[:8], "big")
+        step = int.from_bytes(digest[8:16], "big") | 1
+        return [(first + i * step) % self.size for i in range(self.hashes)]
+
+    def __contains__(self, value: str) -> bool:
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(value)
+        )
+
+    def add(self, value: str):
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+
+def visitor_id(request) -> str:
+    if request.user.is_authenticated:
+        return f"user:{request.user.pk}"
+    if session_key := request.session.session_key:
+        return f"session:{session_key}"
+    address = request.META.get("REMOTE_ADDR", "")
+    agent = request.META.get("HTTP_USER_AGENT", "")
+    return f"anonymous:{address}:{agent}"
+
+
+class TopicReaders:
+    def __init__(self, precision: int):
+        self.precision = precision
+
+    def _sketch(self, registers=None) -> HyperLogLog:
+        if registers is not None and len(registers) != 1 << self.precision:
+            registers = None
+        return HyperLogLog(self.precision, registers)
+
+    def add(self, topic_pk: int, visitor: str) -> bool:
+        """Records a visit, returns True if it changed the sketch."""
+        key = CACHE_KEY.format(topic_pk)
+        sketch = self._sketch(cache.get(key))
+        if not sketch.add(visitor):
+            return False
+        cache.set(key, bytes(sketch.registers), timeout=None)
+        return True
+
+    def estimate_many(self, topic_pks) -> dict:
+        keys = {CACHE_KEY.format(topic_pk): topic_pk for topic_pk in topic_pks}
+        stored = cache.get_many(keys)
+        return {
+            topic_pk: self._sketch(stored[key]).estimate() if key in stored else 0
+            for key, topic_pk in keys.items()
+        }
+
+
+class RecentReaders:
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+
+    def _filter(self, bits=None) -> BloomFilter:
+        empty = BloomFilter.for_capacity(self.capacity, self.error_rate)
+        if bits is None or len(bits) != len(empty.bits):
+            return empty
+        return BloomFilter(empty.size, empty.hashes, bits)
+
+    def add(self, topic_pk: int, visitor: str) -> bool:
+        """Records a visit, returns True unless the visitor read the topic recently."""
+        key = RECENT_CACHE_KEY.format(topic_pk)
+        count, current, previous = cache.get(key) or (0, None, None)
+        current, previous = self._filter(current), self._filter(previous)
+        if visitor in current or visitor in previous:
+            return False
+        if count >= self.capacity:
+            count, current, previous = 0, self._filter(), current
+        current.add(visitor)
+        stored = (count + 1, bytes(current.bits), bytes(previous.bits))
+        cache.set(key, stored, timeout=None)
+        return True
+
+
+topic_readers = TopicReaders(TOPIC_READERS_PRECISION)
+recent_readers = RecentReaders(TOPIC_VIEWS_CAPACITY, TOPIC_VIEWS_ERROR_RATE)
@@ -0,0 +1,128 @@
+"""
+Read replica of the SQLite database for the board, topic list and topic
+pages.
+
+With `DJANGO_REPLICA_PATH` set, `manage.py refresh_replica` copies the
+primary database into that file every `REPLICA_REFRESH_INTERVAL` seconds
+with the online backup API, and `ReplicaReadMixin` views read the `boards`
+tables from the `replica` connection. Sessions, users and every write stay
+on the primary.
+
+Each refresh records the time its copy started as the modification time
+of a stamp file next to the replica. A session which wrote after the
+latest copy started keeps reading from the primary, so users always see
+their own posts. Refreshes also bump the `replica` page cache generation,
+so pages rendered from an older copy are not served after the refresh.
+
+"""
+import contextvars
+import os
+import sqlite3
+import time
+from pathlib import Path
+
+from boards import pagecache
+from django_learning.settings import REPLICA_PATH
+
+REPLICA = "replica"
+PRIMARY_WRITE_KEY = "replicas:primary-write"
+
+_reading_replica = contextvars.ContextVar("reading_replica", default=False)
+
+
+def is_configured() -> bool:
+    return REPLICA_PATH is not None
+
+
+def stamp_path(replica_path) -> Path:
+    return Path(f"{replica_path}.stamp")
+
+
+def snapshot_time():
+    """Time at which the data of the replica was copied, if it was already."""
+    try:
+        return os.stat(stamp_path(REPLICA_PATH)).st_mtime_ns / 1e9
+    except FileNotFoundError:
+        return None
+
+
+def refresh(primary_path, replica_path, pages: int = -1) -> float:
+    """Copies the primary into the replica and returns the copy start time."""
+    started = time.time_ns()
+    primary = sqlite3.connect(primary_path)
+    replica = sqlite3.connect(replica_path)
+    try:
+        primary.backup(replica, pages=pages)
+    finally:
+        replica.close()
+        primary.close()
+
+    stamp = stamp_path(replica_path)
+    stamp.touch()
+    os.utime(stamp, ns=(started, started))
+    pagecache.bump_generations(REPLICA)
+    return started / 1e9
+
+
+def page_cache_scopes(*scopes) -> list:
+    """Adds the replica generation to the page cache scopes of replica views."""
+    return [*scopes, REPLICA] if is_configured() else list(scopes)
+
+
+def record_primary_write(request):
+    """Keeps the session on the primary until a refresh copies this write."""
+    # Without a replica every read is on the primary, and saving the
+    # session would cost an extra write.
+    if is_configured() and hasattr(request, "session"):
+        request.session[PRIMARY_WRITE_KEY] = time.time()
+
+
+def should_read_replica(request) -> bool:
+    copied_at = snapshot_time()
+    if copied_at is None:
+        return False
+    written_at = getattr(request, "session", {}).get(PRIMARY_WRITE_KEY)
+    return written_at is None or written_at < copied_at
+
+
+class ReplicaRouter:
+    """Routes the reads of `boards` models to the replica inside replica views."""
+
+    def db_for_read(self, model, **hints):
+        if _reading_replica.get() and model._meta.app_label == "boards":
+            return REPLICA
+        return None
+
+    def db_for_write(self, model, **hints):
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == REPLICA:
+            return False
+        return None
+
+
+class ReplicaReadMixin:
+    """
+    Class-based view mixin running the view, template rendering included,
+    against the replica when it is fresh enough for the session. It goes
+    first, so that the page cache and conditional GET lookups read the same
+    data as the view.
+
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if not is_configured() or request.method not in ("GET", "HEAD"):
+            return super().dispatch(request, *args, **kwargs)
+
+        token = _reading_replica.set(should_read_replica(request))
+        try:
+            response = super().dispatch(request, *args, **kwargs)
+            if hasattr(response, "render"):
+                response.render()
+            return response
+        finally:
+            _reading_replica.reset(token)
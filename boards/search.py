@@ -0,0 +1,145 @@
+"""
+Full-text search over posts backed by an SQLite FTS5 virtual table.
+
+Every post is a row of `boards_search_index` with the post pk as rowid.
+The first post of a topic also carries the topic subject, which is ranked
+higher than the message text. Views keep the index in sync in the same
+transaction as the post write.
+
+"""
+
+import re
+from dataclasses import dataclass
+
+from django.db import connection
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from boards.models import Topic
+
+INDEX_TABLE = "boards_search_index"
+SUBJECT_WEIGHT = 5.0
+MESSAGE_WEIGHT = 1.0
+SNIPPET_TOKENS = 16
+
+# Control characters stripped from the indexed text, marking the matches
+# in snippets until the text is escaped.
+MATCH_START = "\x02"
+MATCH_END = "\x03"
+
+WORD_RE = re.compile(r"\w+")
+
+
+def clean_text(text: str) -> str:
+    return text.replace(MATCH_START, "").replace(MATCH_END, "")
+
+
+def index_post(post, subject: str = None):
+    """
+    Adds or replaces the post in the index. The subject of the topic is only
+    given for its first post, otherwise an already indexed subject is kept.
+
+    """
+    with connection.cursor() as cursor:
+        if subject is None:
+            cursor.execute(
+                f"SELECT subject FROM {INDEX_TABLE} WHERE rowid = %s", [post.pk]
+            )
+            row = cursor.fetchone()
+            subject = row[0] if row else ""
+        cursor.execute(
+            f"INSERT OR REPLACE INTO {INDEX_TABLE} "
+            f"(rowid, subject, message, board_id, topic_id) "
+            f"VALUES (%s, %s, %s, %s, %s)",
+            [
+                post.pk,
+                clean_text(subject),
+                clean_text(post.message),
+                post.topic.board_id,
+                post.topic_id,
+            ],
+        )
+
+
+def unindex_post(post_pk: int):
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {INDEX_TABLE} WHERE rowid = %s", [post_pk])
+
+
+def build_match_query(text: str) -> str:
+    """Turns user input into an FTS5 query matching all the words of it."""
+    return " ".join(f'"{word}"' for word in WORD_RE.findall(text))
+
+
+def highlight(snippet: str) -> str:
+    html = escape(snippet).replace(MATCH_START, "<mark>").replace(MATCH_END, "</mark>")
+    return mark_safe(html)
+
+
+@dataclass
+class SearchHit:
+    post_pk: int
+    topic_pk: int
+    board_pk: int
+    snippet: str
+    topic: object = None
+
+
+class SearchResults:
+    """
+    Lazy, sliceable sequence of hits ranked by bm25, meant to be passed
+    to Django's `Paginator`. Only the requested slice is read from the index.
+
+    """
+
+    def __init__(self, query: str, board_pk: int = None):
+        self.match = build_match_query(query)
+        self.board_pk = board_pk
+
+    def _where(self):
+        where, params = f"{INDEX_TABLE} MATCH %s", [self.match]
+        if self.board_pk is not None:
+            where += " AND board_id = %s"
+            params.append(self.board_pk)
+        return where, params
+
+    def count(self) -> int:
+        if not self.match:
+            return 0
+        where, params = self._where()
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) FROM {INDEX_TABLE} WHERE {where}", params)
+            return cursor.fetchone()[0]
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index : index + 1][0]
+        if not self.match:
+            return []
+
+        start = index.start or 0
+        where, params = self._where()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid, topic_id, board_id, "
+                f"snippet({INDEX_TABLE}, -1, %s, %s, %s, %s) "
+                f"FROM {INDEX_TABLE} WHERE {where} "
+                f"ORDER BY bm25({INDEX_TABLE}, %s, %s) LIMIT %s OFFSET %s",
+                [MATCH_START, MATCH_END, "…", SNIPPET_TOKENS]
+                + params
+                + [SUBJECT_WEIGHT, MESSAGE_WEIGHT, index.stop - start, start],
+            )
+            hits = [
+                SearchHit(post_pk, topic_pk, board_pk, highlight(snippet))
+                for post_pk, topic_pk, board_pk, snippet in cursor.fetchall()
+            ]
+
+        topics = Topic.objects.select_related("board").in_bulk(
+            {hit.topic_pk for hit in hits}
+        )
+        for hit in hits:
+            hit.topic = topics.get(hit.topic_pk)
+        return hits
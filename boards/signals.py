@@ -0,0 +1,72 @@
+from django.core.signals import request_finished
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from boards import counters, pagecache, search
+from boards.authors import invalidate_posts_count
+from boards.fragments import (
+    BOARD_ROW,
+    POST_BODY,
+    TOPIC_ROW,
+    invalidate_fragments,
+)
+from boards.models import Board, Post, Topic
+from boards.viewcounts import view_counts
+
+
+@receiver(post_save, sender=Board)
+@receiver(post_delete, sender=Board)
+def board_changed(sender, instance, **kwargs):
+    pagecache.bump_generations("boards", f"board:{instance.pk}")
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(lambda: invalidate_posts_count(instance.created_by_id))
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    counters.record_deleted_post(instance)
+    search.unindex_post(instance.pk)
+    pagecache.bump_generations(
+        "boards", f"board:{instance.topic.board_id}", f"topic:{instance.topic_id}"
+    )
+    transaction.on_commit(lambda: invalidate_posts_count(instance.created_by_id))
+
+
+@receiver(post_delete, sender=Topic)
+def topic_deleted(sender, instance, **kwargs):
+    counters.record_deleted_topic(instance)
+    pagecache.bump_generations("boards", f"board:{instance.board_id}")
+
+
+@receiver(post_save, sender=Board)
+@receiver(post_delete, sender=Board)
+def board_fragments_changed(sender, instance, **kwargs):
+    invalidate_fragments((BOARD_ROW, [instance.pk]))
+
+
+@receiver(post_save, sender=Topic)
+@receiver(post_delete, sender=Topic)
+def topic_fragments_changed(sender, instance, **kwargs):
+    invalidate_fragments(
+        (BOARD_ROW, [instance.board_id]), (TOPIC_ROW, [instance.pk])
+    )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def post_fragments_changed(sender, instance, **kwargs):
+    invalidate_fragments(
+        (BOARD_ROW, [instance.topic.board_id]),
+        (TOPIC_ROW, [instance.topic_id]),
+        (POST_BODY, [instance.pk]),
+    )
+
+
+@receiver(request_finished)
+def flush_view_counts(sender, **kwargs):
+    view_counts.flush_if_due()
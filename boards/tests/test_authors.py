@@ -0,0 +1,85 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from boards.authors import get_posts_counts
+from boards.models import Board, Post, Topic
+from boards.viewcounts import view_counts
+
+
+class AuthorPostsCountTestCase(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.board = Board.objects.create(name="board", description="About board.")
+        self.users = [
+            User.objects.create_user(
+                username=f"user_{i}", email="user@test.com", password="test_password"
+            )
+            for i in range(3)
+        ]
+        self.topic = Topic.objects.create(
+            subject="Topic", board=self.board, starting_user=self.users[0]
+        )
+        for i, user in enumerate(self.users[:2]):
+            for _ in range(i + 1):
+                Post.objects.create(
+                    message="Message", topic=self.topic, created_by=user
+                )
+
+
+class GetPostsCountsTests(AuthorPostsCountTestCase):
+    def test__counts(self):
+        counts = get_posts_counts(user.pk for user in self.users)
+        self.assertEqual(
+            counts, {self.users[0].pk: 1, self.users[1].pk: 2, self.users[2].pk: 0}
+        )
+
+    def test__counts_cached(self):
+        get_posts_counts(user.pk for user in self.users)
+        with self.assertNumQueries(0):
+            get_posts_counts(user.pk for user in self.users)
+
+    def test__invalidated_on_create(self):
+        get_posts_counts([self.users[2].pk])
+        with self.captureOnCommitCallbacks(execute=True):
+            Post.objects.create(
+                message="New", topic=self.topic, created_by=self.users[2]
+            )
+        self.assertEqual(get_posts_counts([self.users[2].pk]), {self.users[2].pk: 1})
+
+    def test__invalidated_on_delete(self):
+        get_posts_counts([self.users[1].pk])
+        with self.captureOnCommitCallbacks(execute=True):
+            Post.objects.filter(created_by=self.users[1]).first().delete()
+        self.assertEqual(get_posts_counts([self.users[1].pk]), {self.users[1].pk: 1})
+
+
+class TopicPostsAuthorsTests(AuthorPostsCountTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.addCleanup(view_counts.clear)
+        self.url = reverse(
+            "topic_posts", kwargs={"board_pk": self.board.pk, "topic_pk": self.topic.pk}
+        )
+
+    def prepare(self):
+        for post in Post.objects.all():
+            post.get_message_as_markdown()
+        cache.clear()
+        view_counts.clear()
+
+    def test__query_count_does_not_grow_with_authors(self):
+        self.prepare()
+        with CaptureQueriesContext(connection) as few_authors:
+            self.client.get(self.url)
+
+        for user in self.users:
+            Post.objects.create(message="More", topic=self.topic, created_by=user)
+        self.prepare()
+        with self.assertNumQueries(len(few_authors)):
+            response = self.client.get(self.url)
+
+        self.assertContains(response, "Posts: 3")
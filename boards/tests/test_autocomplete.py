@@ -0,0 +1,137 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import resolve, reverse
+
+from boards.autocomplete import SubjectIndexes, subject_indexes
+from boards.models import Board, Topic
+from boards.views import topic_suggestions
+
+
+class SubjectIndexesTestCase(TestCase):
+    def setUp(self) -> None:
+        self.user = User.objects.create_user(
+            username="test_user", email="user@test.com", password="test_password"
+        )
+        self.boards = [
+            Board.objects.create(name=name, description="About.")
+            for name in ("Heheszki", "Syf")
+        ]
+        for board, subjects in zip(
+            self.boards, (["Spitfire", "spam", "Sparrow"], ["Spitfire lunch", "Tea"])
+        ):
+            for subject in subjects:
+                self.create_topic(board, subject)
+        self.indexes = SubjectIndexes(max_entries=100, max_indexes=10, ttl=3600)
+
+    def create_topic(self, board, subject):
+        return Topic.objects.create(
+            subject=subject, board=board, starting_user=self.user
+        )
+
+    def subjects(self, prefix, **kwargs):
+        return [subject for subject, _ in self.indexes.suggest(prefix, **kwargs)]
+
+
+class SubjectIndexesTests(SubjectIndexesTestCase):
+    def test__prefix_matches(self):
+        self.assertEqual(
+            self.subjects("sp"), ["spam", "Sparrow", "Spitfire", "Spitfire lunch"]
+        )
+
+    def test__board_matches(self):
+        self.assertEqual(self.subjects("SPI", board_pk=self.boards[0].pk), ["Spitfire"])
+
+    def test__limit(self):
+        self.assertEqual(self.subjects("sp", limit=2), ["spam", "Sparrow"])
+
+    def test__empty_prefix(self):
+        self.assertEqual(self.subjects(""), [])
+
+    def test__loaded_once(self):
+        self.subjects("sp")
+        with self.assertNumQueries(0):
+            self.subjects("spi")
+            self.subjects("t")
+
+    def test__new_topic_added(self):
+        self.subjects("sp", board_pk=self.boards[1].pk)
+        topic = self.create_topic(self.boards[1], "Spider")
+        self.indexes.add_topic(topic)
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                self.subjects("spi", board_pk=self.boards[1].pk),
+                ["Spider", "Spitfire lunch"],
+            )
+
+    def test__cold_boards_evicted(self):
+        self.indexes.max_entries = 4
+        self.subjects("sp", board_pk=self.boards[0].pk)
+        self.subjects("sp", board_pk=self.boards[1].pk)
+        self.assertEqual(self.indexes.size, 2)
+        with self.assertNumQueries(1):
+            self.subjects("sp", board_pk=self.boards[0].pk)
+
+    def test__index_count_bounded(self):
+        self.indexes.max_indexes = 2
+        self.subjects("sp", board_pk=self.boards[0].pk)
+        self.subjects("sp", board_pk=self.boards[1].pk)
+        self.subjects("sp")
+        self.assertEqual(len(self.indexes._indexes), 2)
+        with self.assertNumQueries(1):
+            self.subjects("sp", board_pk=self.boards[0].pk)
+
+    def test__empty_index_not_kept(self):
+        board = Board.objects.create(name="Empty", description="About.")
+        self.assertEqual(self.subjects("sp", board_pk=board.pk), [])
+        self.assertEqual(len(self.indexes._indexes), 0)
+
+    def test__unknown_board(self):
+        with self.assertRaises(Board.DoesNotExist):
+            self.subjects("sp", board_pk=0)
+        self.assertEqual(len(self.indexes._indexes), 0)
+
+    def test__expired_index_reloaded(self):
+        self.subjects("sp")
+        self.indexes.ttl = 0
+        with self.assertNumQueries(1):
+            self.subjects("sp")
+
+
+class TopicSuggestionsViewTests(SubjectIndexesTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        subject_indexes.clear()
+
+    def test__resolve_view_fn(self):
+        self.assertEqual(resolve("/search/suggest/").func, topic_suggestions)
+        self.assertEqual(resolve("/boards/1/suggest/").func, topic_suggestions)
+
+    def test__suggestions(self):
+        response = self.client.get(reverse("topic_suggestions"), {"q": "spi"})
+        results = response.json()["results"]
+        self.assertEqual(
+            [result["subject"] for result in results], ["Spitfire", "Spitfire lunch"]
+        )
+
+    def test__board_suggestions(self):
+        url = reverse("board_topic_suggestions", kwargs={"board_pk": self.boards[1].pk})
+        response = self.client.get(url, {"q": "spi"})
+        topic = Topic.objects.get(subject="Spitfire lunch")
+        self.assertEqual(
+            response.json(), {"results": [{"id": topic.pk, "subject": topic.subject}]}
+        )
+
+    def test__unknown_board_not_found(self):
+        url = reverse("board_topic_suggestions", kwargs={"board_pk": 0})
+        self.assertEqual(self.client.get(url, {"q": "spi"}).status_code, 404)
+
+    def test__new_topic_suggested(self):
+        url = reverse("board_topic_suggestions", kwargs={"board_pk": self.boards[0].pk})
+        self.client.get(url, {"q": "x"})
+        self.client.login(username="test_user", password="test_password")
+        self.client.post(
+            reverse("new_topic", kwargs={"board_pk": self.boards[0].pk}),
+            {"subject": "Xenon", "message": "Gas."},
+        )
+        results = self.client.get(url, {"q": "x"}).json()["results"]
+        self.assertEqual([result["subject"] for result in results], ["Xenon"])
@@ -0,0 +1,73 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.test import LiveServerTestCase, SimpleTestCase
+
+from boards.management.commands.loadtest import parse_mix
+from boards.models import Post
+from boards.viewcounts import view_counts
+from django_learning import instrumentation
+
+
+class ParseMixTests(SimpleTestCase):
+    def test__weights_parsed(self):
+        self.assertEqual(parse_mix("anonymous=3,reply=1"), {"anonymous": 3, "reply": 1})
+
+    def test__unknown_scenario_rejected(self):
+        with self.assertRaises(CommandError):
+            parse_mix("anonymous=3,browse=1")
+
+    def test__zero_weights_rejected(self):
+        with self.assertRaises(CommandError):
+            parse_mix("anonymous=0")
+
+
+class LoadTestTests(LiveServerTestCase):
+    # One virtual user, the live server threads share the in-memory database
+    # connection.
+    def setUp(self) -> None:
+        # Requests wait for each other under load, they are not slow views.
+        patcher = mock.patch.object(
+            instrumentation, "SLOW_REQUEST_DURATION", float("inf")
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(view_counts.clear)
+        call_command(
+            "seed_forum",
+            "--boards=2",
+            "--users=3",
+            "--topics=4",
+            "--posts=20",
+            stdout=StringIO(),
+        )
+
+    def load_test(self, *args) -> str:
+        out = StringIO()
+        call_command(
+            "loadtest",
+            f"--url={self.live_server_url}",
+            "--duration=1",
+            "--concurrency=1",
+            "--seed=1",
+            *args,
+            stdout=out,
+        )
+        return out.getvalue()
+
+    def test__mix_run_without_errors(self):
+        output = self.load_test("--mix=anonymous=1,reader=1")
+        self.assertIn("read (logged in)", output)
+        self.assertIn("latency histogram", output)
+        self.assertIn(" 0 errors (0.0%).", output)
+
+    def test__replies_and_signups_written(self):
+        self.load_test("--mix=reply=1,signup=1")
+        self.assertGreater(Post.objects.count(), 20)
+        self.assertTrue(User.objects.filter(username__startswith="loadtest_").exists())
+
+    def test__seeded_users_required(self):
+        with self.assertRaises(CommandError):
+            self.load_test("--user-prefix=nobody_")
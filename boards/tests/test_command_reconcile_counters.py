@@ -0,0 +1,82 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+
+from boards.models import Board, Post, Topic
+
+
+class ReconcileCountersTestCase(TestCase):
+    def setUp(self) -> None:
+        user = User.objects.create_user(
+            username="test_user", email="user@test.com", password="test_password"
+        )
+        self.boards = []
+        for i in range(3):
+            board = Board.objects.create(name=f"board_{i}", description="About.")
+            for j in range(2):
+                topic = Topic.objects.create(
+                    subject=f"topic_{j}", board=board, starting_user=user
+                )
+                for k in range(j + 1):
+                    Post.objects.create(message=f"{k}", topic=topic, created_by=user)
+            self.boards.append(board)
+
+    def reconcile(self, *args) -> str:
+        out = StringIO()
+        call_command("reconcile_counters", "--chunk-size=2", *args, stdout=out)
+        return out.getvalue()
+
+
+class ReconcileCountersTests(ReconcileCountersTestCase):
+    def test__topics_fixed(self):
+        self.reconcile()
+        for topic in Topic.objects.all():
+            self.assertEqual(topic.replies_count, topic.posts.count() - 1)
+            self.assertEqual(
+                topic.last_post, topic.posts.order_by("-created_at").first()
+            )
+
+    def test__boards_fixed(self):
+        self.reconcile()
+        for board in Board.objects.all():
+            self.assertEqual(board.posts_count, 3)
+            self.assertEqual(board.topics_count, 2)
+            self.assertEqual(board.last_post, board.get_latest_post())
+
+    def test__progress_reported(self):
+        output = self.reconcile()
+        self.assertIn("topics: done, 6 checked, 6 fixed.", output)
+        self.assertIn("boards: done, 3 checked, 3 fixed.", output)
+
+    def test__second_run_fixes_nothing(self):
+        self.reconcile()
+        output = self.reconcile()
+        self.assertIn("topics: done, 6 checked, 0 fixed.", output)
+        self.assertIn("boards: done, 3 checked, 0 fixed.", output)
+
+    def test__dry_run(self):
+        output = self.reconcile("--dry-run")
+        self.assertIn("boards: done, 3 checked, 3 fixed.", output)
+        self.assertFalse(Board.objects.exclude(posts_count=0).exists())
+
+
+class ResumeReconcileCountersTests(ReconcileCountersTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.checkpoint = Path(tempfile.mkdtemp()) / "checkpoint.json"
+        last_pk = self.boards[0].pk
+        self.checkpoint.write_text(json.dumps({"phase": "boards", "last_pk": last_pk}))
+        self.output = self.reconcile(f"--checkpoint={self.checkpoint}", "--resume")
+
+    def test__resumed_after_checkpoint(self):
+        self.assertNotIn("topics:", self.output)
+        self.assertIn("boards: done, 2 checked, 2 fixed.", self.output)
+        self.assertEqual(Board.objects.get(pk=self.boards[0].pk).posts_count, 0)
+
+    def test__checkpoint_removed_when_done(self):
+        self.assertFalse(self.checkpoint.exists())
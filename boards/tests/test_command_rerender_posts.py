@@ -0,0 +1,107 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from boards.management.commands import rerender_posts
+from boards.markup import RENDERER_VERSION, render_messages
+from boards.models import Board, Post, Topic
+
+
+class RerenderPostsTests(TestCase):
+    def setUp(self) -> None:
+        user = User.objects.create_user(
+            username="test_user", email="user@test.com", password="test_password"
+        )
+        self.topics = []
+        for i in range(2):
+            board = Board.objects.create(name=f"board_{i}", description="About.")
+            topic = Topic.objects.create(
+                subject="Topic", board=board, starting_user=user
+            )
+            for j in range(3):
+                Post.objects.create(message=f"**{j}**", topic=topic, created_by=user)
+            self.topics.append(topic)
+
+    def rerender(self, *args, workers=1, chunk_size=2) -> str:
+        out = StringIO()
+        call_command(
+            "rerender_posts",
+            f"--chunk-size={chunk_size}",
+            f"--workers={workers}",
+            *args,
+            stdout=out,
+        )
+        return out.getvalue()
+
+    def test__all_posts_rendered(self):
+        output = self.rerender()
+        self.assertIn("Re-rendered 6 posts", output)
+        self.assertIn("posts/sec", output)
+        for post in Post.objects.all():
+            self.assertEqual(
+                post.message_html, f"<p><strong>{post.message[2]}</strong></p>"
+            )
+            self.assertEqual(post.message_html_version, RENDERER_VERSION)
+
+    def test__one_update_per_chunk(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.rerender(chunk_size=6)
+        updates = [query for query in queries if query["sql"].startswith("UPDATE")]
+        self.assertEqual(len(updates), 1)
+
+    def test__worker_pool(self):
+        # Test runner processes are daemonic and cannot start a process pool.
+        with mock.patch.object(
+            rerender_posts, "ProcessPoolExecutor", ThreadPoolExecutor
+        ):
+            output = self.rerender(workers=2)
+        self.assertIn("Re-rendered 6 posts", output)
+        self.assertFalse(Post.objects.exclude(message_html_version=RENDERER_VERSION))
+
+    def test__posts_edited_meanwhile_kept(self):
+        edited = Post.objects.order_by("pk").first()
+
+        def render_and_edit(messages):
+            edited.message = "Edited."
+            edited.render_message()
+            edited.save()
+            return render_messages(messages)
+
+        with mock.patch.object(rerender_posts, "render_messages", render_and_edit):
+            output = self.rerender()
+        self.assertIn("Re-rendered 5 posts", output)
+        self.assertIn("1 edited meanwhile and skipped", output)
+        edited.refresh_from_db()
+        self.assertEqual(edited.message_html, "<p>Edited.</p>")
+
+    def test__current_renders_skipped(self):
+        self.rerender()
+        self.assertIn("Re-rendered 0 posts", self.rerender())
+        self.assertIn("Re-rendered 6 posts", self.rerender("--all"))
+
+    def test__board_filter(self):
+        board = self.topics[0].board
+        self.rerender(f"--board={board.pk}")
+        rendered = Post.objects.filter(message_html_version=RENDERER_VERSION)
+        self.assertQuerysetEqual(
+            rendered, Post.objects.filter(topic__board=board), ordered=False
+        )
+
+    def test__since_filter(self):
+        since = timezone.now() + timedelta(minutes=1)
+        Post.objects.filter(topic=self.topics[0]).update(updated_at=since)
+        self.rerender(f"--since={since.isoformat()}")
+        rendered = Post.objects.filter(message_html_version=RENDERER_VERSION)
+        self.assertEqual(rendered.count(), 3)
+
+    def test__invalid_since(self):
+        with self.assertRaises(CommandError):
+            self.rerender("--since=yesterday")
@@ -0,0 +1,86 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+
+from boards.models import Board, Post, Topic
+from boards.search import INDEX_TABLE
+
+
+class SeedForumTests(TestCase):
+    def seed(self, *args) -> str:
+        out = StringIO()
+        call_command(
+            "seed_forum",
+            "--boards=3",
+            "--users=20",
+            "--topics=30",
+            "--posts=400",
+            "--batch-size=50",
+            *args,
+            stdout=out,
+        )
+        return out.getvalue()
+
+    def test__rows_created(self):
+        self.seed()
+        self.assertEqual(Board.objects.count(), 3)
+        self.assertEqual(User.objects.filter(username__startswith="seed0_").count(), 20)
+        self.assertEqual(Topic.objects.count(), 30)
+        self.assertEqual(Post.objects.count(), 400)
+
+    def test__counters_consistent(self):
+        self.seed()
+        out = StringIO()
+        call_command("reconcile_counters", "--dry-run", stdout=out)
+        self.assertIn("topics: done, 30 checked, 0 fixed.", out.getvalue())
+        self.assertIn("boards: done, 3 checked, 0 fixed.", out.getvalue())
+
+    def test__posts_skewed(self):
+        self.seed()
+        replies = sorted(Topic.objects.values_list("replies_count", flat=True))
+        self.assertGreater(replies[-1], 5 * replies[len(replies) // 2])
+
+    def test__timestamps_generated(self):
+        self.seed("--days=30")
+        topic = Topic.objects.order_by("pk").first()
+        first, *_, last = topic.posts.order_by("pk")
+        self.assertLessEqual(first.created_at, last.created_at)
+        self.assertEqual(topic.last_updated, last.created_at)
+        board = topic.board
+        self.assertEqual(board.last_updated, board.last_post.created_at)
+
+    def test__messages_rendered_and_indexed(self):
+        self.seed()
+        post = Post.objects.order_by("pk").first()
+        self.assertTrue(post.message_html.startswith("<p>"))
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) FROM {INDEX_TABLE}")
+            self.assertEqual(cursor.fetchone()[0], 400)
+
+    def test__skip_search_index(self):
+        output = self.seed("--skip-search-index")
+        self.assertIn("rebuild_search_index", output)
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) FROM {INDEX_TABLE}")
+            self.assertEqual(cursor.fetchone()[0], 0)
+
+    def test__same_seed_same_forum(self):
+        self.seed("--seed=1")
+        subjects = list(
+            Topic.objects.order_by("pk").values_list("subject", "replies_count")
+        )
+        Board.objects.all().delete()
+        User.objects.all().delete()
+        self.seed("--seed=1")
+        self.assertEqual(
+            list(Topic.objects.order_by("pk").values_list("subject", "replies_count")),
+            subjects,
+        )
+
+    def test__seed_reused(self):
+        self.seed()
+        with self.assertRaises(CommandError):
+            self.seed()
@@ -0,0 +1,142 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from boards.models import Board, Post, Topic
+from boards.viewcounts import view_counts
+
+
+class ConditionalGetTestCase(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.addCleanup(view_counts.clear)
+        self.board = Board.objects.create(name="board", description="About board.")
+        self.username = "test_user"
+        self.password = "test_password_123"
+        self.user = User.objects.create_user(
+            username=self.username, email="user@test.com", password=self.password
+        )
+        self.topic = Topic.objects.create(
+            subject="Topic", board=self.board, starting_user=self.user
+        )
+        self.post = Post.objects.create(
+            message="Message", topic=self.topic, created_by=self.user
+        )
+        self.urls = {
+            "home": reverse("home"),
+            "board_topics": reverse("board_topics", kwargs={"board_pk": self.board.pk}),
+            "topic_posts": reverse(
+                "topic_posts",
+                kwargs={"board_pk": self.board.pk, "topic_pk": self.topic.pk},
+            ),
+        }
+
+    def revalidate(self, url, response, **extra):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"], **extra)
+
+
+class ConditionalGetTests(ConditionalGetTestCase):
+    def test__not_modified(self):
+        for name, url in self.urls.items():
+            with self.subTest(name):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertIn("Last-Modified", response)
+                self.assertEqual(self.revalidate(url, response).status_code, 304)
+
+    def test__if_modified_since(self):
+        url = self.urls["board_topics"]
+        response = self.client.get(url)
+        response = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test__not_modified_skips_posts_table(self):
+        url = self.urls["topic_posts"]
+        response = self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.revalidate(url, response)
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse([q for q in queries if "boards_post" in q["sql"]])
+
+    def test__cached_page_not_modified_without_queries(self):
+        url = self.urls["board_topics"]
+        response = self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.revalidate(url, response)
+        self.assertEqual(response.status_code, 304)
+
+    def test__not_modified_counts_view(self):
+        url = self.urls["topic_posts"]
+        response = self.client.get(url)
+        self.revalidate(url, response, REMOTE_ADDR="10.0.0.1")
+        self.assertEqual(self.topic.get_views_count(), 2)
+
+    def test__validator_per_page(self):
+        url = self.urls["topic_posts"]
+        first = self.client.get(url)
+        response = self.client.get(url, {"page": 1}, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, 200)
+
+    def test__validator_per_user(self):
+        url = self.urls["topic_posts"]
+        anonymous = self.client.get(url)
+        self.client.login(username=self.username, password=self.password)
+        response = self.revalidate(url, anonymous)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("private", response["Cache-Control"])
+        self.assertEqual(self.revalidate(url, response).status_code, 304)
+
+    def test__not_found(self):
+        url = reverse("board_topics", kwargs={"board_pk": 99})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn("ETag", response)
+
+
+class ConditionalGetInvalidationTests(ConditionalGetTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.client.login(username=self.username, password=self.password)
+        self.responses = {name: self.client.get(url) for name, url in self.urls.items()}
+
+    def assertModified(self, *names):
+        for name in names:
+            with self.subTest(name):
+                response = self.revalidate(self.urls[name], self.responses[name])
+                self.assertEqual(response.status_code, 200)
+
+    def test__reply_modifies(self):
+        url = reverse(
+            "reply_topic",
+            kwargs={"board_pk": self.board.pk, "topic_pk": self.topic.pk},
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(url, {"message": "Reply"})
+        self.assertModified("home", "board_topics", "topic_posts")
+
+    def test__edit_modifies(self):
+        url = reverse(
+            "edit_post",
+            kwargs={
+                "board_pk": self.board.pk,
+                "topic_pk": self.topic.pk,
+                "post_pk": self.post.pk,
+            },
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(url, {"message": "Edited"})
+        self.assertModified("topic_posts")
+
+    def test__deleted_post_modifies(self):
+        reply = Post.objects.create(
+            message="Reply", topic=self.topic, created_by=self.user
+        )
+        self.responses["topic_posts"] = self.client.get(self.urls["topic_posts"])
+        with self.captureOnCommitCallbacks(execute=True):
+            reply.delete()
+        self.assertModified("topic_posts")
@@ -0,0 +1,103 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from boards.models import Board, Post, Topic
+
+
+class CountersTestCase(TestCase):
+    def setUp(self) -> None:
+        self.board = Board.objects.create(
+            name="Heheszki", description="All the heheszki."
+        )
+        self.username = "test_user"
+        self.password = "test_password_123"
+        User.objects.create_user(
+            username=self.username, email="user@test.com", password=self.password
+        )
+        self.client.login(username=self.username, password=self.password)
+        self.client.post(
+            reverse("new_topic", kwargs={"board_pk": self.board.pk}),
+            {"subject": "Hello", "message": "Jestescie cali?"},
+        )
+        self.topic = Topic.objects.get()
+
+    def reply(self, message: str):
+        url = reverse(
+            "reply_topic",
+            kwargs={"board_pk": self.board.pk, "topic_pk": self.topic.pk},
+        )
+        self.client.post(url, {"message": message})
+
+    def refresh(self):
+        self.board.refresh_from_db()
+        self.topic.refresh_from_db()
+
+
+class NewTopicCountersTests(CountersTestCase):
+    def test__counters(self):
+        self.refresh()
+        self.assertEqual(self.board.topics_count, 1)
+        self.assertEqual(self.board.posts_count, 1)
+        self.assertEqual(self.topic.replies_count, 0)
+
+    def test__last_post(self):
+        self.refresh()
+        post = Post.objects.get()
+        self.assertEqual(self.board.last_post, post)
+        self.assertEqual(self.topic.last_post, post)
+        self.assertEqual(self.board.last_updated, post.created_at)
+
+
+class ReplyCountersTests(CountersTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.reply("jestesmy cali!")
+        self.reply("na pewno?")
+        self.refresh()
+
+    def test__counters(self):
+        self.assertEqual(self.board.topics_count, 1)
+        self.assertEqual(self.board.posts_count, 3)
+        self.assertEqual(self.topic.replies_count, 2)
+        self.assertEqual(self.topic.get_page_count(), 1)
+
+    def test__last_post(self):
+        post = Post.objects.get(message="na pewno?")
+        self.assertEqual(self.board.last_post, post)
+        self.assertEqual(self.topic.last_post, post)
+        self.assertEqual(self.topic.last_updated, post.created_at)
+        self.assertEqual(self.board.last_updated, post.created_at)
+
+
+class DeleteCountersTests(CountersTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.reply("jestesmy cali!")
+        self.reply("na pewno?")
+
+    def test__post_deleted(self):
+        last_updated = Topic.objects.get().last_updated
+        Post.objects.get(message="na pewno?").delete()
+        self.refresh()
+        post = Post.objects.get(message="jestesmy cali!")
+        self.assertEqual(self.board.posts_count, 2)
+        self.assertEqual(self.topic.replies_count, 1)
+        self.assertEqual(self.board.last_post, post)
+        self.assertEqual(self.topic.last_post, post)
+        self.assertEqual(self.topic.last_updated, last_updated)
+        self.assertEqual(self.board.get_latest_post(), post)
+
+    def test__latest_post_with_newer_empty_topic(self):
+        post = Post.objects.get(message="na pewno?")
+        Topic.objects.create(
+            subject="Empty", board=self.board, starting_user=post.created_by
+        )
+        self.assertEqual(self.board.get_latest_post(), post)
+
+    def test__topic_deleted(self):
+        self.topic.delete()
+        self.board.refresh_from_db()
+        self.assertEqual(self.board.topics_count, 0)
+        self.assertEqual(self.board.posts_count, 0)
+        self.assertIsNone(self.board.last_post)
@@ -0,0 +1,110 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from boards.counters import record_new_post
+from boards.models import Board, Post, Topic
+from boards.viewcounts import view_counts
+
+
+class FragmentCacheTestCase(TestCase):
+    def setUp(self) -> None:
+        self.addCleanup(view_counts.clear)
+        cache.clear()
+        self.board = Board.objects.create(name="board", description="About board.")
+        self.password = "test_password_123"
+        self.author, self.reader = [
+            User.objects.create_user(
+                username=username, email="user@test.com", password=self.password
+            )
+            for username in ("author", "reader")
+        ]
+        self.topic = Topic.objects.create(
+            subject="Topic", board=self.board, starting_user=self.author
+        )
+        self.post = Post.objects.create(
+            message="Original", topic=self.topic, created_by=self.author
+        )
+        record_new_post(self.post, new_topic=True)
+        self.topic_url = reverse(
+            "topic_posts", kwargs={"board_pk": self.board.pk, "topic_pk": self.topic.pk}
+        )
+        self.edit_url = reverse(
+            "edit_post",
+            kwargs={
+                "board_pk": self.board.pk,
+                "topic_pk": self.topic.pk,
+                "post_pk": self.post.pk,
+            },
+        )
+
+    def login(self, user: User):
+        self.client.login(username=user.username, password=self.password)
+
+    def age_post(self):
+        Post.objects.update(created_at=timezone.now() - timedelta(days=2))
+
+
+class PostBodyFragmentTests(FragmentCacheTestCase):
+    def test__body_cached(self):
+        self.login(self.reader)
+        self.client.get(self.topic_url)
+        Post.objects.update(message="Changed", message_html="<p>Changed</p>")
+        self.assertContains(self.client.get(self.topic_url), "Original")
+
+    def test__body_invalidated_on_edit(self):
+        self.login(self.author)
+        self.client.get(self.topic_url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(self.edit_url, {"message": "Edited"})
+        self.assertContains(self.client.get(self.topic_url), "Edited")
+
+    def test__relative_time_not_cached(self):
+        self.login(self.reader)
+        self.client.get(self.topic_url)
+        self.age_post()
+        self.assertContains(self.client.get(self.topic_url), "2\xa0days ago")
+
+    def test__edit_button_rendered_per_user(self):
+        self.login(self.reader)
+        self.assertNotContains(self.client.get(self.topic_url), self.edit_url)
+        self.login(self.author)
+        self.assertContains(self.client.get(self.topic_url), self.edit_url)
+
+
+class BoardRowFragmentTests(FragmentCacheTestCase):
+    def test__relative_time_not_cached(self):
+        self.login(self.reader)
+        self.client.get(reverse("home"))
+        self.age_post()
+        self.assertContains(self.client.get(reverse("home")), "2\xa0days ago")
+
+    def test__row_invalidated_on_reply(self):
+        self.login(self.reader)
+        self.assertContains(self.client.get(reverse("home")), "By author")
+        url = reverse(
+            "reply_topic",
+            kwargs={"board_pk": self.board.pk, "topic_pk": self.topic.pk},
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(url, {"message": "Reply"})
+        self.assertContains(self.client.get(reverse("home")), "By reader")
+
+
+class TopicRowFragmentTests(FragmentCacheTestCase):
+    def test__row_invalidated_on_reply(self):
+        self.login(self.reader)
+        url = reverse("board_topics", kwargs={"board_pk": self.board.pk})
+        self.client.get(url)
+        reply_url = reverse(
+            "reply_topic",
+            kwargs={"board_pk": self.board.pk, "topic_pk": self.topic.pk},
+        )
+        for message in ("Second", "Third", "Fourth"):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(reply_url, {"message": message})
+        self.assertContains(self.client.get(url), f"{self.topic_url}?page=2")
@@ -0,0 +1,98 @@
+import re
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.http import HttpResponse
+from django.shortcuts import render
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.urls import reverse
+
+from boards.models import Board, Post, Topic
+from django_learning import instrumentation
+from django_learning.instrumentation import (
+    QueryInstrumentationMiddleware,
+    fingerprint,
+)
+
+
+class FingerprintTests(SimpleTestCase):
+    def test__values_replaced(self):
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE a = 'x''y' AND b = 12 LIMIT 21"),
+            "SELECT * FROM t WHERE a = ? AND b = ? LIMIT ?",
+        )
+
+    def test__placeholders_and_lists_collapsed(self):
+        self.assertEqual(
+            fingerprint('SELECT "t"."id"\n  FROM "t" WHERE "t"."id" IN (%s, %s, %s)'),
+            'SELECT "t"."id" FROM "t" WHERE "t"."id" IN (...)',
+        )
+
+    def test__identifiers_kept(self):
+        self.assertEqual(
+            fingerprint('SELECT "T3"."id" FROM "boards_post" U0'),
+            'SELECT "T3"."id" FROM "boards_post" U0',
+        )
+
+
+class QueryInstrumentationMiddlewareTests(TestCase):
+    def setUp(self) -> None:
+        user = User.objects.create_user(username="test_user", password="test_pass")
+        for i in range(4):
+            board = Board.objects.create(name=f"board_{i}", description="About.")
+            topic = Topic.objects.create(
+                subject=f"topic_{i}", board=board, starting_user=user
+            )
+            Post.objects.create(message="Message.", topic=topic, created_by=user)
+        self.request = RequestFactory().get("/instrumented/")
+
+    def instrument(self, view):
+        return QueryInstrumentationMiddleware(view)(self.request)
+
+    def test__server_timing_header(self):
+        response = self.client.get(reverse("home"))
+        header = response["Server-Timing"]
+        self.assertRegex(header, r'^sql;dur=[\d.]+;desc="\d+ queries", ')
+        self.assertRegex(header, r"template;dur=[\d.]+, total;dur=[\d.]+$")
+
+    def test__queries_counted(self):
+        response = self.instrument(
+            lambda request: HttpResponse(len(list(Board.objects.all())))
+        )
+        self.assertIn('desc="1 queries"', response["Server-Timing"])
+
+    def test__template_rendering_timed(self):
+        response = self.instrument(
+            lambda request: render(request, "includes/form.html", {"form": None})
+        )
+        duration = re.search(r"template;dur=([\d.]+)", response["Server-Timing"])
+        self.assertGreater(float(duration.group(1)), 0)
+
+    def test__n_plus_one_logged(self):
+        def view(request):
+            subjects = [topic.board.name for topic in Topic.objects.all()]
+            return HttpResponse(", ".join(subjects))
+
+        with self.assertLogs(instrumentation.logger, "WARNING") as logs:
+            self.instrument(view)
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn("Likely N+1 in GET /instrumented/: 4 x", logs.output[0])
+        self.assertIn(
+            'FROM "boards_board" WHERE "boards_board"."id" = ?', logs.output[0]
+        )
+
+    def test__slow_request_logged(self):
+        with mock.patch.object(instrumentation, "SLOW_REQUEST_QUERIES", 2):
+            with self.assertLogs(instrumentation.logger, "WARNING") as logs:
+                self.instrument(
+                    lambda request: HttpResponse(
+                        [Board.objects.count(), Topic.objects.count()]
+                    )
+                )
+        self.assertIn("Slow request GET /instrumented/", logs.output[0])
+        self.assertIn("2 queries", logs.output[0])
+        self.assertIn('FROM "boards_topic"', logs.output[0])
+
+    def test__fast_request_not_logged(self):
+        with self.assertNoLogs(instrumentation.logger, "WARNING"):
+            self.instrument(lambda request: HttpResponse(Board.objects.count()))
@@ -0,0 +1,86 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from boards.markup import RENDERER_VERSION
+from boards.models import Board, Post, Topic
+
+
+class PostMarkupTestCase(TestCase):
+    def setUp(self) -> None:
+        self.board = Board.objects.create(name="board", description="About board.")
+        self.username = "test_user"
+        self.password = "test_password_123"
+        self.user = User.objects.create_user(
+            username=self.username, email="user@test.com", password=self.password
+        )
+        self.topic = Topic.objects.create(
+            subject="Topic", board=self.board, starting_user=self.user
+        )
+        self.client.login(username=self.username, password=self.password)
+
+
+class RenderOnWriteTests(PostMarkupTestCase):
+    def test__reply_rendered(self):
+        url = reverse(
+            "reply_topic",
+            kwargs={"board_pk": self.board.pk, "topic_pk": self.topic.pk},
+        )
+        self.client.post(url, {"message": "**bold**"})
+        post = Post.objects.get()
+        self.assertEqual(post.message_html, "<p><strong>bold</strong></p>")
+        self.assertEqual(post.message_html_version, RENDERER_VERSION)
+
+    def test__new_topic_rendered(self):
+        url = reverse("new_topic", kwargs={"board_pk": self.board.pk})
+        self.client.post(url, {"subject": "New", "message": "*em*"})
+        self.assertEqual(Post.objects.get().message_html, "<p><em>em</em></p>")
+
+    def test__edit_rendered(self):
+        post = Post.objects.create(
+            message="old", topic=self.topic, created_by=self.user
+        )
+        post.render_message()
+        post.save()
+        url = reverse(
+            "edit_post",
+            kwargs={
+                "board_pk": self.board.pk,
+                "topic_pk": self.topic.pk,
+                "post_pk": post.pk,
+            },
+        )
+        self.client.post(url, {"message": "new"})
+        post.refresh_from_db()
+        self.assertEqual(post.message_html, "<p>new</p>")
+
+
+class LazyRenderTests(PostMarkupTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.post = Post.objects.create(
+            message="`code`", topic=self.topic, created_by=self.user
+        )
+
+    def test__missing_render_stored(self):
+        html = self.post.get_message_as_markdown()
+        self.assertEqual(html, "<p><code>code</code></p>")
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.message_html, html)
+        self.assertEqual(self.post.message_html_version, RENDERER_VERSION)
+
+    def test__stale_render_refreshed(self):
+        Post.objects.update(message_html="stale", message_html_version="old")
+        self.post.refresh_from_db()
+        self.assertEqual(
+            self.post.get_message_as_markdown(), "<p><code>code</code></p>"
+        )
+
+    def test__fresh_render_not_parsed(self):
+        self.post.get_message_as_markdown()
+        self.post.refresh_from_db()
+        with mock.patch("boards.models.render_markdown") as render_markdown:
+            self.post.get_message_as_markdown()
+        render_markdown.assert_not_called()
@@ -0,0 +1,122 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from boards.models import Board, Post, Topic
+from boards.pagecache import get_stats
+from boards.viewcounts import view_counts
+
+
+class PageCacheTestCase(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.addCleanup(view_counts.clear)
+        self.board = Board.objects.create(name="board", description="About board.")
+        self.username = "test_user"
+        self.password = "test_password_123"
+        self.user = User.objects.create_user(
+            username=self.username, email="user@test.com", password=self.password
+        )
+        self.topic = Topic.objects.create(
+            subject="Topic", board=self.board, starting_user=self.user
+        )
+        self.post = Post.objects.create(
+            message="Message", topic=self.topic, created_by=self.user
+        )
+        self.post.get_message_as_markdown()
+        self.urls = {
+            "home": reverse("home"),
+            "board_topics": reverse("board_topics", kwargs={"board_pk": self.board.pk}),
+            "topic_posts": reverse(
+                "topic_posts",
+                kwargs={"board_pk": self.board.pk, "topic_pk": self.topic.pk},
+            ),
+        }
+
+
+class AnonymousPageCacheTests(PageCacheTestCase):
+    def test__pages_served_from_cache(self):
+        for name, url in self.urls.items():
+            with self.subTest(name):
+                first = self.client.get(url)
+                with self.assertNumQueries(0):
+                    second = self.client.get(url)
+                self.assertEqual(second.status_code, 200)
+                self.assertEqual(second.content, first.content)
+
+    def test__stats(self):
+        url = self.urls["home"]
+        self.client.get(url)
+        self.client.get(url)
+        self.client.get(url)
+        self.assertEqual(get_stats(), {"hits": 2, "misses": 1})
+
+    def test__query_string_in_key(self):
+        self.client.get(self.urls["topic_posts"])
+        response = self.client.get(self.urls["topic_posts"], {"page": 1})
+        self.assertEqual(response.context["page_obj"].number, 1)
+
+    def test__cached_topic_view_counted(self):
+        self.client.get(self.urls["topic_posts"])
+        self.client.get(self.urls["topic_posts"], REMOTE_ADDR="10.0.0.1")
+        self.assertEqual(self.topic.get_views_count(), 2)
+
+    def test__not_found_not_cached(self):
+        url = reverse("board_topics", kwargs={"board_pk": 99})
+        self.client.get(url)
+        Board.objects.create(pk=99, name="late", description="Created later.")
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+
+class LoggedInPageCacheTests(PageCacheTestCase):
+    def test__not_cached(self):
+        self.client.login(username=self.username, password=self.password)
+        self.client.get(self.urls["home"])
+        response = self.client.get(self.urls["home"])
+        self.assertIsNotNone(response.context)
+        self.assertEqual(get_stats(), {"hits": 0, "misses": 0})
+
+
+class PageCacheInvalidationTests(PageCacheTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        for url in self.urls.values():
+            self.client.get(url)
+        self.client.login(username=self.username, password=self.password)
+
+    def assertFresh(self, *names):
+        self.client.logout()
+        for name in names:
+            with self.subTest(name):
+                response = self.client.get(self.urls[name])
+                self.assertIsNotNone(response.context)
+
+    def test__reply_invalidates(self):
+        url = reverse(
+            "reply_topic",
+            kwargs={"board_pk": self.board.pk, "topic_pk": self.topic.pk},
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(url, {"message": "Reply"})
+        self.assertFresh("home", "board_topics", "topic_posts")
+
+    def test__new_topic_invalidates(self):
+        url = reverse("new_topic", kwargs={"board_pk": self.board.pk})
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(url, {"subject": "New", "message": "Message"})
+        self.assertFresh("home", "board_topics")
+
+    def test__edit_invalidates(self):
+        url = reverse(
+            "edit_post",
+            kwargs={
+                "board_pk": self.board.pk,
+                "topic_pk": self.topic.pk,
+                "post_pk": self.post.pk,
+            },
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(url, {"message": "Edited"})
+        self.assertFresh("topic_posts")
+        self.assertContains(self.client.get(self.urls["topic_posts"]), "Edited")
@@ -0,0 +1,79 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from boards.models import Board, Post, Topic
+from boards.viewcounts import view_counts
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self) -> None:
+        self.addCleanup(view_counts.clear)
+        cache.clear()
+        board = Board.objects.create(name="board", description="About board.")
+        user = User.objects.create_user(
+            username="test_user", email="user@test.com", password="test_password"
+        )
+        topic = Topic.objects.create(subject="Topic", board=board, starting_user=user)
+        self.posts = [
+            Post.objects.create(message=f"Message {i}", topic=topic, created_by=user)
+            for i in range(7)
+        ]
+        self.url = reverse(
+            "topic_posts", kwargs={"board_pk": board.pk, "topic_pk": topic.pk}
+        )
+
+    def get_page(self, cursor=None):
+        data = {"cursor": cursor} if cursor else {}
+        return self.client.get(self.url, data).context["page_obj"]
+
+    def test__first_page(self):
+        page = self.get_page()
+        self.assertEqual(list(page), self.posts[:-4:-1])
+        self.assertTrue(page.has_next())
+        self.assertFalse(page.has_previous())
+
+    def test__next_pages(self):
+        page = self.get_page(self.get_page().next_cursor)
+        self.assertEqual(list(page), self.posts[3:0:-1])
+        self.assertTrue(page.has_previous())
+
+        page = self.get_page(page.next_cursor)
+        self.assertEqual(list(page), self.posts[:1])
+        self.assertFalse(page.has_next())
+
+    def test__previous_page(self):
+        second_page = self.get_page(self.get_page().next_cursor)
+        third_page = self.get_page(second_page.next_cursor)
+        page = self.get_page(third_page.previous_cursor)
+        self.assertEqual(list(page), list(second_page))
+        self.assertTrue(page.has_next())
+        self.assertTrue(page.has_previous())
+
+    def test__oldest_page(self):
+        page = self.get_page(self.get_page().last_cursor)
+        self.assertEqual(list(page), self.posts[2::-1])
+        self.assertFalse(page.has_next())
+        self.assertTrue(page.has_previous())
+
+    def test__no_count_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.get_page(self.get_page().next_cursor)
+        topic_counts = [
+            query["sql"]
+            for query in queries
+            if "COUNT(" in query["sql"] and '"topic_id" =' in query["sql"]
+        ]
+        self.assertEqual(topic_counts, [])
+
+    def test__invalid_cursor(self):
+        response = self.client.get(self.url, {"cursor": "forged"})
+        self.assertEqual(response.status_code, 404)
+
+    def test__page_number_fallback(self):
+        page = self.client.get(self.url, {"page": 2}).context["page_obj"]
+        self.assertEqual(page.number, 2)
+        self.assertEqual(list(page), self.posts[3:0:-1])
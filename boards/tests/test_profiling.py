@@ -0,0 +1,104 @@
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from django_learning import instrumentation, profiling
+
+
+class ProfilingTestCase(TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        for patcher in (
+            mock.patch.object(profiling, "PROFILE_DIR", directory.name),
+            # Profiled requests are slow on purpose.
+            mock.patch.object(instrumentation, "SLOW_REQUEST_DURATION", float("inf")),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.staff = User.objects.create_user(
+            username="staff", password="staff_password", is_staff=True
+        )
+        self.user = User.objects.create_user(username="user", password="password")
+        self.home_url = reverse("home")
+
+    def files(self) -> list:
+        return sorted(path.suffix for path in self.directory.iterdir())
+
+
+class ProfilingMiddlewareTests(ProfilingTestCase):
+    def test__staff_request_profiled(self):
+        self.client.force_login(self.staff)
+        response = self.client.get(self.home_url, {"profile": "1"})
+        capture_id = response["X-Profile-Capture"]
+        self.assertEqual(profiling.capture_ids(), [capture_id])
+        self.assertEqual(self.files(), [".json", ".prof"])
+
+    def test__header_traces_allocations(self):
+        self.client.force_login(self.staff)
+        response = self.client.get(self.home_url, HTTP_X_PROFILE="memory")
+        self.assertEqual(self.files(), [".json", ".prof", ".tracemalloc"])
+        allocations = profiling.top_allocations(response["X-Profile-Capture"], 5)
+        self.assertTrue(allocations)
+
+    def test__other_users_not_profiled(self):
+        self.client.force_login(self.user)
+        response = self.client.get(self.home_url, {"profile": "1"})
+        self.assertNotIn("X-Profile-Capture", response)
+        self.assertEqual(self.files(), [])
+
+    def test__sampled_requests_profiled(self):
+        with mock.patch.object(profiling, "PROFILE_SAMPLE_RATE", 1.0):
+            response = self.client.get(self.home_url)
+        self.assertIn("X-Profile-Capture", response)
+
+    def test__old_captures_rotated(self):
+        self.client.force_login(self.staff)
+        with mock.patch.object(profiling, "PROFILE_KEEP", 2):
+            for _ in range(3):
+                self.client.get(self.home_url, {"profile": "1"})
+        self.assertEqual(len(profiling.capture_ids()), 2)
+        self.assertEqual(len(self.files()), 4)
+
+
+class ProfileCapturesViewTests(ProfilingTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.client.force_login(self.staff)
+        response = self.client.get(self.home_url, {"profile": "memory"})
+        self.capture_id = response["X-Profile-Capture"]
+
+    def test__top_functions_listed(self):
+        response = self.client.get(reverse("profile_captures"))
+        self.assertContains(response, "GET /?profile=memory")
+        self.assertContains(response, "get_response")
+        self.assertContains(response, "Allocated at")
+
+    def test__staff_only(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("profile_captures"))
+        self.assertRedirects(
+            response, f"{reverse('admin:login')}?next={reverse('profile_captures')}"
+        )
+
+    def test__capture_downloaded(self):
+        url = reverse("profile_capture_download", args=[self.capture_id, "prof"])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(f"{self.capture_id}.prof", response["Content-Disposition"])
+        response.close()
+
+    def test__unknown_capture_not_found(self):
+        for capture_id, suffix in (
+            (self.capture_id, "json.bak"),
+            ("20260101T000000-00000000", "prof"),
+            ("..", "prof"),
+        ):
+            url = reverse("profile_capture_download", args=[capture_id, suffix])
+            self.assertEqual(self.client.get(url).status_code, 404)
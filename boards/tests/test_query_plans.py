@@ -0,0 +1,112 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from boards.models import Board, Post, Topic
+from boards.viewcounts import view_counts
+
+HOT_TABLES = ("boards_topic", "boards_post")
+
+
+class QueryPlanTestCase(TestCase):
+    """
+    Fails when SQLite plans a hot query with a full table scan or a
+    temporary B-tree sort instead of an index.
+
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username="test_user", email="user@test.com", password="test_password"
+        )
+        cls.board = Board.objects.create(name="board", description="About board.")
+        for t in range(10):
+            topic = Topic.objects.create(
+                subject=f"Topic {t}", board=cls.board, starting_user=cls.user
+            )
+            for p in range(5):
+                Post.objects.create(
+                    message=f"Post {p}", topic=topic, created_by=cls.user
+                )
+        cls.topic = topic
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.addCleanup(view_counts.clear)
+
+    def explain(self, sql, params=()) -> list:
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            return [row[-1] for row in cursor.fetchall()]
+
+    def assertIndexed(self, sql, params=()):
+        plan = self.explain(sql, params)
+        for step in plan:
+            with self.subTest(sql=sql, step=step):
+                self.assertFalse(step.startswith("SCAN"), "full scan")
+                self.assertNotIn("TEMP B-TREE", step, "temporary sort")
+
+    def assertQuerysetIndexed(self, queryset):
+        self.assertIndexed(*queryset.query.sql_with_params())
+
+    def assertRequestIndexed(self, url, data=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, data)
+        self.assertEqual(response.status_code, 200)
+        hot = [q["sql"] for q in queries if any(t in q["sql"] for t in HOT_TABLES)]
+        self.assertTrue(hot)
+        for sql in hot:
+            self.assertIndexed(sql)
+        return response
+
+
+class ModelQueryPlanTests(QueryPlanTestCase):
+    def test__board_topics(self):
+        self.assertQuerysetIndexed(
+            self.board.topics.with_pages().order_by("-last_updated")
+        )
+
+    def test__topic_posts(self):
+        self.assertQuerysetIndexed(
+            self.topic.posts.select_related("created_by").order_by("-created_at")
+        )
+
+    def test__last_ten_posts(self):
+        self.assertQuerysetIndexed(self.topic.get_last_ten_posts())
+
+
+class ViewQueryPlanTests(QueryPlanTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.urls = {
+            "board_topics": reverse("board_topics", kwargs={"board_pk": self.board.pk}),
+            "topic_posts": reverse(
+                "topic_posts",
+                kwargs={"board_pk": self.board.pk, "topic_pk": self.topic.pk},
+            ),
+        }
+
+    def test__first_pages(self):
+        for name, url in self.urls.items():
+            with self.subTest(name):
+                self.assertRequestIndexed(url)
+
+    def test__cursor_pages(self):
+        for name, url in self.urls.items():
+            with self.subTest(name):
+                first = self.client.get(url).context["page_obj"]
+                cache.clear()
+                response = self.assertRequestIndexed(url, {"cursor": first.next_cursor})
+                self.assertRequestIndexed(
+                    url, {"cursor": response.context["page_obj"].previous_cursor}
+                )
+                self.assertRequestIndexed(url, {"cursor": first.last_cursor})
+
+    def test__numbered_pages(self):
+        for name, url in self.urls.items():
+            with self.subTest(name):
+                self.assertRequestIndexed(url, {"page": 2})
@@ -0,0 +1,119 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from boards.models import Board, Post, Topic
+from boards.readers import BloomFilter, HyperLogLog, RecentReaders
+from boards.viewcounts import view_counts
+
+
+class HyperLogLogTests(TestCase):
+    def test__new_value_reported(self):
+        sketch = HyperLogLog(precision=10)
+        self.assertTrue(sketch.add("user:1"))
+        self.assertFalse(sketch.add("user:1"))
+
+    def test__estimate(self):
+        sketch = HyperLogLog(precision=10)
+        for i in range(20000):
+            sketch.add(f"user:{i}")
+        self.assertAlmostEqual(sketch.estimate(), 20000, delta=20000 * 0.1)
+
+    def test__small_estimate(self):
+        sketch = HyperLogLog(precision=10)
+        for i in range(10):
+            sketch.add(f"user:{i}")
+        self.assertEqual(sketch.estimate(), 10)
+
+    def test__registers_round_trip(self):
+        sketch = HyperLogLog(precision=10)
+        sketch.add("user:1")
+        copy = HyperLogLog(10, bytes(sketch.registers))
+        self.assertFalse(copy.add("user:1"))
+
+
+class BloomFilterTests(TestCase):
+    def test__members_found(self):
+        members = BloomFilter.for_capacity(1000, 0.01)
+        for i in range(1000):
+            members.add(f"user:{i}")
+        self.assertTrue(all(f"user:{i}" in members for i in range(1000)))
+
+    def test__false_positives(self):
+        members = BloomFilter.for_capacity(1000, 0.01)
+        for i in range(1000):
+            members.add(f"user:{i}")
+        false_positives = sum(f"other:{i}" in members for i in range(10000))
+        self.assertLess(false_positives, 10000 * 0.02)
+
+
+class RecentReadersTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.readers = RecentReaders(capacity=1000, error_rate=0.01)
+
+    def test__many_distinct_readers_counted(self):
+        new = sum(self.readers.add(1, f"user:{i}") for i in range(20000))
+        self.assertGreater(new, 20000 * 0.98)
+
+    def test__recent_reader_not_counted(self):
+        for i in range(1500):
+            self.readers.add(1, f"user:{i}")
+        self.assertFalse(self.readers.add(1, "user:0"))
+        self.assertFalse(self.readers.add(1, "user:1499"))
+
+    def test__reader_counted_again_after_rotations(self):
+        self.readers.add(1, "user:0")
+        for i in range(1, 2100):
+            self.readers.add(1, f"user:{i}")
+        self.assertTrue(self.readers.add(1, "user:0"))
+
+    def test__topics_separate(self):
+        self.assertTrue(self.readers.add(1, "user:0"))
+        self.assertTrue(self.readers.add(2, "user:0"))
+
+
+class TopicReadersTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.addCleanup(view_counts.clear)
+        self.board = Board.objects.create(name="board", description="About board.")
+        self.password = "test_password"
+        self.users = [
+            User.objects.create_user(
+                username=f"user_{i}", email="user@test.com", password=self.password
+            )
+            for i in range(2)
+        ]
+        self.topic = Topic.objects.create(
+            subject="Topic", board=self.board, starting_user=self.users[0]
+        )
+        Post.objects.create(
+            message="Message", topic=self.topic, created_by=self.users[0]
+        )
+        self.url = reverse(
+            "topic_posts", kwargs={"board_pk": self.board.pk, "topic_pk": self.topic.pk}
+        )
+
+    def read_as(self, user: User):
+        self.client.login(username=user.username, password=self.password)
+        self.client.get(self.url)
+        self.client.get(self.url)
+
+    def test__view_counted_once_per_reader(self):
+        self.read_as(self.users[0])
+        self.read_as(self.users[1])
+        self.assertEqual(self.topic.get_views_count(), 2)
+
+    def test__session_not_written(self):
+        response = self.client.get(self.url)
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, response.cookies)
+
+    def test__readers_listed(self):
+        self.read_as(self.users[0])
+        self.read_as(self.users[1])
+        url = reverse("board_topics", kwargs={"board_pk": self.board.pk})
+        topics = self.client.get(url).context["topics"]
+        self.assertEqual(topics[0].readers_count, 2)
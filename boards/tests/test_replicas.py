@@ -0,0 +1,142 @@
+import os
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.test.client import RequestFactory
+from django.urls import reverse
+
+from boards import replicas
+from boards.models import Board, Post, Topic
+from boards.pagecache import get_generations
+from boards.replicas import PRIMARY_WRITE_KEY, ReplicaRouter
+
+
+class ReplicaRouterTests(SimpleTestCase):
+    def setUp(self) -> None:
+        self.router = ReplicaRouter()
+
+    def test__outside_replica_views(self):
+        self.assertIsNone(self.router.db_for_read(Board))
+
+    def test__inside_replica_views(self):
+        token = replicas._reading_replica.set(True)
+        self.addCleanup(replicas._reading_replica.reset, token)
+        self.assertEqual(self.router.db_for_read(Board), "replica")
+        self.assertIsNone(self.router.db_for_read(User))
+        self.assertIsNone(self.router.db_for_write(Board))
+
+    def test__replica_not_migrated(self):
+        self.assertFalse(self.router.allow_migrate("replica", "boards"))
+        self.assertIsNone(self.router.allow_migrate("default", "boards"))
+
+
+class RefreshTests(SimpleTestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.primary = str(Path(directory.name) / "primary.sqlite3")
+        self.replica = str(Path(directory.name) / "replica.sqlite3")
+        with sqlite3.connect(self.primary) as connection:
+            connection.execute("CREATE TABLE example (value TEXT)")
+            connection.execute("INSERT INTO example VALUES ('copied')")
+
+    def test__copied(self):
+        replicas.refresh(self.primary, self.replica)
+        with sqlite3.connect(self.replica) as connection:
+            rows = connection.execute("SELECT value FROM example").fetchall()
+        self.assertEqual(rows, [("copied",)])
+
+    def test__stamp(self):
+        before = time.time()
+        started = replicas.refresh(self.primary, self.replica)
+        stamp = os.stat(replicas.stamp_path(self.replica)).st_mtime_ns / 1e9
+        self.assertEqual(stamp, started)
+        self.assertGreaterEqual(started, before)
+
+    def test__page_cache_invalidated(self):
+        before = get_generations(["replica"])
+        replicas.refresh(self.primary, self.replica)
+        self.assertNotEqual(get_generations(["replica"]), before)
+
+
+class ReadYourWritesTests(TestCase):
+    def setUp(self) -> None:
+        self.request = RequestFactory().get("/")
+        self.request.session = {}
+        patcher = mock.patch.object(replicas, "is_configured", return_value=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test__no_replica_copy(self):
+        with mock.patch.object(replicas, "snapshot_time", return_value=None):
+            self.assertFalse(replicas.should_read_replica(self.request))
+
+    def test__fresh_copy(self):
+        replicas.record_primary_write(self.request)
+        with mock.patch.object(replicas, "snapshot_time", return_value=time.time()):
+            self.assertTrue(replicas.should_read_replica(self.request))
+
+    def test__copy_older_than_write(self):
+        copied_at = time.time()
+        replicas.record_primary_write(self.request)
+        with mock.patch.object(replicas, "snapshot_time", return_value=copied_at):
+            self.assertFalse(replicas.should_read_replica(self.request))
+
+    def test__reply_recorded(self):
+        user = User.objects.create_user(username="john", password="secret_123")
+        board = Board.objects.create(name="board", description="About board.")
+        topic = Topic.objects.create(subject="Topic", board=board, starting_user=user)
+        Post.objects.create(message="Message", topic=topic, created_by=user)
+        self.client.login(username="john", password="secret_123")
+        url = reverse(
+            "reply_topic", kwargs={"board_pk": board.pk, "topic_pk": topic.pk}
+        )
+        self.client.post(url, {"message": "Reply"})
+        self.assertIn(PRIMARY_WRITE_KEY, self.client.session)
+
+    def test__session_not_written_without_replica(self):
+        with mock.patch.object(replicas, "is_configured", return_value=False):
+            replicas.record_primary_write(self.request)
+        self.assertEqual(self.request.session, {})
+
+
+class ReplicaViewsTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.board = Board.objects.create(name="board", description="About board.")
+        # The test database stands for the replica.
+        for patcher in (
+            mock.patch.object(replicas, "REPLICA", "default"),
+            mock.patch.object(replicas, "is_configured", return_value=True),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def routed_reads(self, copied_at):
+        """Returns the database each model was last read from by the home page."""
+        routed = {}
+        db_for_read = ReplicaRouter.db_for_read
+
+        def record(router, model, **hints):
+            routed[model._meta.label] = db_for_read(router, model, **hints)
+            return routed[model._meta.label]
+
+        with mock.patch.object(
+            replicas, "snapshot_time", return_value=copied_at
+        ), mock.patch.object(ReplicaRouter, "db_for_read", record):
+            response = self.client.get(reverse("home"))
+        self.assertContains(response, "board")
+        return routed
+
+    def test__reads_replica(self):
+        self.assertEqual(self.routed_reads(time.time())["boards.Board"], "default")
+
+    def test__primary_without_copy(self):
+        self.assertIsNone(self.routed_reads(None)["boards.Board"])
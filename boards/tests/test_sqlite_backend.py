@@ -0,0 +1,88 @@
+import sqlite3
+import tempfile
+import threading
+from pathlib import Path
+
+from django.db import OperationalError
+from django.db.utils import ConnectionHandler
+from django.test import SimpleTestCase
+
+
+class ProductionSQLiteBackendTests(SimpleTestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = str(Path(directory.name) / "db.sqlite3")
+
+    def connect(self, **options):
+        options = {
+            "timeout": 0.01,
+            "transaction_mode": "IMMEDIATE",
+            "pragmas": {"journal_mode": "WAL", "synchronous": "NORMAL"},
+            **options,
+        }
+        connections = ConnectionHandler(
+            {
+                "default": {
+                    "ENGINE": "django_learning.db",
+                    "NAME": self.path,
+                    "OPTIONS": options,
+                }
+            }
+        )
+        connection = connections["default"]
+        self.addCleanup(connection.close)
+        connection.ensure_connection()
+        return connection
+
+    def lock_database(self, seconds: float):
+        """Holds the write lock from another connection for some time."""
+        locker = sqlite3.connect(
+            self.path, isolation_level=None, check_same_thread=False
+        )
+        locker.execute("BEGIN IMMEDIATE")
+        timer = threading.Timer(seconds, locker.execute, ["COMMIT"])
+        timer.start()
+        self.addCleanup(timer.join)
+
+    def test__pragmas(self):
+        connection = self.connect()
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA journal_mode")
+            self.assertEqual(cursor.fetchone()[0], "wal")
+            cursor.execute("PRAGMA synchronous")
+            self.assertEqual(cursor.fetchone()[0], 1)
+
+    def test__options_not_passed_to_sqlite(self):
+        connection = self.connect(busy_retries=3)
+        params = connection.get_connection_params()
+        self.assertNotIn("pragmas", params)
+        self.assertNotIn("busy_retries", params)
+
+    def test__immediate_transactions(self):
+        connection = self.connect()
+        connection._start_transaction_under_autocommit()
+        self.addCleanup(connection.connection.rollback)
+        other = sqlite3.connect(self.path, isolation_level=None, timeout=0)
+        self.addCleanup(other.close)
+        with self.assertRaises(sqlite3.OperationalError):
+            other.execute("BEGIN IMMEDIATE")
+
+    def test__busy_retried(self):
+        connection = self.connect(busy_retries=8, busy_backoff=0.02)
+        self.lock_database(0.1)
+        with connection.cursor() as cursor:
+            cursor.execute("CREATE TABLE example (id INTEGER)")
+
+    def test__busy_not_retried(self):
+        connection = self.connect()
+        self.lock_database(0.1)
+        with self.assertRaises(OperationalError):
+            with connection.cursor() as cursor:
+                cursor.execute("CREATE TABLE example (id INTEGER)")
+
+    def test__health_check(self):
+        connection = self.connect()
+        self.assertTrue(connection.is_usable())
+        connection.connection.close()
+        self.assertFalse(connection.is_usable())
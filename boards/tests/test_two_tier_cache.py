@@ -0,0 +1,111 @@
+import multiprocessing
+import tempfile
+from pathlib import Path
+
+from django.test import SimpleTestCase
+
+from django_learning.cache import TwoTierCache
+
+
+def _set_in_child(location, key, value):
+    TwoTierCache(location, {}).set(key, value)
+
+
+class TwoTierCacheTestCase(SimpleTestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.location = str(Path(directory.name) / "cache.sqlite3")
+        self.cache = self.worker()
+
+    def worker(self, **options):
+        """Another backend on the same file, standing for another process."""
+        return TwoTierCache(self.location, {"OPTIONS": options})
+
+
+class TwoTierCacheTests(TwoTierCacheTestCase):
+    def test__round_trip(self):
+        self.cache.set("key", {"value": [1, 2]})
+        self.assertEqual(self.cache.get("key"), {"value": [1, 2]})
+        self.assertEqual(self.cache.get("missing", "default"), "default")
+
+    def test__served_from_l1(self):
+        self.cache.set("key", "value")
+        self.cache.get("key")
+        self.assertEqual(self.cache.get_stats()["l1"]["hits"], 1)
+        self.assertEqual(self.cache.get_stats()["l2"]["hits"], 0)
+
+    def test__expired(self):
+        self.cache.set("key", "value", timeout=0)
+        self.assertIsNone(self.cache.get("key"))
+        self.assertTrue(self.cache.add("key", "added"))
+        self.assertFalse(self.cache.add("key", "again"))
+        self.assertEqual(self.cache.get("key"), "added")
+
+    def test__incr(self):
+        self.cache.set("counter", 1)
+        self.assertEqual(self.cache.incr("counter", 2), 3)
+        self.assertEqual(self.cache.get("counter"), 3)
+        with self.assertRaises(ValueError):
+            self.cache.incr("missing")
+
+    def test__many(self):
+        self.cache.set_many({"a": 1, "b": 2})
+        self.assertEqual(self.cache.get_many(["a", "b", "c"]), {"a": 1, "b": 2})
+        self.cache.delete_many(["a", "b"])
+        self.assertEqual(self.cache.get_many(["a", "b"]), {})
+
+    def test__l1_bounded(self):
+        cache = self.worker(L1_MAX_ENTRIES=2)
+        cache.set_many({"a": 1, "b": 2, "c": 3})
+        stats = cache.get_stats()["l1"]
+        self.assertEqual((stats["entries"], stats["evictions"]), (2, 1))
+        self.assertEqual(cache.get("a"), 1)
+
+    def test__l2_culled(self):
+        cache = self.worker(MAX_ENTRIES=10)
+        for i in range(100):
+            cache.set(f"key:{i}", i)
+        self.assertLessEqual(cache.get_stats()["l2"]["entries"], 10)
+
+
+class TwoTierCacheInvalidationTests(TwoTierCacheTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.other = self.worker()
+        self.cache.set("key", "old")
+        self.other.get("key")
+
+    def test__set_reaches_other_workers(self):
+        self.cache.set("key", "new")
+        self.assertEqual(self.other.get("key"), "new")
+
+    def test__delete_reaches_other_workers(self):
+        self.cache.delete("key")
+        self.assertIsNone(self.other.get("key"))
+
+    def test__clear_reaches_other_workers(self):
+        self.cache.clear()
+        self.assertIsNone(self.other.get("key"))
+        self.assertEqual(self.other.get_stats()["l1"]["entries"], 0)
+
+    def test__incr_reaches_other_workers(self):
+        self.cache.set("counter", 1)
+        self.other.get("counter")
+        self.cache.incr("counter")
+        self.assertEqual(self.other.get("counter"), 2)
+
+    def test__trimmed_change_log(self):
+        cache = self.worker(CHANGE_LOG_SIZE=1)
+        for i in range(100):
+            cache.set(f"filler:{i}", i)
+        cache.set("key", "new")
+        self.assertEqual(self.other.get("key"), "new")
+
+    def test__other_process(self):
+        process = multiprocessing.get_context("spawn").Process(
+            target=_set_in_child, args=(self.location, "key", "child")
+        )
+        process.start()
+        process.join()
+        self.assertEqual(self.other.get("key"), "child")
@@ -1,7 +1,14 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse, resolve
+from boards.counters import record_new_post
 from boards.views import TopicListView
-from boards.models import Board
+from boards.models import Board, Post, Topic
 
 
 class BoardTopicsTests(TestCase):
@@ -35,3 +42,46 @@ class BoardTopicsTests(TestCase):
 
         self.assertContains(response, f'href="{home_url}"')
         self.assertContains(response, f'href="{new_topic_url}"')
+
+
+class BoardTopicsQueriesTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.board = Board.objects.create(name="Heheszki", description="About.")
+        self.user = User.objects.create_user(
+            username="test_user", email="user@test.com", password="test_password"
+        )
+        self.url = reverse("board_topics", kwargs={"board_pk": self.board.pk})
+
+    def create_topics(self, count: int):
+        for i in range(count):
+            topic = Topic.objects.create(
+                subject=f"Topic {i}", board=self.board, starting_user=self.user
+            )
+            for j in range(i + 1):
+                post = Post.objects.create(
+                    message=f"{j}", topic=topic, created_by=self.user
+                )
+                record_new_post(post, new_topic=j == 0)
+
+    def test__query_count_does_not_grow_with_page_size(self):
+        self.create_topics(8)
+        with mock.patch.object(TopicListView, "paginate_by", 2):
+            with CaptureQueriesContext(connection) as small_page:
+                self.client.get(self.url)
+
+        cache.clear()
+        with mock.patch.object(TopicListView, "paginate_by", 8):
+            with self.assertNumQueries(len(small_page)):
+                response = self.client.get(self.url)
+
+        self.assertContains(response, "test_user", 8)
+
+    def test__page_count_precomputed(self):
+        self.create_topics(8)
+        topics = list(self.board.topics.with_pages().order_by("pk"))
+        with self.assertNumQueries(0):
+            page_counts = [topic.get_page_count() for topic in topics]
+            usernames = [topic.starting_user.username for topic in topics]
+        self.assertEqual(page_counts, [1, 1, 1, 2, 2, 2, 3, 3])
+        self.assertEqual(usernames, ["test_user"] * 8)
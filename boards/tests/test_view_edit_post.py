@@ -3,11 +3,13 @@ from django.test import TestCase
 from django.forms import ModelForm
 from django.urls import reverse, resolve
 from boards.models import Board, Post, Topic
+from boards.viewcounts import view_counts
 from boards.views import PostUpdateView
 
 
 class PostUpdateViewTestCase(TestCase):
     def setUp(self) -> None:
+        self.addCleanup(view_counts.clear)
         self.board = Board.objects.create(
             name="Heheszki", description="All the heheszki."
         )
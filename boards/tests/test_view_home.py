@@ -1,7 +1,12 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse, resolve
+from boards.counters import record_new_post
 from boards.views import BoardListView
-from boards.models import Board
+from boards.models import Board, Post, Topic
 
 
 class HomeTests(TestCase):
@@ -22,3 +27,49 @@ class HomeTests(TestCase):
     def test__home_view_contains_link_to_topics_page(self):
         board_topics_url = reverse("board_topics", kwargs={"board_pk": self.board.pk})
         self.assertContains(self.response, f'href="{board_topics_url}"')
+
+
+class HomeQueriesTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="test_user", email="user@test.com", password="test_password"
+        )
+        self.url = reverse("home")
+
+    def create_board(self, name: str) -> Board:
+        board = Board.objects.create(name=name, description=f"About {name}.")
+        topic = Topic.objects.create(
+            subject=f"{name} topic", board=board, starting_user=self.user
+        )
+        post = Post.objects.create(message="First", topic=topic, created_by=self.user)
+        record_new_post(post, new_topic=True)
+        post = Post.objects.create(message="Second", topic=topic, created_by=self.user)
+        record_new_post(post)
+        return board
+
+    def test__query_count_does_not_grow_with_boards(self):
+        """Home page shall cost the same number of queries for 1 and 10 boards."""
+        self.create_board("board_0")
+        with CaptureQueriesContext(connection) as single_board:
+            self.client.get(self.url)
+
+        for i in range(1, 10):
+            self.create_board(f"board_{i}")
+        cache.clear()
+        with self.assertNumQueries(len(single_board)):
+            response = self.client.get(self.url)
+
+        self.assertContains(response, "By test_user", 10)
+
+    def test__board_summary(self):
+        board = self.create_board("board")
+        Board.objects.create(name="empty", description="Nothing here.")
+
+        boards = list(Board.objects.with_summary().order_by("pk"))
+
+        self.assertEqual(boards[0].posts_count, 2)
+        self.assertEqual(boards[0].topics_count, 1)
+        self.assertEqual(boards[0].last_post, board.get_latest_post())
+        self.assertEqual(boards[1].posts_count, 0)
+        self.assertIsNone(boards[1].last_post)
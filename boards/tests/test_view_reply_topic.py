@@ -4,11 +4,13 @@ from django.urls import reverse, resolve
 
 from boards.models import Board, Topic, Post
 from boards.forms import PostForm
+from boards.viewcounts import view_counts
 from boards.views import reply_topic
 
 
 class ReplyTopicTestCase(TestCase):
     def setUp(self) -> None:
+        self.addCleanup(view_counts.clear)
         self.board = Board.objects.create(name="Heheszki", description="All the heheszki.")
         self.username = "test_user"
         self.email = "user@test.com"
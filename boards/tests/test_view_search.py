@@ -0,0 +1,108 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import resolve, reverse
+
+from boards.models import Board, Post, Topic
+from boards.search import SearchResults, build_match_query
+from boards.views import search_posts
+
+
+class SearchTestCase(TestCase):
+    def setUp(self) -> None:
+        self.boards = [
+            Board.objects.create(name=name, description="About.")
+            for name in ("Heheszki", "Syf")
+        ]
+        self.username = "test_user"
+        self.password = "test_password_123"
+        User.objects.create_user(
+            username=self.username, email="user@test.com", password=self.password
+        )
+        self.client.login(username=self.username, password=self.password)
+        self.new_topic(
+            self.boards[0], "Spitfire tactics", "Dive on the <b>backline</b>."
+        )
+        self.new_topic(self.boards[1], "Random", "Nothing about planes.")
+        self.new_topic(self.boards[1], "Lunch", "Spitfire fans eat pizza.")
+
+    def new_topic(self, board, subject, message):
+        url = reverse("new_topic", kwargs={"board_pk": board.pk})
+        self.client.post(url, {"subject": subject, "message": message})
+
+    def search(self, **params):
+        return self.client.get(reverse("search"), params)
+
+
+class SearchViewTests(SearchTestCase):
+    def test__resolve_view_fn(self):
+        view = resolve("/search/")
+        self.assertEqual(view.func, search_posts)
+
+    def test__status_code(self):
+        self.assertEqual(self.search().status_code, 200)
+
+    def test__subject_ranked_first(self):
+        hits = list(self.search(q="spitfire").context["page_obj"])
+        subjects = [hit.topic.subject for hit in hits]
+        self.assertEqual(subjects, ["Spitfire tactics", "Lunch"])
+
+    def test__board_filter(self):
+        response = self.search(q="spitfire", board=self.boards[1].pk)
+        hits = list(response.context["page_obj"])
+        self.assertEqual([hit.topic.subject for hit in hits], ["Lunch"])
+
+    def test__snippet_highlighted_and_escaped(self):
+        response = self.search(q="backline")
+        self.assertContains(response, "&lt;b&gt;<mark>backline</mark>&lt;/b&gt;")
+
+    def test__reply_indexed(self):
+        topic = Topic.objects.get(subject="Random")
+        url = reverse(
+            "reply_topic", kwargs={"board_pk": topic.board.pk, "topic_pk": topic.pk}
+        )
+        self.client.post(url, {"message": "Zeppelins only."})
+        hits = list(self.search(q="zeppelins").context["page_obj"])
+        self.assertEqual([hit.topic for hit in hits], [topic])
+
+    def test__edit_reindexed(self):
+        post = Post.objects.get(message="Nothing about planes.")
+        url = reverse(
+            "edit_post",
+            kwargs={
+                "board_pk": post.topic.board.pk,
+                "topic_pk": post.topic.pk,
+                "post_pk": post.pk,
+            },
+        )
+        self.client.post(url, {"message": "Biplanes."})
+        self.assertEqual(len(self.search(q="planes").context["page_obj"]), 0)
+        self.assertEqual(len(self.search(q="random").context["page_obj"]), 1)
+
+    def test__deleted_post_unindexed(self):
+        Post.objects.get(message="Spitfire fans eat pizza.").delete()
+        self.assertEqual(len(self.search(q="pizza").context["page_obj"]), 0)
+
+    def test__operators_in_query_ignored(self):
+        self.assertEqual(build_match_query('pizza" OR NEAR(*'), '"pizza" "OR" "NEAR"')
+        self.assertEqual(self.search(q='pizza" OR NEAR(*').status_code, 200)
+
+
+class RebuildSearchIndexTests(SearchTestCase):
+    def test__rebuild(self):
+        Topic.objects.create(
+            subject="Imported", board=self.boards[0], starting_user=User.objects.get()
+        )
+        Post.objects.create(
+            message="Spitfire import",
+            topic=Topic.objects.get(subject="Imported"),
+            created_by=User.objects.get(),
+        )
+        out = StringIO()
+        call_command("rebuild_search_index", "--batch-size=2", stdout=out)
+
+        self.assertIn("Indexed 4 posts", out.getvalue())
+        self.assertEqual(SearchResults("spitfire").count(), 3)
+        self.assertEqual(SearchResults("imported").count(), 1)
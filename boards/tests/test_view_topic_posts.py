@@ -3,11 +3,13 @@ from django.test import TestCase
 from django.urls import resolve, reverse
 
 from boards.models import Board, Post, Topic
+from boards.viewcounts import view_counts
 from boards.views import PostListView
 
 
 class TopicPostsTests(TestCase):
     def setUp(self) -> None:
+        self.addCleanup(view_counts.clear)
         board = Board.objects.create(name="board", description="About board.")
         user = User.objects.create_user(
             username="test_user", email="user@test.com", password="test_password"
@@ -0,0 +1,105 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from boards.models import Board, Post, Topic
+from boards.viewcounts import ViewCountBuffer, view_counts
+
+
+class ViewCountBufferTests(TestCase):
+    def setUp(self) -> None:
+        board = Board.objects.create(name="board", description="About board.")
+        user = User.objects.create_user(
+            username="test_user", email="user@test.com", password="test_password"
+        )
+        self.topics = [
+            Topic.objects.create(subject=f"{i}", board=board, starting_user=user)
+            for i in range(3)
+        ]
+        self.buffer = ViewCountBuffer(flush_interval=3600, flush_threshold=1000)
+
+    def views(self):
+        return list(Topic.objects.order_by("pk").values_list("views", flat=True))
+
+    def test__increments_buffered(self):
+        self.buffer.add(self.topics[0].pk)
+        self.buffer.add(self.topics[0].pk)
+        self.assertEqual(self.buffer.pending(self.topics[0].pk), 2)
+        self.assertEqual(self.views(), [0, 0, 0])
+
+    def test__flush(self):
+        for topic, count in zip(self.topics, (2, 1, 2)):
+            self.buffer.add(topic.pk, count)
+
+        with self.assertNumQueries(4):
+            self.assertEqual(self.buffer.flush(), 3)
+
+        self.assertEqual(self.views(), [2, 1, 2])
+        self.assertEqual(self.buffer.pending(self.topics[0].pk), 0)
+
+    def test__flush_on_threshold(self):
+        self.buffer.flush_threshold = 3
+        self.buffer.add(self.topics[0].pk)
+        self.buffer.add(self.topics[1].pk)
+        self.assertEqual(self.views(), [0, 0, 0])
+        self.buffer.add(self.topics[1].pk)
+        self.assertEqual(self.views(), [1, 2, 0])
+
+    def test__flush_on_interval(self):
+        self.buffer.flush_interval = 0
+        self.buffer.add(self.topics[2].pk)
+        self.assertEqual(self.views(), [0, 0, 1])
+
+    def test__flush_when_due(self):
+        self.buffer.add(self.topics[0].pk)
+        self.buffer.flush_if_due()
+        self.assertEqual(self.views(), [0, 0, 0])
+        self.buffer.flush_interval = 0
+        self.buffer.flush_if_due()
+        self.assertEqual(self.views(), [1, 0, 0])
+
+    def test__clear(self):
+        self.buffer.add(self.topics[0].pk)
+        self.buffer.clear()
+        self.assertEqual(self.buffer.flush(), 0)
+        self.assertEqual(self.views(), [0, 0, 0])
+
+
+class TopicViewsTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.addCleanup(view_counts.clear)
+        board = Board.objects.create(name="board", description="About board.")
+        user = User.objects.create_user(
+            username="test_user", email="user@test.com", password="test_password"
+        )
+        self.topic = Topic.objects.create(
+            subject="Topic", board=board, starting_user=user
+        )
+        Post.objects.create(message="Message", topic=self.topic, created_by=user)
+        self.url = reverse(
+            "topic_posts", kwargs={"board_pk": board.pk, "topic_pk": self.topic.pk}
+        )
+
+    def test__view_not_written_on_read(self):
+        self.client.get(self.url)
+        self.topic.refresh_from_db()
+        self.assertEqual(self.topic.views, 0)
+        self.assertEqual(self.topic.get_views_count(), 1)
+
+    def test__view_written_after_next_request(self):
+        self.client.get(self.url)
+        with mock.patch.object(view_counts, "flush_interval", 0):
+            self.client.get(reverse("home"))
+        self.topic.refresh_from_db()
+        self.assertEqual(self.topic.views, 1)
+
+    def test__view_written_on_flush(self):
+        self.client.get(self.url)
+        view_counts.flush()
+        self.topic.refresh_from_db()
+        self.assertEqual(self.topic.views, 1)
+        self.assertEqual(self.topic.get_views_count(), 1)
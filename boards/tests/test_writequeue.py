@@ -0,0 +1,96 @@
+import threading
+
+from django.contrib.auth.models import User
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+
+from boards.models import Board, Post, Topic
+from boards.writequeue import WriteCoordinator, write_coordinator
+
+
+def create_board(name):
+    return Board.objects.create(name=name, description="About board.")
+
+
+class DisabledWriteCoordinatorTests(TestCase):
+    def setUp(self) -> None:
+        self.coordinator = WriteCoordinator(False, batch_size=10, batch_window=0)
+
+    def test__runs_inline(self):
+        board = self.coordinator.submit(create_board, "board")
+        self.assertTrue(Board.objects.filter(pk=board.pk).exists())
+        self.assertEqual(self.coordinator.batches, 0)
+
+    def test__failure_raised(self):
+        create_board("board")
+        with self.assertRaises(Exception):
+            self.coordinator.submit(create_board, "board")
+
+
+class WriteCoordinatorTests(TransactionTestCase):
+    def setUp(self) -> None:
+        self.coordinator = WriteCoordinator(True, batch_size=50, batch_window=0.1)
+
+    def submit_concurrently(self, names):
+        outcomes = {}
+
+        def submit(name):
+            try:
+                outcomes[name] = self.coordinator.submit(create_board, name)
+            except Exception as error:
+                outcomes[name] = error
+
+        threads = [threading.Thread(target=submit, args=(name,)) for name in names]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return outcomes
+
+    def test__writes_batched(self):
+        names = [f"board {i}" for i in range(20)]
+        outcomes = self.submit_concurrently(names)
+        self.assertEqual(Board.objects.filter(name__in=names).count(), 20)
+        self.assertEqual(outcomes["board 0"].name, "board 0")
+        self.assertEqual(self.coordinator.writes, 20)
+        self.assertLess(self.coordinator.batches, 20)
+
+    def test__failure_isolated(self):
+        create_board("taken")
+        outcomes = self.submit_concurrently(["taken", "free"])
+        self.assertIsInstance(outcomes["taken"], Exception)
+        self.assertTrue(Board.objects.filter(name="free").exists())
+
+    def test__nested_submit_runs_inline(self):
+        board = self.coordinator.submit(
+            lambda: self.coordinator.submit(create_board, "nested")
+        )
+        self.assertEqual(board.name, "nested")
+
+
+class CoordinatedViewsTests(TransactionTestCase):
+    def setUp(self) -> None:
+        write_coordinator.enabled = True
+        self.addCleanup(setattr, write_coordinator, "enabled", False)
+        self.board = create_board("board")
+        self.user = User.objects.create_user(
+            username="test_user", email="user@test.com", password="test_password_123"
+        )
+        self.client.login(username="test_user", password="test_password_123")
+
+    def test__new_topic_and_reply(self):
+        self.client.post(
+            reverse("new_topic", kwargs={"board_pk": self.board.pk}),
+            {"subject": "Subject", "message": "Message"},
+        )
+        topic = Topic.objects.get()
+        response = self.client.post(
+            reverse(
+                "reply_topic", kwargs={"board_pk": self.board.pk, "topic_pk": topic.pk}
+            ),
+            {"message": "Reply"},
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Post.objects.filter(topic=topic).count(), 2)
+        self.board.refresh_from_db()
+        self.assertEqual(self.board.posts_count, 2)
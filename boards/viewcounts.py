@@ -0,0 +1,103 @@
+"""
+Write-behind buffer for the topic view counters.
+
+Views are collected in memory per topic and flushed to the database in
+one transaction, with a single `UPDATE ... SET views = views + n` per
+distinct increment, once `VIEW_COUNT_FLUSH_INTERVAL` seconds have passed
+or `VIEW_COUNT_FLUSH_THRESHOLD` views are pending, without making the
+request wait when the write coordinator is on. Besides new views, every
+finished request checks the interval, so the last views of a topic do
+not wait for another one to be written. What is still pending
+when the process exits is flushed by an `atexit` hook.
+
+"""
+
+import atexit
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.apps import apps
+from django.db import DatabaseError, transaction
+from django.db.models import F
+
+from boards.writequeue import write_coordinator
+from django_learning.settings import (
+    VIEW_COUNT_FLUSH_INTERVAL,
+    VIEW_COUNT_FLUSH_THRESHOLD,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ViewCountBuffer:
+    def __init__(self, flush_interval: float, flush_threshold: int):
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self._lock = threading.Lock()
+        self._pending = Counter()
+        self._last_flush = time.monotonic()
+
+    def add(self, topic_pk: int, count: int = 1):
+        with self._lock:
+            self._pending[topic_pk] += count
+            due = sum(self._pending.values()) >= self.flush_threshold or self._expired()
+        if due:
+            write_coordinator.submit_nowait(self.flush)
+
+    def flush_if_due(self):
+        """Flushes the pending views once the flush interval has passed."""
+        with self._lock:
+            due = bool(self._pending) and self._expired()
+        if due:
+            write_coordinator.submit_nowait(self.flush)
+
+    def _expired(self) -> bool:
+        return time.monotonic() - self._last_flush >= self.flush_interval
+
+    def pending(self, topic_pk: int) -> int:
+        with self._lock:
+            return self._pending[topic_pk]
+
+    def clear(self):
+        """Drops the pending views without writing them."""
+        with self._lock:
+            self._pending.clear()
+            self._last_flush = time.monotonic()
+
+    def flush(self) -> int:
+        """Writes the pending views and returns the number of topics updated."""
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+            self._last_flush = time.monotonic()
+        if not pending:
+            return 0
+
+        topics_by_increment = defaultdict(list)
+        for topic_pk, count in pending.items():
+            topics_by_increment[count].append(topic_pk)
+
+        Topic = apps.get_model("boards", "Topic")
+        try:
+            with transaction.atomic():
+                for count, topic_pks in topics_by_increment.items():
+                    Topic.objects.filter(pk__in=topic_pks).update(
+                        views=F("views") + count
+                    )
+        except DatabaseError:
+            with self._lock:
+                self._pending.update(pending)
+            raise
+        return len(pending)
+
+
+view_counts = ViewCountBuffer(VIEW_COUNT_FLUSH_INTERVAL, VIEW_COUNT_FLUSH_THRESHOLD)
+
+
+@atexit.register
+def _flush_at_exit():
+    try:
+        view_counts.flush()
+    except DatabaseError:
+        logger.exception("Pending topic views could not be flushed.")
@@ -1,60 +1,144 @@
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import render, redirect, get_object_or_404
-from django.db.models import Count
+from django.db.models import Count, Max
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
+from django.http import Http404, JsonResponse
 from django.utils import timezone
 from django.utils.decorators import method_decorator
 from django.views.generic import ListView, UpdateView
-from boards.forms import NewTopicForm, PostForm
+from boards import counters, pagecache, replicas, search
+from boards.authors import get_posts_counts
+from boards.autocomplete import ALL_BOARDS, subject_indexes
+from boards.conditional import ConditionalGetMixin
+from boards.forms import NewTopicForm, PostForm, SearchForm
 from boards.models import Board, Topic, Post
-from django_learning.settings import POSTS_PAGINATE_BY, TOPICS_PAGINATE_BY
+from boards.pagecache import AnonymousPageCacheMixin
+from boards.pagination import KeysetPaginationMixin
+from boards.readers import recent_readers, topic_readers, visitor_id
+from boards.replicas import ReplicaReadMixin
+from boards.viewcounts import view_counts
+from boards.writequeue import write_coordinator
+from django_learning.settings import (
+    POSTS_PAGINATE_BY,
+    SEARCH_PAGINATE_BY,
+    SUBJECT_SUGGESTIONS_LIMIT,
+    TOPICS_PAGINATE_BY,
+)
 
 
-class BoardListView(ListView):
+class BoardListView(
+    ReplicaReadMixin, AnonymousPageCacheMixin, ConditionalGetMixin, ListView
+):
     model = Board
     context_object_name = "boards"
     template_name = "home.html"
 
+    def get_page_cache_scopes(self):
+        return replicas.page_cache_scopes("boards")
 
-class TopicListView(ListView):
+    def get_validators(self):
+        state = Board.objects.aggregate(
+            last_updated=Max("last_updated"), count=Count("pk")
+        )
+        return state["last_updated"], state["count"]
+
+    def get_queryset(self):
+        return Board.objects.with_summary()
+
+
+class TopicListView(
+    ReplicaReadMixin,
+    AnonymousPageCacheMixin,
+    ConditionalGetMixin,
+    KeysetPaginationMixin,
+    ListView,
+):
     model = Topic
     context_object_name = "topics"
     template_name = "topics.html"
     paginate_by = TOPICS_PAGINATE_BY
+    keyset_fields = ("last_updated", "pk")
+
+    def get_page_cache_scopes(self):
+        return replicas.page_cache_scopes(f"board:{self.kwargs.get('board_pk')}")
+
+    def get_validators(self):
+        return (
+            Board.objects.filter(pk=self.kwargs.get("board_pk"))
+            .values_list("last_updated", "topics_count", "posts_count")
+            .first()
+        )
 
     def get_context_data(self, *, object_list=None, **kwargs):
         kwargs["board"] = self.board
-        return super().get_context_data(**kwargs)
+        context = super().get_context_data(**kwargs)
+        topics = context["topics"]
+        readers = topic_readers.estimate_many(topic.pk for topic in topics)
+        for topic in topics:
+            topic.readers_count = readers[topic.pk]
+        return context
 
     def get_queryset(self):
         self.board = get_object_or_404(Board, pk=self.kwargs.get("board_pk"))
-        queryset = self.board.topics.order_by("-last_updated").annotate(
-            replies=Count("posts") - 1
-        )
+        queryset = self.board.topics.with_pages().order_by("-last_updated")
         return queryset
 
 
-class PostListView(ListView):
+class PostListView(
+    ReplicaReadMixin,
+    AnonymousPageCacheMixin,
+    ConditionalGetMixin,
+    KeysetPaginationMixin,
+    ListView,
+):
     model = Post
     context_object_name = "posts"
     template_name = "topic_posts.html"
     paginate_by = POSTS_PAGINATE_BY
+    keyset_fields = ("created_at", "pk")
+
+    def get_page_cache_scopes(self):
+        return replicas.page_cache_scopes(f"topic:{self.kwargs.get('topic_pk')}")
+
+    def get_validators(self):
+        return (
+            Topic.objects.filter(
+                board__pk=self.kwargs.get("board_pk"), pk=self.kwargs.get("topic_pk")
+            )
+            .values_list("last_updated", "replies_count")
+            .first()
+        )
+
+    def page_cache_hit(self, request):
+        self.record_view(int(self.kwargs.get("topic_pk")))
+
+    def not_modified(self, request):
+        self.record_view(int(self.kwargs.get("topic_pk")))
+
+    def record_view(self, topic_pk):
+        visitor = visitor_id(self.request)
+        topic_readers.add(topic_pk, visitor)
+        if recent_readers.add(topic_pk, visitor):
+            view_counts.add(topic_pk)
 
     def get_context_data(self, *, object_list=None, **kwargs):
-        session_key = f"viewed_topic_{self.topic.pk}"
-        if not self.request.session.get(session_key, False):
-            self.topic.views += 1
-            self.topic.save()
-            self.request.session[session_key] = True
+        self.record_view(self.topic.pk)
 
         kwargs["topic"] = self.topic
-        return super().get_context_data(**kwargs)
+        context = super().get_context_data(**kwargs)
+        posts = context["posts"]
+        counts = get_posts_counts(post.created_by_id for post in posts)
+        for post in posts:
+            post.author_posts_count = counts[post.created_by_id]
+        return context
 
     def get_queryset(self):
         self.topic = get_object_or_404(
-            Topic, board__pk=self.kwargs.get("board_pk"), pk=self.kwargs.get("topic_pk")
+            Topic.objects.select_related("board"),
+            board__pk=self.kwargs.get("board_pk"),
+            pk=self.kwargs.get("topic_pk"),
         )
-        queryset = self.topic.posts.order_by("-created_at")
+        queryset = self.topic.posts.select_related("created_by").order_by("-created_at")
         return queryset
 
 
@@ -68,13 +152,23 @@ def new_topic(request, board_pk):
             topic = form.save(commit=False)
             topic.board = board
             topic.starting_user = request.user
-            topic.save()
-
-            Post.objects.create(
+            post = Post(
                 message=form.cleaned_data.get("message"),
-                topic=topic,
                 created_by=request.user,
             )
+            post.render_message()
+
+            def create():
+                topic.save()
+                post.topic = topic
+                post.save()
+                counters.record_new_post(post, new_topic=True)
+                search.index_post(post, subject=topic.subject)
+                pagecache.bump_generations("boards", f"board:{board.pk}")
+
+            write_coordinator.submit(create)
+            replicas.record_primary_write(request)
+            subject_indexes.add_topic(topic)
 
             return redirect("topic_posts", board_pk=board_pk, topic_pk=topic.pk)
 
@@ -93,10 +187,18 @@ def reply_topic(request, board_pk, topic_pk):
             post = form.save(commit=False)
             post.topic = topic
             post.created_by = request.user
-            post.save()
+            post.render_message()
 
-            topic.last_updated = timezone.now()
-            topic.save()
+            def create():
+                post.save()
+                counters.record_new_post(post)
+                search.index_post(post)
+                pagecache.bump_generations(
+                    "boards", f"board:{topic.board_id}", f"topic:{topic.pk}"
+                )
+
+            write_coordinator.submit(create)
+            replicas.record_primary_write(request)
 
             return redirect("topic_posts", board_pk=board_pk, topic_pk=topic_pk)
     else:
@@ -120,8 +222,53 @@ class PostUpdateView(UpdateView):
         post = form.save(commit=False)
         post.updated_by = self.request.user
         post.updated_at = timezone.now()
-        post.save()
+        post.render_message()
+
+        def update():
+            post.save()
+            search.index_post(post)
+            pagecache.bump_generations(f"topic:{post.topic_id}")
+
+        write_coordinator.submit(update)
+        replicas.record_primary_write(self.request)
 
         return redirect(
             "topic_posts", board_pk=post.topic.board.pk, topic_pk=post.topic.pk
         )
+
+
+def search_posts(request):
+    form = SearchForm(request.GET)
+    page = None
+    if form.is_valid() and form.cleaned_data["q"]:
+        board = form.cleaned_data["board"]
+        results = search.SearchResults(
+            form.cleaned_data["q"], board_pk=board.pk if board else None
+        )
+        page = Paginator(results, SEARCH_PAGINATE_BY).get_page(request.GET.get("page"))
+
+    query = request.GET.copy()
+    query.pop("page", None)
+    context = {
+        "form": form,
+        "page_obj": page,
+        "paginator": page.paginator if page else None,
+        "is_paginated": page.has_other_pages() if page else False,
+        "pagination_query": f"{query.urlencode()}&" if query else "",
+    }
+    return render(request, "search.html", context)
+
+
+def topic_suggestions(request, board_pk=ALL_BOARDS):
+    prefix = request.GET.get("q", "").strip()[:255]
+    try:
+        suggestions = subject_indexes.suggest(
+            prefix, board_pk=board_pk, limit=SUBJECT_SUGGESTIONS_LIMIT
+        )
+    except Board.DoesNotExist:
+        raise Http404
+    response = JsonResponse(
+        {"results": [{"id": pk, "subject": subject} for subject, pk in suggestions]}
+    )
+    response["Cache-Control"] = "private, max-age=30"
+    return response
@@ -0,0 +1,123 @@
+"""
+Write coordinator funnelling the forum writes through one writer thread.
+
+SQLite takes one writer at a time, so request threads writing at once
+mostly wait for each other's locks and fsyncs. When `WRITE_COORDINATOR`
+is on, `submit()` hands the write to a single writer thread instead. It
+runs the writes queued within `WRITE_BATCH_WINDOW` seconds, up to
+`WRITE_BATCH_SIZE` of them, in one transaction, each under its own
+savepoint. One lock and one commit then serve the whole batch, and one
+failing write does not take the others down.
+
+`submit()` still returns the result of the write, or raises its error,
+once the batch has committed, so request handlers keep their synchronous
+success or failure. `on_commit()` callbacks of the writes run after that
+commit, in the writer thread. With the coordinator off, writes run in the
+calling thread, in a transaction of their own.
+
+"""
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from django.db import connection, transaction
+
+from django_learning.settings import (
+    WRITE_BATCH_SIZE,
+    WRITE_BATCH_WINDOW,
+    WRITE_COORDINATOR,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class WriteCoordinator:
+    def __init__(self, enabled: bool, batch_size: int, batch_window: float):
+        self.enabled = enabled
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self._queue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._writer = None
+        self.batches = self.writes = 0
+
+    def submit(self, write, *args, **kwargs):
+        """Runs the write in a transaction and returns its result."""
+        return self._enqueue(write, args, kwargs).result()
+
+    def submit_nowait(self, write, *args, **kwargs) -> Future:
+        """Queues the write without waiting for it; failures are logged."""
+        future = self._enqueue(write, args, kwargs)
+        future.add_done_callback(self._log_failure)
+        return future
+
+    def _enqueue(self, write, args, kwargs) -> Future:
+        future = Future()
+        if not self.enabled or threading.current_thread() is self._writer:
+            try:
+                with transaction.atomic():
+                    future.set_result(write(*args, **kwargs))
+            except BaseException as error:
+                future.set_exception(error)
+            return future
+
+        self._start()
+        self._queue.put((future, write, args, kwargs))
+        return future
+
+    @staticmethod
+    def _log_failure(future):
+        if error := future.exception():
+            logger.error("Queued write failed.", exc_info=error)
+
+    def _start(self):
+        with self._lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(
+                    target=self._run, name="write-coordinator", daemon=True
+                )
+                self._writer.start()
+
+    def _next_batch(self) -> list:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.batch_window
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(
+                    self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                )
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            outcomes = []
+            try:
+                with transaction.atomic():
+                    for future, write, args, kwargs in batch:
+                        try:
+                            with transaction.atomic():
+                                outcomes.append((future, True, write(*args, **kwargs)))
+                        except Exception as error:
+                            outcomes.append((future, False, error))
+            except Exception as error:
+                # The commit failed, none of the writes happened.
+                outcomes = [(future, False, error) for future, *_ in batch]
+                connection.close_if_unusable_or_obsolete()
+
+            for future, succeeded, outcome in outcomes:
+                if succeeded:
+                    future.set_result(outcome)
+                else:
+                    future.set_exception(outcome)
+            self.batches += 1
+            self.writes += len(batch)
+
+
+write_coordinator = WriteCoordinator(
+    WRITE_COORDINATOR, WRITE_BATCH_SIZE, WRITE_BATCH_WINDOW
+)
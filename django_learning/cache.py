@@ -0,0 +1,433 @@
+"""
+Two-tier cache backend for several worker processes on one host.
+
+L1 is a per-process LRU of pickled values, bounded by `L1_MAX_ENTRIES`,
+`L1_MAX_BYTES` and `L1_TIMEOUT` seconds. L2 is an SQLite file shared by
+all the processes (`LOCATION`), bounded by `MAX_ENTRIES`.
+
+Every write to L2 appends the key to a change log, whose sequence number
+serves as version stamp. Before using its L1, a process asks SQLite
+whether any other connection committed since it last looked
+(`PRAGMA data_version`, no disk access) and, only then, drops from L1 the
+keys logged since the last stamp it has seen. Values only enter L1 when
+read or written at a stamp not older than that, so no worker serves a
+value another worker has replaced or deleted.
+
+    CACHES = {
+        "default": {
+            "BACKEND": "django_learning.cache.TwoTierCache",
+            "LOCATION": "/var/tmp/django_learning_cache.sqlite3",
+            "OPTIONS": {"L1_MAX_ENTRIES": 10_000, "L1_MAX_BYTES": 64 * 2**20},
+        }
+    }
+
+Hit ratios, evictions and memory use of both tiers are returned by
+`get_stats()`. Each process publishes its L1 figures into L2 every
+`STATS_INTERVAL` seconds, so `manage.py cache_stats` sees all the workers.
+
+"""
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    expires REAL
+);
+CREATE INDEX IF NOT EXISTS cache_entries_expires ON cache_entries (expires);
+CREATE TABLE IF NOT EXISTS cache_changes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    key TEXT
+);
+CREATE TABLE IF NOT EXISTS cache_workers (
+    pid INTEGER PRIMARY KEY,
+    stats TEXT NOT NULL,
+    updated REAL NOT NULL
+);
+"""
+
+# Logged instead of a key by `clear()`: every L1 must be emptied.
+ALL_KEYS = None
+
+
+class LRUTier:
+    """Per-process tier: pickled values by key, least recently used first."""
+
+    def __init__(self, max_entries: int, max_bytes: int, timeout: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is not None and entry[1] > time.time():
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+        if entry is not None:
+            self.discard(key)
+        self.misses += 1
+        return None
+
+    def set(self, key, value: bytes, expires):
+        self.discard(key)
+        if len(value) > self.max_bytes:
+            return
+        limit = time.time() + self.timeout
+        self.entries[key] = (value, limit if expires is None else min(expires, limit))
+        self.bytes += len(value)
+        while len(self.entries) > self.max_entries or self.bytes > self.max_bytes:
+            _, (evicted, _) = self.entries.popitem(last=False)
+            self.bytes -= len(evicted)
+            self.evictions += 1
+
+    def discard(self, key):
+        if (entry := self.entries.pop(key, None)) is not None:
+            self.bytes -= len(entry[0])
+
+    def clear(self):
+        self.entries.clear()
+        self.bytes = 0
+
+    def get_stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else None,
+            "evictions": self.evictions,
+            "entries": len(self.entries),
+            "bytes": self.bytes,
+        }
+
+
+class TwoTierCache(BaseCache):
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+        self.location = location
+        self.l1_options = (
+            int(options.get("L1_MAX_ENTRIES", 1000)),
+            int(options.get("L1_MAX_BYTES", 16 * 2**20)),
+            float(options.get("L1_TIMEOUT", 60)),
+        )
+        self.change_log_size = int(options.get("CHANGE_LOG_SIZE", 10_000))
+        self.stats_interval = float(options.get("STATS_INTERVAL", 10))
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self._reset()
+
+    def _reset(self):
+        """Starts the per-process state over, also in a forked child."""
+        self._pid = os.getpid()
+        self.l1 = LRUTier(*self.l1_options)
+        self.l2_hits = self.l2_misses = self.l2_evictions = 0
+        self._seen_seq = None
+        self._writes = 0
+        self._stats_published = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._reset()
+        local = self._local
+        if getattr(local, "pid", None) != self._pid:
+            connection = sqlite3.connect(
+                self.location, timeout=30, isolation_level=None
+            )
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = NORMAL")
+            connection.executescript(SCHEMA)
+            local.connection = connection
+            local.pid = self._pid
+            local.data_version = None
+        self._sync(local)
+        self._publish_stats(local.connection)
+        return local.connection
+
+    def _sync(self, local):
+        """Drops from L1 the keys other connections changed since the last look."""
+        connection = local.connection
+        (data_version,) = connection.execute("PRAGMA data_version").fetchone()
+        if data_version == local.data_version:
+            return
+        with self._lock:
+            if self._seen_seq is None:
+                (self._seen_seq,) = connection.execute(
+                    "SELECT COALESCE(MAX(seq), 0) FROM cache_changes"
+                ).fetchone()
+            changes = connection.execute(
+                "SELECT seq, key FROM cache_changes WHERE seq > ? ORDER BY seq",
+                (self._seen_seq,),
+            ).fetchall()
+            # Sequence numbers have no gaps, unless the log was trimmed
+            # past the last seen stamp.
+            if changes and changes[0][0] != self._seen_seq + 1:
+                self.l1.clear()
+            for seq, key in changes:
+                if key is ALL_KEYS:
+                    self.l1.clear()
+                else:
+                    self.l1.discard(key)
+                self._seen_seq = seq
+            local.data_version = data_version
+
+    def _cache_locally(self, key, value, expires, seq):
+        with self._lock:
+            if seq >= self._seen_seq:
+                self.l1.set(key, value, expires)
+            else:
+                self.l1.discard(key)
+
+    def _read(self, key):
+        """Returns the pickled value of the key, if not expired, from L1 or L2."""
+        connection = self._connection()
+        with self._lock:
+            if (value := self.l1.get(key)) is not None:
+                return value
+
+        connection.execute("BEGIN")
+        try:
+            row = connection.execute(
+                "SELECT value, expires FROM cache_entries WHERE key = ? "
+                "AND (expires IS NULL OR expires > ?)",
+                (key, time.time()),
+            ).fetchone()
+            (seq,) = connection.execute(
+                "SELECT COALESCE(MAX(seq), 0) FROM cache_changes"
+            ).fetchone()
+        finally:
+            connection.execute("COMMIT")
+
+        if row is None:
+            self.l2_misses += 1
+            return None
+        self.l2_hits += 1
+        self._cache_locally(key, row[0], row[1], seq)
+        return row[0]
+
+    def _write(self, statements, keys, l1_values=None):
+        """
+        Runs the statements and logs the keys in one write transaction, then
+        updates L1 with the given `{key: (pickled value, expires)}`.
+
+        Returns the number of rows changed by the last statement.
+        """
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            for sql, params in statements:
+                changed = connection.execute(sql, params).rowcount
+            connection.executemany(
+                "INSERT INTO cache_changes (key) VALUES (?)", [(key,) for key in keys]
+            )
+            (seq,) = connection.execute(
+                "SELECT COALESCE(MAX(seq), 0) FROM cache_changes"
+            ).fetchone()
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+        for key in keys:
+            if key is ALL_KEYS:
+                with self._lock:
+                    self.l1.clear()
+            elif l1_values and key in l1_values:
+                self._cache_locally(key, *l1_values[key], seq)
+            else:
+                with self._lock:
+                    self.l1.discard(key)
+
+        self._writes += 1
+        if self._writes % 100 == 0:
+            self._cull(connection)
+        return changed
+
+    def _cull(self, connection):
+        """Removes the expired entries and the surplus, and trims the change log."""
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            expired = connection.execute(
+                "DELETE FROM cache_entries WHERE expires <= ?", (time.time(),)
+            ).rowcount
+            (count,) = connection.execute(
+                "SELECT COUNT(*) FROM cache_entries"
+            ).fetchone()
+            surplus = 0
+            if count > self._max_entries:
+                surplus = count - self._max_entries + count // self._cull_frequency
+                surplus = connection.execute(
+                    "DELETE FROM cache_entries WHERE key IN (SELECT key FROM "
+                    "cache_entries ORDER BY expires IS NULL, expires LIMIT ?)",
+                    (surplus,),
+                ).rowcount
+            connection.execute(
+                "DELETE FROM cache_changes WHERE seq <= "
+                "(SELECT MAX(seq) FROM cache_changes) - ?",
+                (self.change_log_size,),
+            )
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        self.l2_evictions += expired + surplus
+
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        value = self._read(key)
+        return default if value is None else pickle.loads(value)
+
+    def has_key(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return self._read(key) is not None
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.set_many({key: value}, timeout=timeout, version=version)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        expires = self.get_backend_timeout(timeout)
+        values = {
+            self.make_and_validate_key(key, version=version): (
+                pickle.dumps(value, pickle.HIGHEST_PROTOCOL),
+                expires,
+            )
+            for key, value in data.items()
+        }
+        if values:
+            statements = [
+                (
+                    "INSERT OR REPLACE INTO cache_entries (key, value, expires) "
+                    "VALUES (?, ?, ?)",
+                    (key, value, expires),
+                )
+                for key, (value, expires) in values.items()
+            ]
+            self._write(statements, list(values), values)
+        return []
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        value = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        expires = self.get_backend_timeout(timeout)
+        statement = (
+            "INSERT INTO cache_entries (key, value, expires) VALUES (?, ?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET value = excluded.value, "
+            "expires = excluded.expires WHERE cache_entries.expires <= ?",
+            (key, value, expires, time.time()),
+        )
+        # L1 is left to the next read, the value may not have been stored.
+        return bool(self._write([statement], [key]))
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        statement = (
+            "UPDATE cache_entries SET expires = ? WHERE key = ? "
+            "AND (expires IS NULL OR expires > ?)",
+            (self.get_backend_timeout(timeout), key, time.time()),
+        )
+        return bool(self._write([statement], [key]))
+
+    def incr(self, key, delta=1, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute(
+                "SELECT value FROM cache_entries WHERE key = ? "
+                "AND (expires IS NULL OR expires > ?)",
+                (key, time.time()),
+            ).fetchone()
+            if row is None:
+                raise ValueError(f"Key '{key}' not found.")
+            value = pickle.loads(row[0]) + delta
+            connection.execute(
+                "UPDATE cache_entries SET value = ? WHERE key = ?",
+                (pickle.dumps(value, pickle.HIGHEST_PROTOCOL), key),
+            )
+            connection.execute("INSERT INTO cache_changes (key) VALUES (?)", (key,))
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        with self._lock:
+            self.l1.discard(key)
+        return value
+
+    def delete(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        statement = ("DELETE FROM cache_entries WHERE key = ?", (key,))
+        return bool(self._write([statement], [key]))
+
+    def delete_many(self, keys, version=None):
+        keys = [self.make_and_validate_key(key, version=version) for key in keys]
+        if keys:
+            statements = [
+                ("DELETE FROM cache_entries WHERE key = ?", (key,)) for key in keys
+            ]
+            self._write(statements, keys)
+
+    def clear(self):
+        self._write([("DELETE FROM cache_entries", ())], [ALL_KEYS])
+
+    def close(self, **kwargs):
+        # Connections are kept open per thread, like the L1 per process.
+        pass
+
+    def get_stats(self) -> dict:
+        """L1 figures of this process and of all the recent workers, and L2 figures."""
+        connection = self._connection()
+        with self._lock:
+            l1 = self.l1.get_stats()
+        lookups = self.l2_hits + self.l2_misses
+        entries, size = connection.execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(value)), 0) FROM cache_entries"
+        ).fetchone()
+        (page_count,) = connection.execute("PRAGMA page_count").fetchone()
+        (page_size,) = connection.execute("PRAGMA page_size").fetchone()
+        workers = connection.execute(
+            "SELECT pid, stats FROM cache_workers WHERE updated > ?",
+            (time.time() - 10 * self.stats_interval,),
+        ).fetchall()
+        return {
+            "l1": l1,
+            "l2": {
+                "hits": self.l2_hits,
+                "misses": self.l2_misses,
+                "hit_ratio": self.l2_hits / lookups if lookups else None,
+                "evictions": self.l2_evictions,
+                "entries": entries,
+                "bytes": size,
+                "file_bytes": page_count * page_size,
+            },
+            "workers": {pid: json.loads(stats) for pid, stats in workers},
+        }
+
+    def _publish_stats(self, connection):
+        now = time.time()
+        if now - self._stats_published < self.stats_interval:
+            return
+        self._stats_published = now
+        stats = self.l1.get_stats()
+        stats.update(l2_hits=self.l2_hits, l2_misses=self.l2_misses)
+        try:
+            connection.execute(
+                "INSERT OR REPLACE INTO cache_workers (pid, stats, updated) "
+                "VALUES (?, ?, ?)",
+                (self._pid, json.dumps(stats), now),
+            )
+        except sqlite3.OperationalError:
+            # Figures are best effort, never worth failing a cache read.
+            pass
@@ -0,0 +1,102 @@
+"""
+SQLite backend for several workers writing to the same database file.
+
+On top of the stock backend it reads these `OPTIONS`:
+
+- `pragmas`: `{name: value}` set on every new connection, e.g. WAL
+  journal mode, `synchronous = NORMAL` and a larger page cache.
+- `transaction_mode`: `"IMMEDIATE"` takes the write lock when a transaction
+  begins, so a writer never fails half way through when upgrading its read
+  lock, and waits for the lock under `timeout` instead.
+- `busy_retries` and `busy_backoff`: statements run outside a transaction,
+  `BEGIN` included, are retried that many times on `database is locked`,
+  sleeping `busy_backoff` seconds, doubled on each attempt, with jitter.
+
+Connections also answer health checks (`CONN_HEALTH_CHECKS`) with a query,
+as the stock backend reports every connection usable.
+
+"""
+import random
+import time
+
+from django.db.backends.sqlite3 import base
+
+Database = base.Database
+
+OPTIONS = ("pragmas", "transaction_mode", "busy_retries", "busy_backoff")
+BUSY_ERROR_CODES = {Database.SQLITE_BUSY, Database.SQLITE_LOCKED}
+MAX_BACKOFF = 1.0
+
+
+def is_busy(error: Database.OperationalError) -> bool:
+    if code := getattr(error, "sqlite_errorcode", None):
+        return code & 0xFF in BUSY_ERROR_CODES
+    return "locked" in str(error)
+
+
+class BusyRetryCursorWrapper(base.SQLiteCursorWrapper):
+    busy_retries = 0
+    busy_backoff = 0.0
+
+    def _retry(self, method, *args):
+        attempt = 0
+        while True:
+            try:
+                return method(self, *args)
+            except Database.OperationalError as error:
+                # Inside a transaction the statement cannot be replayed alone.
+                if (
+                    attempt == self.busy_retries
+                    or self.connection.in_transaction
+                    or not is_busy(error)
+                ):
+                    raise
+            delay = min(self.busy_backoff * 2**attempt, MAX_BACKOFF)
+            time.sleep(delay * random.uniform(0.5, 1.0))
+            attempt += 1
+
+    def execute(self, query, params=None):
+        return self._retry(base.SQLiteCursorWrapper.execute, query, params)
+
+    def executemany(self, query, param_list):
+        return self._retry(base.SQLiteCursorWrapper.executemany, query, param_list)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    @property
+    def extra_options(self) -> dict:
+        return {
+            option: value
+            for option, value in self.settings_dict["OPTIONS"].items()
+            if option in OPTIONS
+        }
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        for option in OPTIONS:
+            params.pop(option, None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        connection = super().get_new_connection(conn_params)
+        for name, value in self.extra_options.get("pragmas", {}).items():
+            connection.execute(f"PRAGMA {name} = {value}")
+        return connection
+
+    def create_cursor(self, name=None):
+        cursor = self.connection.cursor(factory=BusyRetryCursorWrapper)
+        options = self.extra_options
+        cursor.busy_retries = options.get("busy_retries", 0)
+        cursor.busy_backoff = options.get("busy_backoff", 0.0)
+        return cursor
+
+    def _start_transaction_under_autocommit(self):
+        mode = self.extra_options.get("transaction_mode", "")
+        self.cursor().execute(f"BEGIN {mode}".strip())
+
+    def is_usable(self):
+        try:
+            self.connection.execute("SELECT 1")
+        except Database.Error:
+            return False
+        return True
@@ -0,0 +1,172 @@
+"""
+Per-request SQL and template timings.
+
+`QueryInstrumentationMiddleware` times every query of the request through
+`execute_wrapper` on each database connection, and the `TimedTemplates`
+backend times the template rendering. Both go out in a `Server-Timing`
+header, so browser dev tools show them next to the network timings. The
+template time includes the queries run while rendering.
+
+Requests over `SLOW_REQUEST_QUERIES` queries or `SLOW_REQUEST_DURATION`
+seconds are logged with their statements and normalized fingerprints.
+Statements sharing a fingerprint compare equal up to their values, so a
+SELECT repeated `N_PLUS_ONE_REPEATS` times or more in one request is
+logged as a likely N+1. Queries of the write coordinator thread are not
+part of the request and not counted.
+
+"""
+import contextvars
+import functools
+import hashlib
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.db import connections
+from django.template.backends.django import DjangoTemplates, Template
+
+from django_learning.settings import (
+    N_PLUS_ONE_REPEATS,
+    SLOW_REQUEST_DURATION,
+    SLOW_REQUEST_QUERIES,
+)
+
+logger = logging.getLogger(__name__)
+
+_metrics = contextvars.ContextVar("request_metrics", default=None)
+
+STRING_RE = re.compile(r"'(?:[^']|'')*'")
+NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+VALUES_LIST_RE = re.compile(r"\(\?(?:, \?)+\)")
+WHITESPACE_RE = re.compile(r"\s+")
+
+
+@functools.lru_cache(maxsize=1024)
+def fingerprint(sql: str) -> str:
+    """The statement with its values replaced by `?` and lists by `(...)`."""
+    sql = WHITESPACE_RE.sub(" ", sql).strip().replace("%s", "?")
+    sql = NUMBER_RE.sub("?", STRING_RE.sub("?", sql))
+    return VALUES_LIST_RE.sub("(...)", sql)
+
+
+def fingerprint_id(sql: str) -> str:
+    return hashlib.sha1(fingerprint(sql).encode()).hexdigest()[:8]
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.queries = []
+        self.sql_time = 0.0
+        self.template_time = 0.0
+        self.rendering = False
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.queries.append((context["connection"].alias, sql, duration))
+            self.sql_time += duration
+
+    def repeated_selects(self) -> list:
+        """`(fingerprint, count)` of the SELECTs repeated like N+1 queries."""
+        counts = Counter(
+            fingerprint(sql)
+            for _, sql, _ in self.queries
+            if sql.lstrip()[:6].upper() == "SELECT"
+        )
+        return [
+            (statement, count)
+            for statement, count in counts.most_common()
+            if count >= N_PLUS_ONE_REPEATS
+        ]
+
+    def server_timing(self, duration: float) -> str:
+        return (
+            f'sql;dur={self.sql_time * 1000:.2f};desc="{len(self.queries)} queries", '
+            f"template;dur={self.template_time * 1000:.2f}, "
+            f"total;dur={duration * 1000:.2f}"
+        )
+
+    def log(self, request, duration: float):
+        target = f"{request.method} {request.get_full_path()}"
+        repeated = self.repeated_selects()
+        for statement, count in repeated:
+            logger.warning(
+                "Likely N+1 in %s: %d x [%s] %s",
+                target,
+                count,
+                fingerprint_id(statement),
+                statement,
+            )
+
+        if len(self.queries) < SLOW_REQUEST_QUERIES and (
+            duration < SLOW_REQUEST_DURATION
+        ):
+            return
+        flagged = {statement for statement, _ in repeated}
+        statements = "\n".join(
+            f"  {query_duration * 1000:8.2f}ms {alias} [{fingerprint_id(sql)}]"
+            f"{' N+1' if fingerprint(sql) in flagged else ''} {sql}"
+            for alias, sql, query_duration in self.queries
+        )
+        logger.warning(
+            "Slow request %s: %.1fms, %d queries in %.1fms, templates %.1fms\n%s",
+            target,
+            duration * 1000,
+            len(self.queries),
+            self.sql_time * 1000,
+            self.template_time * 1000,
+            statements,
+        )
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        metrics = _metrics.get()
+        if metrics is None or metrics.rendering:
+            return super().render(context, request)
+        metrics.rendering = True
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            metrics.rendering = False
+            metrics.template_time += time.perf_counter() - started
+
+
+class TimedTemplates(DjangoTemplates):
+    """Django templates backend adding the rendering time to the request metrics."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code).template, self)
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name).template, self)
+
+
+class QueryInstrumentationMiddleware:
+    """Goes first, so that the timings cover the other middlewares."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = _metrics.set(metrics)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as wrappers:
+                for connection in connections.all():
+                    wrappers.enter_context(connection.execute_wrapper(metrics))
+                response = self.get_response(request)
+        finally:
+            _metrics.reset(token)
+        duration = time.perf_counter() - started
+
+        response["Server-Timing"] = metrics.server_timing(duration)
+        metrics.log(request, duration)
+        return response
@@ -0,0 +1,195 @@
+"""
+On-demand profiling of single requests.
+
+Staff users profile a request by adding `?profile=1` or an `X-Profile: 1`
+header, `memory` instead of `1` also traces the allocations. Besides,
+`PROFILE_SAMPLE_RATE` of all the requests are profiled, with allocations
+when `PROFILE_SAMPLE_MEMORY` is on. The rest of the middleware chain and
+the view then run under cProfile, and tracemalloc when asked.
+
+Each capture writes `<id>.prof`, loadable by `pstats` or snakeviz, an
+`<id>.json` description and, with allocations, an `<id>.tracemalloc`
+snapshot into `PROFILE_DIR`. Only the latest `PROFILE_KEEP` captures are
+kept. The `profile_captures` admin page lists their top functions and
+allocation sites.
+
+tracemalloc traces the whole process, so only one request traces its
+allocations at a time; the others are profiled without them.
+
+"""
+import cProfile
+import json
+import os
+import pstats
+import random
+import re
+import threading
+import time
+import tracemalloc
+import uuid
+from pathlib import Path
+
+from django.contrib import admin
+from django.http import FileResponse, Http404
+from django.shortcuts import render
+
+from django_learning.settings import (
+    PROFILE_DIR,
+    PROFILE_KEEP,
+    PROFILE_SAMPLE_MEMORY,
+    PROFILE_SAMPLE_RATE,
+    PROFILE_TOP_ENTRIES,
+    PROFILE_TRACEMALLOC_FRAMES,
+)
+
+CAPTURE_ID_RE = re.compile(r"^\d{8}T\d{6}-[0-9a-f]{8}$")
+CAPTURE_FILES = (".prof", ".json", ".tracemalloc")
+LISTED_CAPTURES = 20
+SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+)
+
+_tracing = threading.Lock()
+
+
+def requested_mode(request):
+    """`"cpu"`, `"memory"` or None, for the profiling asked by the request."""
+    value = request.GET.get("profile") or request.headers.get("X-Profile")
+    user = getattr(request, "user", None)
+    if value and user is not None and user.is_staff:
+        return "memory" if value == "memory" else "cpu"
+    if PROFILE_SAMPLE_RATE and random.random() < PROFILE_SAMPLE_RATE:
+        return "memory" if PROFILE_SAMPLE_MEMORY else "cpu"
+    return None
+
+
+def capture_path(capture_id: str, suffix: str) -> Path:
+    return Path(PROFILE_DIR) / f"{capture_id}{suffix}"
+
+
+def capture_ids() -> list:
+    """Ids of the stored captures, newest first."""
+    try:
+        names = os.listdir(PROFILE_DIR)
+    except FileNotFoundError:
+        return []
+    ids = {name[: -len(".json")] for name in names if name.endswith(".json")}
+    return sorted(filter(CAPTURE_ID_RE.match, ids), reverse=True)
+
+
+def rotate(keep: int):
+    for capture_id in capture_ids()[keep:]:
+        for suffix in CAPTURE_FILES:
+            capture_path(capture_id, suffix).unlink(missing_ok=True)
+
+
+def save_capture(request, response, profiler, snapshot, duration, peak) -> str:
+    capture_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    Path(PROFILE_DIR).mkdir(parents=True, exist_ok=True)
+    profiler.dump_stats(capture_path(capture_id, ".prof"))
+    if snapshot is not None:
+        snapshot.dump(str(capture_path(capture_id, ".tracemalloc")))
+    description = {
+        "method": request.method,
+        "path": request.get_full_path(),
+        "status": response.status_code,
+        "user": getattr(getattr(request, "user", None), "username", ""),
+        "duration": duration * 1000,
+        "peak_memory": peak,
+        "created_at": time.time(),
+    }
+    # Written last, a capture is listed once its files are complete.
+    capture_path(capture_id, ".json").write_text(json.dumps(description))
+    rotate(PROFILE_KEEP)
+    return capture_id
+
+
+def top_functions(capture_id: str, limit: int) -> list:
+    """`(function, calls, own seconds, cumulative seconds)` by cumulative time."""
+    stats = pstats.Stats(str(capture_path(capture_id, ".prof")))
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+    return [
+        (pstats.func_std_string(function), calls, own, cumulative)
+        for function, (_, calls, own, cumulative, _) in rows[:limit]
+    ]
+
+
+def top_allocations(capture_id: str, limit: int) -> list:
+    """`(line, size in bytes, count)` of the largest live allocation sites."""
+    path = capture_path(capture_id, ".tracemalloc")
+    if not path.exists():
+        return []
+    snapshot = tracemalloc.Snapshot.load(str(path))
+    return [
+        (str(statistic.traceback[0]), statistic.size, statistic.count)
+        for statistic in snapshot.statistics("lineno")[:limit]
+    ]
+
+
+class ProfilingMiddleware:
+    """Goes after `AuthenticationMiddleware`, which tells the staff users."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = requested_mode(request)
+        if mode is None:
+            return self.get_response(request)
+
+        tracing = mode == "memory" and _tracing.acquire(blocking=False)
+        snapshot = peak = None
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        try:
+            if tracing:
+                tracemalloc.start(PROFILE_TRACEMALLOC_FRAMES)
+            response = profiler.runcall(self.get_response, request)
+            if tracing:
+                snapshot = tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+                peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            if tracing:
+                tracemalloc.stop()
+                _tracing.release()
+        duration = time.perf_counter() - started
+
+        capture_id = save_capture(request, response, profiler, snapshot, duration, peak)
+        response["X-Profile-Capture"] = capture_id
+        return response
+
+
+def captures_view(request):
+    captures = []
+    for capture_id in capture_ids()[:LISTED_CAPTURES]:
+        try:
+            description = json.loads(capture_path(capture_id, ".json").read_text())
+            functions = top_functions(capture_id, PROFILE_TOP_ENTRIES)
+            allocations = top_allocations(capture_id, PROFILE_TOP_ENTRIES)
+        except FileNotFoundError:
+            # Rotated away meanwhile.
+            continue
+        captures.append(
+            {
+                "id": capture_id,
+                "functions": functions,
+                "allocations": allocations,
+                **description,
+            }
+        )
+    context = {
+        **admin.site.each_context(request),
+        "title": "Request profiles",
+        "captures": captures,
+    }
+    return render(request, "admin/profile_captures.html", context)
+
+
+def capture_download(request, capture_id, suffix):
+    if not CAPTURE_ID_RE.match(capture_id) or f".{suffix}" not in CAPTURE_FILES:
+        raise Http404
+    path = capture_path(capture_id, f".{suffix}")
+    if not path.exists():
+        raise Http404
+    return FileResponse(open(path, "rb"), as_attachment=True, filename=path.name)
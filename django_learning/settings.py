@@ -47,11 +47,13 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "django_learning.instrumentation.QueryInstrumentationMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "django_learning.profiling.ProfilingMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -60,7 +62,7 @@ ROOT_URLCONF = "django_learning.urls"
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "BACKEND": "django_learning.instrumentation.TimedTemplates",
         "DIRS": [os.path.join(BASE_DIR, "templates"), os.path.join(BASE_DIR, "templates/password")],
         "APP_DIRS": True,
         "OPTIONS": {
@@ -87,6 +89,43 @@ DATABASES = {
     }
 }
 
+# DJANGO_DB_PROFILE=production tunes SQLite for several concurrent workers,
+# see django_learning/db/base.py
+if os.environ.get("DJANGO_DB_PROFILE") == "production":
+    DATABASES["default"].update(
+        {
+            "ENGINE": "django_learning.db",
+            "CONN_MAX_AGE": 600,
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {
+                "timeout": 5,
+                "transaction_mode": "IMMEDIATE",
+                "busy_retries": 5,
+                "busy_backoff": 0.05,
+                "pragmas": {
+                    "journal_mode": "WAL",
+                    "synchronous": "NORMAL",
+                    "cache_size": -64 * 1024,
+                    "mmap_size": 256 * 2**20,
+                    "temp_store": "MEMORY",
+                },
+            },
+        }
+    )
+
+# DJANGO_REPLICA_PATH enables a read replica of the database for the forum
+# pages, copied by manage.py refresh_replica, see boards/replicas.py
+REPLICA_PATH = os.environ.get("DJANGO_REPLICA_PATH")
+REPLICA_REFRESH_INTERVAL = 5
+if REPLICA_PATH:
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "NAME": f"file:{REPLICA_PATH}?mode=ro",
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_ROUTERS = ["boards.replicas.ReplicaRouter"]
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
@@ -142,3 +181,81 @@ EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 TOPICS_PAGINATE_BY = 8
 POSTS_PAGINATE_BY = 3
 LAST_POSTS_NUM_IN_REPLY = 5
+SEARCH_PAGINATE_BY = 10
+
+# Posts markdown rendering
+MARKDOWN_EXTENSIONS = []
+MARKDOWN_RENDERER_REVISION = 1
+
+# Topic views write-behind buffer
+VIEW_COUNT_FLUSH_INTERVAL = 5
+VIEW_COUNT_FLUSH_THRESHOLD = 100
+
+# Topic unique readers sketches, 2 ** precision bytes per topic
+TOPIC_READERS_PRECISION = 10
+
+# Topic views deduplication, two Bloom filters of about 12 kB per topic
+TOPIC_VIEWS_CAPACITY = 10_000
+TOPIC_VIEWS_ERROR_RATE = 0.01
+
+# Cached number of posts of each author, in seconds
+AUTHOR_POSTS_COUNT_TIMEOUT = 60 * 60
+
+# Topic subjects autocomplete
+SUBJECT_INDEX_MAX_ENTRIES = 200_000
+SUBJECT_INDEX_MAX_INDEXES = 1000
+SUBJECT_INDEX_TTL = 5 * 60
+SUBJECT_SUGGESTIONS_LIMIT = 10
+
+# Anonymous readers full-page cache, in seconds
+PAGE_CACHE_TIMEOUT = 60
+
+# Two-tier cache shared by the worker processes of one host, when a path
+# for its SQLite file is given, see django_learning/cache.py
+if CACHE_PATH := os.environ.get("DJANGO_CACHE_PATH"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django_learning.cache.TwoTierCache",
+            "LOCATION": CACHE_PATH,
+            "OPTIONS": {
+                "MAX_ENTRIES": 100_000,
+                "L1_MAX_ENTRIES": 10_000,
+                "L1_MAX_BYTES": 64 * 2**20,
+                "L1_TIMEOUT": 60,
+            },
+        }
+    }
+
+# Single writer thread batching the forum writes, see boards/writequeue.py
+WRITE_COORDINATOR = os.environ.get("DJANGO_WRITE_COORDINATOR") == "1"
+WRITE_BATCH_SIZE = 50
+WRITE_BATCH_WINDOW = 0.002
+
+# Request SQL and template timings, see django_learning/instrumentation.py
+SLOW_REQUEST_QUERIES = 30
+SLOW_REQUEST_DURATION = 0.5
+N_PLUS_ONE_REPEATS = 3
+
+# Slow request and N+1 warnings go to the console
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "django_learning.instrumentation": {
+            "handlers": ["console"],
+            "level": "WARNING",
+            "propagate": False,
+        },
+    },
+}
+
+# On-demand request profiling, see django_learning/profiling.py
+PROFILE_DIR = os.environ.get("DJANGO_PROFILE_DIR", os.path.join(BASE_DIR, "profiles"))
+PROFILE_SAMPLE_RATE = float(os.environ.get("DJANGO_PROFILE_SAMPLE_RATE", 0))
+PROFILE_SAMPLE_MEMORY = False
+PROFILE_TRACEMALLOC_FRAMES = 10
+PROFILE_KEEP = 50
+PROFILE_TOP_ENTRIES = 15
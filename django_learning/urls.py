@@ -4,6 +4,7 @@ from django.urls import path, re_path
 
 from accounts import views as accounts_views
 from boards import views
+from django_learning import profiling
 
 urlpatterns = [
     path("", views.BoardListView.as_view(), name="home"),
@@ -59,6 +60,11 @@ urlpatterns = [
     ),
     path("boards/<board_pk>/", views.TopicListView.as_view(), name="board_topics"),
     path("boards/<board_pk>/new/", views.new_topic, name="new_topic"),
+    path(
+        "boards/<int:board_pk>/suggest/",
+        views.topic_suggestions,
+        name="board_topic_suggestions",
+    ),
     path(
         "boards/<board_pk>/topics/<topic_pk>/",
         views.PostListView.as_view(),
@@ -74,6 +80,18 @@ urlpatterns = [
         views.PostUpdateView.as_view(),
         name="edit_post",
     ),
+    path("search/", views.search_posts, name="search"),
+    path("search/suggest/", views.topic_suggestions, name="topic_suggestions"),
+    path(
+        "admin/profiles/",
+        admin.site.admin_view(profiling.captures_view),
+        name="profile_captures",
+    ),
+    path(
+        "admin/profiles/<str:capture_id>.<str:suffix>",
+        admin.site.admin_view(profiling.capture_download),
+        name="profile_capture_download",
+    ),
     path("admin/", admin.site.urls),
 ]
 
@@ -0,0 +1,36 @@
+// Fills <datalist data-url="..."> elements with topic subjects suggested
+// for what is typed into the inputs bound to them.
+document.querySelectorAll("datalist[data-url]").forEach(function (datalist) {
+    var input = document.querySelector('input[list="' + datalist.id + '"]');
+    if (!input) {
+        return;
+    }
+    var timer = null;
+    var controller = null;
+
+    input.addEventListener("input", function () {
+        clearTimeout(timer);
+        timer = setTimeout(function () {
+            var prefix = input.value.trim();
+            if (controller) {
+                controller.abort();
+            }
+            if (!prefix) {
+                datalist.innerHTML = "";
+                return;
+            }
+            controller = new AbortController();
+            fetch(datalist.dataset.url + "?q=" + encodeURIComponent(prefix), {signal: controller.signal})
+                .then(function (response) { return response.json(); })
+                .then(function (data) {
+                    datalist.innerHTML = "";
+                    data.results.forEach(function (result) {
+                        var option = document.createElement("option");
+                        option.value = result.subject;
+                        datalist.appendChild(option);
+                    });
+                })
+                .catch(function () {});
+        }, 100);
+    });
+});